@@ -9,6 +9,7 @@ import Html.Attributes exposing (class, href, target)
 import HtmlUtils exposing (viewSearchBar)
 import Http
 import HttpBuilder exposing (withHeader)
+import Json.Decode as D
 import Msg exposing (Msg)
 import Papers.Backend as Backend
 import Papers.Buggy as Buggy
@@ -38,26 +39,55 @@ type alias Model =
 
 type alias Flags =
     { dois : List String
+    , papers : List D.Value
     , serverURL : String
     , authorName : String
     , authorProfileURL : String
     }
 
 
+{-| The `papers` embedded into the page are those of the `dois` that the server had
+cached already, so only the remaining ones are fetched.
+-}
 init : Flags -> ( Model, Cmd Msg )
 init flags =
-    ( { initialDOIs = flags.dois
-      , freePathwayPapers = Array.empty
-      , otherPathwayPapers = []
-      , openAccessPapers = []
-      , buggyPapers = []
-      , numFailedDOIRequests = 0
-      , authorName = flags.authorName
-      , authorProfileURL = flags.authorProfileURL
-      , serverURL = flags.serverURL
-      , style = Animation.style [ Animation.width (percent 0), Animation.opacity 1 ]
-      }
-    , Cmd.batch (List.map (fetchPaper flags.serverURL) flags.dois)
+    let
+        cachedPapers =
+            List.filterMap (D.decodeValue Backend.paperDecoder >> Result.toMaybe) flags.papers
+
+        cachedDOIs =
+            List.map .doi cachedPapers
+
+        model =
+            List.foldl classifyPaper
+                { initialDOIs = flags.dois
+                , freePathwayPapers = Array.empty
+                , otherPathwayPapers = []
+                , openAccessPapers = []
+                , buggyPapers = []
+                , numFailedDOIRequests = 0
+                , authorName = flags.authorName
+                , authorProfileURL = flags.authorProfileURL
+                , serverURL = flags.serverURL
+                , style = Animation.style [ Animation.width (percent 0), Animation.opacity 1 ]
+                }
+                cachedPapers
+
+        style =
+            if List.isEmpty cachedPapers then
+                model.style
+
+            else
+                Animation.style
+                    [ Animation.width (percent (percentDOIsFetched model))
+                    , Animation.opacity (toFloat (min 1 (List.length model.initialDOIs - numberFetchedPapers model)))
+                    ]
+    in
+    ( { model | style = style }
+    , flags.dois
+        |> List.filter (\doi -> not (List.member doi cachedDOIs))
+        |> List.map (fetchPaper flags.serverURL)
+        |> Cmd.batch
     )
 
 
@@ -1,7 +1,42 @@
 import os
 import json
-
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
 from contextlib import contextmanager
+from typing import Any, Dict, Hashable
+
+
+# Cached for lookups the provider has nothing for, i.e. a negative entry
+NOT_FOUND = {"not_found": True}
+
+
+def is_not_found(value: Any) -> bool:
+    return value == NOT_FOUND
+
+
+def set_not_found(cache, key: Hashable, value: Any = NOT_FOUND):
+    """Cache that the provider has nothing for ``key``, for the ``negative_ttl`` of
+    caches that have one, as e.g. new DOIs or policies can turn up any time.
+    """
+    if hasattr(cache, "set_not_found"):
+        cache.set_not_found(key, value)
+    else:
+        cache[key] = value
+
+
+def connect_sqlite(path: str) -> sqlite3.Connection:
+    """Connect to a SQLite database in WAL mode, creating its directory if need be,
+    which can be used from all threads (serialized by the caller) and processes.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    connection = sqlite3.connect(
+        path, timeout=10, isolation_level=None, check_same_thread=False
+    )
+    connection.execute("PRAGMA journal_mode=WAL")
+    return connection
 
 
 @contextmanager
@@ -17,3 +52,210 @@ def json_filesystem_cache(name):
         print(f"Cached {len(pathway_cache)} ISSN to OA pathway mappings")
         with open(name, "w") as fh:
             json.dump(pathway_cache, fh, indent=2)
+
+
+class TTLCache:
+    """Bounded, thread-safe in-memory cache, which evicts the least recently used
+    entry once ``maxsize`` is reached and treats entries older than ``ttl`` seconds as
+    absent.
+
+    Exposes ``get(key, default)`` and ``__setitem__`` and can therefore be used e.g.
+    with ``oa_pathway``. Negative entries (see ``set_not_found``) expire after
+    ``negative_ttl`` seconds instead.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 10000,
+        ttl: float = 24 * 60 * 60,
+        negative_ttl: float = 60 * 60,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.evictions += 1
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def __setitem__(self, key: Hashable, value: Any):
+        self._set(key, value, self.ttl)
+
+    def set_not_found(self, key: Hashable, value: Any = NOT_FOUND):
+        self._set(key, value, self.negative_ttl)
+
+    def _set(self, key: Hashable, value: Any, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        """Counters since creation, where expired entries count as evictions."""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class SQLiteCache:
+    """Persistent cache in a SQLite database in WAL mode, which can be shared by all
+    processes on a host (e.g. gunicorn workers) and survives restarts.
+
+    Entries are grouped by ``namespace`` (e.g. one per provider), stored as JSON and
+    treated as absent once they are older than ``ttl`` seconds, or ``negative_ttl``
+    seconds for negative entries (see ``set_not_found``).
+    Exposes ``get(key, default)`` and ``__setitem__`` like ``TTLCache``, with the
+    difference that values come back JSON decoded, e.g. tuples as lists.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        namespace: str,
+        ttl: float = 24 * 60 * 60,
+        negative_ttl: float = 60 * 60,
+    ):
+        self.path = path
+        self.namespace = namespace
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._connection = connect_sqlite(path)
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key)"
+            ") WITHOUT ROWID"
+        )
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return default
+
+            value, expires_at = row
+            if expires_at <= time.time():
+                self._connection.execute(
+                    "DELETE FROM cache WHERE namespace = ? AND key = ?",
+                    (self.namespace, key),
+                )
+                self.evictions += 1
+                self.misses += 1
+                return default
+
+            self.hits += 1
+            return json.loads(value)
+
+    def __setitem__(self, key: str, value: Any):
+        self._set(key, value, self.ttl)
+
+    def set_not_found(self, key: str, value: Any = NOT_FOUND):
+        self._set(key, value, self.negative_ttl)
+
+    def _set(self, key: str, value: Any, ttl: float):
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)",
+                (self.namespace, key, json.dumps(value), time.time() + ttl),
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM cache WHERE namespace = ?", (self.namespace,)
+            ).fetchone()[0]
+
+    def purge_expired(self) -> int:
+        """Delete all expired entries of the namespace and return their number."""
+        with self._lock:
+            cursor = self._connection.execute(
+                "DELETE FROM cache WHERE namespace = ? AND expires_at <= ?",
+                (self.namespace, time.time()),
+            )
+            self.evictions += cursor.rowcount
+            return cursor.rowcount
+
+    def stats(self) -> Dict[str, int]:
+        """Counters of this process since creation, where expired entries count as
+        evictions, and the number of entries shared by all processes.
+        """
+        size = len(self)
+        with self._lock:
+            return {
+                "size": size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class LayeredCache:
+    """Looks up keys in read-only ``stores`` (e.g. local copies of provider data) in
+    order, before falling back to ``cache``, which is the only layer written to.
+
+    Exposes ``get(key, default)`` and ``__setitem__`` like the caches themselves.
+    """
+
+    def __init__(self, cache, *stores):
+        self.cache = cache
+        self.stores = stores
+        self.store_hits = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        for store in self.stores:
+            value = store.get(key, None)
+            if value is not None:
+                self.store_hits += 1
+                return value
+
+        return self.cache.get(key, default)
+
+    def __setitem__(self, key: Hashable, value: Any):
+        self.cache[key] = value
+
+    def set_not_found(self, key: Hashable, value: Any = NOT_FOUND):
+        set_not_found(self.cache, key, value)
+
+    def stats(self) -> Dict[str, int]:
+        return {"store_hits": self.store_hits, **self.cache.stats()}
@@ -0,0 +1,71 @@
+import time
+import threading
+
+
+class CircuitBreaker:
+    """Fails requests to an unhealthy upstream fast instead of letting them wait for
+    it to time out.
+
+    The circuit opens after ``failure_threshold`` consecutive failures. Once open,
+    requests are refused for ``reset_timeout`` seconds, after which it is half-open,
+    i.e. lets a single probe request through. The circuit closes again if the probe
+    succeeds and opens again if it fails.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened = 0
+        self._opened_at = 0.0
+        self._probe_started_at = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+
+            now = time.monotonic()
+            if self.state == self.OPEN:
+                if now - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+
+            # Let the next request probe, if the last one never reported back
+            if (
+                self._probe_started_at is not None
+                and now - self._probe_started_at < self.reset_timeout
+            ):
+                return False
+            self._probe_started_at = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probe_started_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.opened += 1
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_started_at = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "opened": self.opened,
+            }
@@ -0,0 +1,500 @@
+import os
+import time
+import random
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar, copy_context
+from email.utils import parsedate_to_datetime
+from functools import partial
+from itertools import count
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    Mapping,
+    Optional,
+)
+
+import httpx
+import requests
+
+from fyscience import monitoring
+from fyscience.circuitbreaker import CircuitBreaker
+from fyscience.ratelimit import SQLiteTokenBucket, TokenBucket
+
+PROVIDERS = ("unpaywall", "sherpa", "semantic_scholar", "orcid", "crossref")
+
+# Requests per second, which can be set per provider, e.g. with RATE_LIMIT_SHERPA=2
+RATE_LIMITS = {
+    "unpaywall": 10.0,
+    "sherpa": 5.0,
+    "semantic_scholar": 10.0,
+    "orcid": 20.0,
+    "crossref": 20.0,
+}
+RATE_LIMIT_BURST = 10
+# Requests that would have to wait longer for their turn fail right away instead
+MAX_RATE_LIMIT_WAIT = 30.0
+
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 10.0
+RETRY_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_TIMEOUT = 30.0
+
+# Providers to which a second, hedged request is sent, in case the first one takes
+# longer than the HEDGE_QUANTILE of recent latencies, e.g. HEDGE_PROVIDERS=sherpa,orcid
+HEDGE_QUANTILE = 0.95
+HEDGE_MIN_SAMPLES = 20
+LATENCY_WINDOW = 1000
+
+TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+# (connect, read) timeouts for requests made with ``requests``, which has none itself
+SYNC_TIMEOUT = (5.0, 10.0)
+LIMITS = httpx.Limits(
+    max_connections=50, max_keepalive_connections=20, keepalive_expiry=30.0
+)
+
+# Responses that say nothing about whether the provider knows what was looked up
+UPSTREAM_ERROR_STATUS_CODES = {401, 403, 408, 429}
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+_buckets: Dict[str, TokenBucket] = {}
+_breakers: Dict[str, CircuitBreaker] = {}
+_latencies: Dict[str, Deque[float]] = {}
+# Monotonic time by which the request currently being served has to be answered
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+class UpstreamError(Exception):
+    """Raised when a provider fails to answer, as opposed to answering that it doesn't
+    know what was looked up, and which must therefore never be cached.
+    """
+
+    def __init__(self, provider: str, reason: str):
+        super().__init__(f"{provider}: {reason}")
+        self.provider = provider
+
+
+class DeadlineExceeded(Exception):
+    """Raised instead of making, or waiting to make, a request to a provider once the
+    deadline (see ``deadline``) has passed or would pass in the meantime.
+
+    Unlike ``UpstreamError``, it isn't handled by the provider lookups, but by whoever
+    set the deadline, e.g. to tell which providers were skipped.
+    """
+
+    def __init__(self, provider: str):
+        super().__init__(f"{provider}: Deadline exceeded")
+        self.provider = provider
+
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[None]:
+    """Have all provider requests made within the context (including tasks created in
+    it) give up with ``DeadlineExceeded`` rather than go past ``seconds`` from now.
+    Nested deadlines can only shorten the outer one, and None sets no deadline.
+    """
+    at = None if seconds is None else time.monotonic() + seconds
+    outer = _deadline.get()
+    if outer is not None and (at is None or outer < at):
+        at = outer
+
+    token = _deadline.set(at)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def without_deadline() -> Iterator[None]:
+    """Lift the current deadline within the context, e.g. for a call shared by
+    callers with different deadlines, each of which waits for it only as long as its
+    own deadline allows.
+    """
+    token = _deadline.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left until the current deadline, or None if there is none"""
+    at = _deadline.get()
+    return None if at is None else at - time.monotonic()
+
+
+def _check_deadline(provider: str):
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(provider)
+
+
+def is_upstream_error(status_code: int) -> bool:
+    return status_code in UPSTREAM_ERROR_STATUS_CODES or status_code >= 500
+
+
+def _is_unhealthy(status_code: int) -> bool:
+    """Whether a response counts as failure for the circuit breaker, unlike e.g. rate
+    limiting, which is handled by backing off.
+    """
+    return status_code == 408 or status_code >= 500
+
+
+def get_breaker(provider: str) -> CircuitBreaker:
+    breaker = _breakers.get(provider)
+    if breaker is None:
+        breaker = CircuitBreaker(CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT)
+        _breakers[provider] = breaker
+
+    return breaker
+
+
+def _allow(provider: str):
+    if not get_breaker(provider).allow():
+        monitoring.count_upstream_error(provider, "circuit_open")
+        raise UpstreamError(provider, "Circuit open")
+
+
+def _latency_window(provider: str) -> Deque[float]:
+    return _latencies.setdefault(provider, deque(maxlen=LATENCY_WINDOW))
+
+
+def _latency_quantile(provider: str, quantile: float) -> Optional[float]:
+    latencies = sorted(_latency_window(provider))
+    if not latencies:
+        return None
+
+    return latencies[min(len(latencies) - 1, int(quantile * len(latencies)))]
+
+
+def _hedge_delay(provider: str) -> Optional[float]:
+    """Seconds after which to hedge a request, or None if it isn't to be hedged"""
+    hedge_providers = os.environ.get("HEDGE_PROVIDERS", "").split(",")
+    if provider not in hedge_providers:
+        return None
+    if len(_latency_window(provider)) < HEDGE_MIN_SAMPLES:
+        return None
+
+    return _latency_quantile(provider, HEDGE_QUANTILE)
+
+
+def get_bucket(provider: str) -> TokenBucket:
+    """Return the rate limiter of a given provider, which is shared by all processes
+    on the host in case ``RATE_LIMIT_PATH`` points to a SQLite database file.
+    """
+    bucket = _buckets.get(provider)
+    if bucket is None:
+        rate = float(
+            os.environ.get(f"RATE_LIMIT_{provider.upper()}", RATE_LIMITS[provider])
+        )
+        path = os.environ.get("RATE_LIMIT_PATH")
+        if path:
+            bucket = SQLiteTokenBucket(path, provider, rate, RATE_LIMIT_BURST)
+        else:
+            bucket = TokenBucket(rate, RATE_LIMIT_BURST)
+        _buckets[provider] = bucket
+
+    return bucket
+
+
+def _reserve(provider: str) -> float:
+    left = remaining()
+    if left is not None and left < MAX_RATE_LIMIT_WAIT:
+        wait = get_bucket(provider).reserve(max_wait=max(0.0, left))
+        if wait is None:
+            raise DeadlineExceeded(provider)
+        return wait
+
+    wait = get_bucket(provider).reserve(max_wait=MAX_RATE_LIMIT_WAIT)
+    if wait is None:
+        monitoring.count_upstream_error(provider, "rate_limited")
+        raise UpstreamError(provider, "Rate limited")
+
+    return wait
+
+
+def _retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """Seconds from the ``Retry-After`` header, which is either seconds or a date"""
+    value = headers.get("Retry-After")
+    if value is None:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff(
+    provider: str,
+    attempt: int,
+    error: UpstreamError,
+    status_code: Optional[int] = None,
+    retry_after: Optional[float] = None,
+) -> float:
+    """Return the seconds to wait before retrying a request that failed with ``error``
+    or raise the latter, in case the request is not to be retried.
+
+    Retries that would only happen after the deadline (see ``deadline``) raise
+    ``DeadlineExceeded`` instead.
+
+    Rate limited requests (429) also pause the provider's rate limiter, for as long
+    as told by ``Retry-After`` or as the exponential backoff, so that all requests to
+    the provider slow down.
+    """
+    if attempt >= MAX_RETRIES or (
+        status_code is not None and status_code not in RETRY_STATUS_CODES
+    ):
+        raise error
+
+    delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2**attempt))
+    if status_code == 429 or retry_after is not None:
+        get_bucket(provider).pause(delay if retry_after is None else retry_after)
+    if retry_after is not None and retry_after > BACKOFF_MAX:
+        raise error
+
+    left = remaining()
+    if left is not None and delay >= left:
+        raise DeadlineExceeded(provider) from error
+
+    return delay
+
+
+def get_client(provider: str) -> httpx.AsyncClient:
+    """Return the shared keep-alive client (and thereby connection pool) for a given
+    upstream provider, creating it on first use.
+    """
+    if provider not in PROVIDERS:
+        raise ValueError(f"Unknown provider '{provider}'")
+
+    client = _clients.get(provider)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(timeout=TIMEOUT, limits=LIMITS)
+        _clients[provider] = client
+
+    return client
+
+
+async def _timed(provider: str, request: Awaitable[httpx.Response]) -> httpx.Response:
+    """Await a request, recording its latency. Cancelled requests, e.g. the slower of
+    hedged ones, are recorded with the time until they were cancelled, which is a
+    lower bound of their latency, as leaving them out would lower the hedge delay.
+    """
+    start = time.monotonic()
+    try:
+        response = await request
+    except asyncio.CancelledError:
+        _latency_window(provider).append(time.monotonic() - start)
+        raise
+    _latency_window(provider).append(time.monotonic() - start)
+    return response
+
+
+async def _send(provider: str, url: str, **kwargs) -> httpx.Response:
+    """Send a request and, in case hedging is enabled for the provider and the request
+    is slower than usual, a second one, returning whichever response comes first.
+    """
+    client = get_client(provider)
+    first = asyncio.ensure_future(_timed(provider, client.get(url, **kwargs)))
+    sent = [first]
+    # Requests still in flight once the caller is done with them, e.g. as it was
+    # cancelled at its deadline while waiting, mustn't hold on to their connection
+    try:
+        delay = _hedge_delay(provider)
+        if delay is None:
+            return await first
+
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        # Hedge only if a token is available right away, so as not to add to the load
+        # of a provider that is slow because it is busy
+        if done or get_bucket(provider).reserve(max_wait=0) is None:
+            return await first
+
+        second = asyncio.ensure_future(_timed(provider, client.get(url, **kwargs)))
+        sent.append(second)
+        pending = {first, second}
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for request in done:
+                if request.exception() is None:
+                    return request.result()
+        return first.result()
+    finally:
+        for request in sent:
+            request.cancel()
+
+
+async def get(provider: str, url: str, **kwargs) -> httpx.Response:
+    """GET from a provider, raising ``UpstreamError`` if it fails to answer, i.e.
+    returned responses are either successful or tell that nothing was found.
+
+    Requests are rate limited per provider (see ``get_bucket``) and retried with
+    jittered exponential backoff, respecting ``Retry-After``. While the provider is
+    unhealthy, they fail right away (see ``get_breaker``), and they can be hedged
+    (see ``HEDGE_PROVIDERS``). Neither is waited for past the current ``deadline``.
+    """
+    return await _get(provider, lambda: _send(provider, url, **kwargs))
+
+
+@asynccontextmanager
+async def stream(provider: str, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+    """Like ``get``, but the response is returned as soon as its headers are, so that
+    its body can be processed while it is downloaded, e.g. with
+    ``response.aiter_bytes()``. Streamed requests aren't hedged.
+    """
+    client = get_client(provider)
+    request = client.build_request("GET", url, **kwargs)
+    response = await _get(
+        provider, lambda: _timed(provider, client.send(request, stream=True))
+    )
+    try:
+        yield response
+    finally:
+        await response.aclose()
+
+
+def _before_attempt(provider: str) -> float:
+    """Check that a provider may be requested (see ``get``), returning the seconds to
+    wait for the rate limiter before doing so.
+    """
+    _check_deadline(provider)
+    _allow(provider)
+    return _reserve(provider)
+
+
+async def _before_attempt_async(provider: str) -> float:
+    """Async version of ``_before_attempt``, which reserves tokens of rate limiters
+    shared via SQLite (see ``get_bucket``) in a thread, so that waiting for the
+    database doesn't block the event loop.
+    """
+    _check_deadline(provider)
+    _allow(provider)
+    if not isinstance(get_bucket(provider), SQLiteTokenBucket):
+        return _reserve(provider)
+
+    # In the request's context, i.e. with its deadline
+    reserve = partial(copy_context().run, _reserve, provider)
+    return await asyncio.get_running_loop().run_in_executor(None, reserve)
+
+
+def _failed_attempt(
+    provider: str, attempt: int, start: float, exception: Exception
+) -> float:
+    """Record a request that failed without response, returning the seconds to wait
+    before retrying it or raising ``UpstreamError`` (see ``_backoff``).
+    """
+    monitoring.observe_upstream(
+        provider, time.monotonic() - start, error=type(exception).__name__
+    )
+    get_breaker(provider).record_failure()
+    error = UpstreamError(provider, repr(exception))
+    error.__cause__ = exception
+    return _backoff(provider, attempt, error)
+
+
+def _answered_attempt(provider: str, start: float, status_code: int):
+    """Record a request that got a response, which counts as failure for the circuit
+    breaker only if the provider is unhealthy (see ``_is_unhealthy``).
+    """
+    monitoring.observe_upstream(provider, time.monotonic() - start, status=status_code)
+    if _is_unhealthy(status_code):
+        get_breaker(provider).record_failure()
+    else:
+        get_breaker(provider).record_success()
+
+
+def _retry_delay(
+    provider: str, attempt: int, status_code: int, headers: Mapping[str, str]
+) -> float:
+    """Seconds to wait before retrying a request answered with an upstream error, or
+    raise ``UpstreamError`` (see ``_backoff``).
+    """
+    error = UpstreamError(provider, f"HTTP {status_code}")
+    return _backoff(provider, attempt, error, status_code, _retry_after(headers))
+
+
+async def _get(
+    provider: str, send: Callable[[], Awaitable[httpx.Response]]
+) -> httpx.Response:
+    for attempt in count():
+        await asyncio.sleep(await _before_attempt_async(provider))
+        start = time.monotonic()
+        try:
+            with monitoring.UPSTREAM_IN_PROGRESS.labels(provider).track_inprogress():
+                response = await send()
+        except httpx.TransportError as e:
+            await asyncio.sleep(_failed_attempt(provider, attempt, start, e))
+            continue
+
+        _answered_attempt(provider, start, response.status_code)
+        if not is_upstream_error(response.status_code):
+            return response
+
+        await response.aclose()
+        await asyncio.sleep(
+            _retry_delay(provider, attempt, response.status_code, response.headers)
+        )
+
+
+def call(provider: str, request: Callable[[], requests.Response]) -> requests.Response:
+    """Sync version of ``get`` for requests made with ``requests``, e.g.
+    ``call("sherpa", lambda: requests.get(url, timeout=SYNC_TIMEOUT))``
+    """
+    for attempt in count():
+        time.sleep(_before_attempt(provider))
+        start = time.monotonic()
+        try:
+            with monitoring.UPSTREAM_IN_PROGRESS.labels(provider).track_inprogress():
+                response = request()
+        except (requests.ConnectionError, requests.Timeout) as e:
+            time.sleep(_failed_attempt(provider, attempt, start, e))
+            continue
+
+        _answered_attempt(provider, start, response.status_code)
+        if not is_upstream_error(response.status_code):
+            return response
+
+        time.sleep(
+            _retry_delay(provider, attempt, response.status_code, response.headers)
+        )
+
+
+def stats() -> Dict[str, dict]:
+    """Circuit breaker state and recent latencies per provider used so far"""
+    return {
+        provider: {
+            **get_breaker(provider).stats(),
+            "n_latencies": len(_latency_window(provider)),
+            "p50": _latency_quantile(provider, 0.5),
+            "p95": _latency_quantile(provider, 0.95),
+            "hedge_delay": _hedge_delay(provider),
+        }
+        for provider in PROVIDERS
+        if provider in _breakers
+    }
+
+
+async def close_clients():
+    """Close all provider clients, e.g. on application shutdown, as their connection
+    pools are bound to the event loop they were created in.
+    """
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
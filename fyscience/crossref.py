@@ -1,10 +1,20 @@
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
+
 import requests
+from loguru import logger
 
+from fyscience import clients
 from fyscience.schemas import Author, FullPaper
 
 # TODO: Include the appropriate request headers and potentially API key for prod
 #       https://github.com/CrossRef/rest-api-doc
 
+WORKS_URL = "https://api.crossref.org/works"
+# Only the fields read by ``_parse_paper``, rather than the full metadata of each work
+SELECT = "DOI,ISSN,title"
+ROWS = 100
+MAX_RESULTS = 500
+
 
 def _parse_paper(paper: dict) -> FullPaper:
     issn = paper.get("ISSN", None)
@@ -18,17 +28,117 @@ def _parse_paper(paper: dict) -> FullPaper:
     return FullPaper(doi=paper["DOI"], issn=issn, title=title)
 
 
-def get_author_with_papers(name: str):
-    url_name = name.replace(" ", "+")
-    r = requests.get(f"https://api.crossref.org/works?query.author={url_name}")
-    if not r.ok:
-        return None
+def _params(name: str, cursor: str, rows: int) -> dict:
+    return {"query.author": name, "select": SELECT, "rows": rows, "cursor": cursor}
+
+
+def _parse_page(result: dict, rows: int) -> Tuple[List[FullPaper], Optional[str]]:
+    """Return the papers of a page of works and the cursor of the next page, which is
+    None in case this is the last page.
+    """
+    items = result["message"]["items"]
+    papers = [_parse_paper(p) for p in items[:rows] if "DOI" in p]
+    next_cursor = result["message"].get("next-cursor")
+    if len(items) < rows:
+        next_cursor = None
+
+    return papers, next_cursor
 
-    result = r.json()
-    papers = [_parse_paper(p) for p in result["message"]["items"] if "DOI" in p]
+
+def _to_author(
+    name: str, pages: List[List[FullPaper]], failed_providers: List[str]
+) -> Author:
+    url_name = name.replace(" ", "+")
     return Author(
         name=name,
-        papers=papers,
+        papers=[paper for page in pages for paper in page],
         provider="crossref",
         profile_url=f"https://search.crossref.org/?q={url_name}",
+        failed_providers=failed_providers or None,
+    )
+
+
+def _log_stopped_paging(error: clients.UpstreamError):
+    logger.warning(
+        {"message": "paging_stopped", "provider": "crossref", "error": str(error)}
     )
+
+
+def _iter_pages(
+    name: str, max_results: int, failed_providers: List[str]
+) -> Iterator[List[FullPaper]]:
+    """Yield the papers of each page of works found for an author name, by deep paging
+    with a cursor, until there are no more or ``max_results`` works have been read.
+    Stops early if a page cannot be fetched, keeping the pages read before, unless it
+    is the first one, for which Crossref failing to answer raises ``UpstreamError``.
+    Otherwise, Crossref failing to answer is added to ``failed_providers``.
+    """
+    cursor, n_left = "*", max_results
+    while cursor is not None and n_left > 0:
+        params = _params(name, cursor, min(ROWS, n_left))
+        try:
+            r = clients.call(
+                "crossref",
+                lambda: requests.get(
+                    WORKS_URL, params=params, timeout=clients.SYNC_TIMEOUT
+                ),
+            )
+        except clients.UpstreamError as e:
+            if cursor == "*":
+                raise
+            _log_stopped_paging(e)
+            failed_providers.append("crossref")
+            return
+        if not r.ok:
+            return
+
+        papers, cursor = _parse_page(r.json(), params["rows"])
+        n_left -= params["rows"]
+        yield papers
+
+
+async def _iter_pages_async(
+    name: str, max_results: int, failed_providers: List[str]
+) -> AsyncIterator[List[FullPaper]]:
+    cursor, n_left = "*", max_results
+    while cursor is not None and n_left > 0:
+        params = _params(name, cursor, min(ROWS, n_left))
+        try:
+            r = await clients.get("crossref", WORKS_URL, params=params)
+        except clients.UpstreamError as e:
+            if cursor == "*":
+                raise
+            _log_stopped_paging(e)
+            failed_providers.append("crossref")
+            return
+        if not r.is_success:
+            return
+
+        papers, cursor = _parse_page(r.json(), params["rows"])
+        n_left -= params["rows"]
+        yield papers
+
+
+def get_author_with_papers(
+    name: str, max_results: int = MAX_RESULTS
+) -> Optional[Author]:
+    """Search Crossref for works by an author name, reading at most ``max_results``."""
+    failed_providers: List[str] = []
+    pages = list(_iter_pages(name, max_results, failed_providers))
+    if not pages:
+        return None
+
+    return _to_author(name, pages, failed_providers)
+
+
+async def get_author_with_papers_async(
+    name: str, max_results: int = MAX_RESULTS
+) -> Optional[Author]:
+    failed_providers: List[str] = []
+    pages = [
+        page async for page in _iter_pages_async(name, max_results, failed_providers)
+    ]
+    if not pages:
+        return None
+
+    return _to_author(name, pages, failed_providers)
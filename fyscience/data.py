@@ -1,7 +1,9 @@
-from typing import List
+from itertools import islice
+from typing import Iterable, Iterator, List, Union
+import gzip
 import json
 
-from fyscience.schemas import OAPathway, PaperWithOAPathway
+from fyscience.schemas import PaperRecord, PaperWithOAPathway
 
 
 def load_jsonl(filepath):
@@ -10,20 +12,29 @@ def load_jsonl(filepath):
             yield json.loads(line)
 
 
-def calculate_metrics(papers: List[PaperWithOAPathway]):
-    n_oa = 0
-    n_pathway_nocost = 0
-    n_pathway_other = 0
-    n_unknown = 0
+def chunked(iterable: Iterable, size: int) -> Iterator[list]:
+    """Yields lists of ``size`` consecutive elements, the last one possibly shorter"""
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
 
-    for p in papers:
-        if p.is_open_access:
-            n_oa += 1
-        elif p.oa_pathway is OAPathway.nocost:
-            n_pathway_nocost += 1
-        elif p.oa_pathway is OAPathway.other:
-            n_pathway_other += 1
-        elif p.is_open_access is None or p.oa_pathway is OAPathway.not_found:
-            n_unknown += 1
 
-    return n_oa, n_pathway_nocost, n_pathway_other, n_unknown
+def load_unpaywall_snapshot(jsonl_gzip_path):
+    """Yields records from unpaywall snapshot jsonl.gzip"""
+    with gzip.open(jsonl_gzip_path) as file:
+        for line in file:
+            yield json.loads(line)
+
+
+def calculate_metrics(papers: List[Union[PaperWithOAPathway, PaperRecord]]):
+    """Returns the number of papers that are OA, have a no cost or other pathway or
+    could not be determined. For large sets of papers, build ``PaperColumns`` from the
+    raw records instead of models, see ``fyscience.metrics``.
+    """
+    # Imported here, so that the provider modules using e.g. ``chunked`` don't need
+    # numpy
+    from fyscience.metrics import PaperColumns
+
+    return PaperColumns.from_papers(papers).metrics()
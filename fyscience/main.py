@@ -1,12 +1,15 @@
 import os
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exception_handlers import http_exception_handler
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from prometheus_client import CONTENT_TYPE_LATEST
 from starlette.exceptions import HTTPException
 
+from fyscience.clients import UpstreamError, close_clients
+from fyscience.monitoring import MetricsMiddleware, latest_metrics
 from fyscience.routers.api import api_router
 from fyscience.routers.html import html_router
 from fyscience.routers.deps import TEMPLATE_PATH
@@ -32,6 +35,18 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Request, upstream and cache metrics in the Prometheus text format"""
+    return Response(latest_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+
+@app.on_event("shutdown")
+async def shutdown_provider_clients():
+    await close_clients()
 
 
 @app.exception_handler(HTTPException)
@@ -49,6 +64,14 @@ async def human_friendly_error_pages(request: Request, exc: HTTPException):
     return await http_exception_handler(request, exc)
 
 
+@app.exception_handler(UpstreamError)
+async def upstream_error_pages(request: Request, exc: UpstreamError):
+    """E.g. author lookups, which can't be answered without the provider"""
+    return await human_friendly_error_pages(
+        request, HTTPException(502, f"The {exc.provider} API is unavailable")
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
 
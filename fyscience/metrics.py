@@ -0,0 +1,284 @@
+import os
+import json
+from array import array
+from collections import Counter
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Optional, Tuple, Union
+
+import numpy as np
+
+from fyscience.schemas import FullPaper, OAPathway, PaperRecord, PaperWithOAPathway
+
+
+Metrics = Tuple[int, int, int, int]
+
+PATHWAYS = list(OAPathway)
+PATHWAY_CODES = {pathway: code for code, pathway in enumerate(PATHWAYS)}
+
+UNKNOWN = -1
+NO_YEAR = 0
+
+GROUP_BY_COLUMNS = ("year", "issn", "publisher")
+
+SUMMARY_METRICS = ("n_oa", "n_pathway_nocost", "n_pathway_other", "n_unknown")
+
+
+class _Categories:
+    """Dictionary encoding of a string column, with ``UNKNOWN`` for missing values"""
+
+    def __init__(self):
+        self.codes = array("i")
+        self.categories: Dict[str, int] = {}
+
+    def append(self, value: Optional[str]):
+        if value is None:
+            self.codes.append(UNKNOWN)
+        else:
+            self.codes.append(self.categories.setdefault(value, len(self.categories)))
+
+    def to_numpy(self) -> Tuple[np.ndarray, np.ndarray]:
+        return (
+            np.frombuffer(self.codes, dtype=np.int32),
+            np.array(list(self.categories), dtype=str),
+        )
+
+
+class PaperColumns:
+    """Columnar representation of (doi, issn, is_oa, pathway, year, publisher) of a
+    set of papers, on which metrics are calculated as vectorized operations.
+
+    ISSNs and publishers are dictionary encoded, i.e. stored as codes into a list of
+    categories, DOIs as one UTF-8 buffer with offsets. Unknown values are ``UNKNOWN``
+    (is_oa, issn, publisher) and ``NO_YEAR`` respectively.
+    """
+
+    def __init__(
+        self,
+        doi_data: np.ndarray,
+        doi_offsets: np.ndarray,
+        is_oa: np.ndarray,
+        pathway: np.ndarray,
+        year: np.ndarray,
+        issn: np.ndarray,
+        issn_categories: np.ndarray,
+        publisher: np.ndarray,
+        publisher_categories: np.ndarray,
+    ):
+        self.doi_data = doi_data
+        self.doi_offsets = doi_offsets
+        self.is_oa = is_oa
+        self.pathway = pathway
+        self.year = year
+        self.issn = issn
+        self.issn_categories = issn_categories
+        self.publisher = publisher
+        self.publisher_categories = publisher_categories
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict]) -> "PaperColumns":
+        """Build columns from unpaywall records (e.g. ``load_unpaywall_snapshot``),
+        which may also carry an ``oa_pathway``, without creating a model per record.
+        """
+        doi_data = bytearray()
+        doi_offsets = array("q", [0])
+        is_oa = array("b")
+        pathway = array("b")
+        year = array("h")
+        issn = _Categories()
+        publisher = _Categories()
+
+        for record in records:
+            doi_data += record["doi"].encode("utf-8")
+            doi_offsets.append(len(doi_data))
+            is_oa.append(UNKNOWN if record.get("is_oa") is None else record["is_oa"])
+            pathway.append(
+                PATHWAY_CODES[OAPathway(record.get("oa_pathway", "not_attempted"))]
+            )
+            year.append(record.get("year") or NO_YEAR)
+            issn.append(record.get("journal_issn_l"))
+            publisher.append(record.get("publisher"))
+
+        return cls(
+            np.frombuffer(bytes(doi_data), dtype=np.uint8),
+            np.frombuffer(doi_offsets, dtype=np.int64),
+            np.frombuffer(is_oa, dtype=np.int8),
+            np.frombuffer(pathway, dtype=np.int8),
+            np.frombuffer(year, dtype=np.int16),
+            *issn.to_numpy(),
+            *publisher.to_numpy(),
+        )
+
+    @classmethod
+    def from_papers(
+        cls, papers: Iterable[Union[PaperWithOAPathway, FullPaper, PaperRecord]]
+    ) -> "PaperColumns":
+        return cls.from_records(
+            {
+                "doi": paper.doi,
+                "journal_issn_l": paper.issn,
+                "is_oa": paper.is_open_access,
+                "oa_pathway": paper.oa_pathway or OAPathway.not_attempted,
+                "year": getattr(paper, "year", None),
+            }
+            for paper in papers
+        )
+
+    def __len__(self) -> int:
+        return len(self.is_oa)
+
+    def doi(self, index: int) -> str:
+        start, end = self.doi_offsets[index], self.doi_offsets[index + 1]
+        return self.doi_data[start:end].tobytes().decode("utf-8")
+
+    def with_pathways(self, lookup: Callable[[str], OAPathway]) -> "PaperColumns":
+        """Set the pathway of all papers with an ISSN, calling ``lookup`` once per ISSN
+        instead of once per paper.
+        """
+        if not len(self.issn_categories):
+            return self
+
+        codes = np.array(
+            [PATHWAY_CODES[lookup(issn)] for issn in self.issn_categories],
+            dtype=np.int8,
+        )
+        has_issn = self.issn != UNKNOWN
+        issn_pathway = codes[np.where(has_issn, self.issn, 0)]
+        self.pathway = np.where(has_issn, issn_pathway, self.pathway)
+        return self
+
+    def _masks(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Same categorisation as ``fyscience.data.calculate_metrics``"""
+        oa = self.is_oa == 1
+        nocost = ~oa & (self.pathway == PATHWAY_CODES[OAPathway.nocost])
+        other = ~oa & (self.pathway == PATHWAY_CODES[OAPathway.other])
+        unknown = (
+            ~oa
+            & ~nocost
+            & ~other
+            & (
+                (self.is_oa == UNKNOWN)
+                | (self.pathway == PATHWAY_CODES[OAPathway.not_found])
+            )
+        )
+        return oa, nocost, other, unknown
+
+    def metrics(self) -> Metrics:
+        n_oa, n_nocost, n_other, n_unknown = (
+            int(np.count_nonzero(mask)) for mask in self._masks()
+        )
+        return n_oa, n_nocost, n_other, n_unknown
+
+    def metrics_by(self, column: str) -> Dict[Union[str, int, None], Metrics]:
+        """Metrics per year, issn or publisher, with unknown values grouped as None"""
+        if column == "year":
+            keys, inverse = np.unique(self.year, return_inverse=True)
+            keys = [None if key == NO_YEAR else int(key) for key in keys]
+        elif column in ("issn", "publisher"):
+            keys = [None] + getattr(self, f"{column}_categories").tolist()
+            inverse = getattr(self, column) + 1
+        else:
+            raise ValueError(
+                f"Can't group by '{column}', use one of {GROUP_BY_COLUMNS}"
+            )
+
+        counts = [
+            np.bincount(inverse, weights=mask, minlength=len(keys)).astype(np.int64)
+            for mask in self._masks()
+        ]
+        n_papers = np.bincount(inverse, minlength=len(keys))
+        return {
+            key: tuple(int(c[i]) for c in counts)
+            for i, key in enumerate(keys)
+            if n_papers[i]
+        }
+
+    def save(self, path: str):
+        """Save as (uncompressed) ``.npz``, which loads without parsing any records"""
+        with open(path, "wb") as fh:
+            np.savez(fh, **vars(self))
+
+    @classmethod
+    def load(cls, path: str) -> "PaperColumns":
+        with np.load(path, allow_pickle=False) as columns:
+            return cls(**{name: columns[name] for name in columns.files})
+
+
+def summarize(columns: PaperColumns) -> Dict[str, int]:
+    return {"n_papers": len(columns), **dict(zip(SUMMARY_METRICS, columns.metrics()))}
+
+
+def save_summary(path: str, columns: PaperColumns):
+    write_summary(path, summarize(columns))
+
+
+def write_summary(path: str, summary: Dict[str, int]):
+    """Replace the summary at ``path`` at once, as it may be read at the same time"""
+    with open(f"{path}.tmp", "w") as fh:
+        json.dump(
+            {key: summary.get(key, 0) for key in ("n_papers", *SUMMARY_METRICS)}, fh
+        )
+    os.replace(f"{path}.tmp", path)
+
+
+def _summary_metric(is_oa: Optional[bool], pathway: OAPathway) -> Optional[str]:
+    """Which of the summary's metrics a paper counts towards, if any, categorised like
+    by ``PaperColumns._masks``
+    """
+    if is_oa:
+        return "n_oa"
+    if pathway is OAPathway.nocost:
+        return "n_pathway_nocost"
+    if pathway is OAPathway.other:
+        return "n_pathway_other"
+    if is_oa is None or pathway is OAPathway.not_found:
+        return "n_unknown"
+    return None
+
+
+def summary_change(
+    lookup: Callable[[str], OAPathway],
+) -> Callable[[Optional[dict], dict], Dict[str, int]]:
+    """Return a function telling how replacing an ``UnpaywallIndex`` entry (None for a
+    new DOI) with an unpaywall record changes the summary, to keep it up to date while
+    ingesting changefiles (see ``UnpaywallIndex.ingest_changefile``) instead of
+    summarizing the whole snapshot again. ``lookup`` is called once per ISSN.
+    """
+    pathway = lru_cache(maxsize=None)(lookup)
+
+    def metric(is_oa: Optional[bool], issn: Optional[str]) -> Optional[str]:
+        return _summary_metric(
+            is_oa, OAPathway.not_attempted if issn is None else pathway(issn)
+        )
+
+    def change(entry: Optional[dict], record: dict) -> Dict[str, int]:
+        changes: Counter = Counter()
+        if entry is None:
+            changes["n_papers"] += 1
+        else:
+            old_metric = metric(entry["is_open_access"], entry["issn"])
+            if old_metric is not None:
+                changes[old_metric] -= 1
+
+        new_metric = metric(record.get("is_oa"), record.get("journal_issn_l"))
+        if new_metric is not None:
+            changes[new_metric] += 1
+
+        return changes
+
+    return change
+
+
+@lru_cache(maxsize=1)
+def _load_summary(path: str, mtime: float) -> dict:
+    with open(path, "r") as fh:
+        return json.load(fh)
+
+
+def load_summary(path: str) -> dict:
+    """Load the summary written by ``save_summary``, re-reading it once it changed"""
+    return _load_summary(path, os.path.getmtime(path))
+
+
+def format_count(n: int) -> str:
+    """Format counts as shown on the landing page, e.g. 46.796.300"""
+    return f"{n:,}".replace(",", ".")
@@ -0,0 +1,207 @@
+import os
+import time
+from typing import Any, Hashable, Optional
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from fyscience.cache import NOT_FOUND, set_not_found
+
+# Metrics are aggregated over all gunicorn workers, in case the environment variable
+# PROMETHEUS_MULTIPROC_DIR points to a directory the workers share, see gunicorn_conf.py
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+if MULTIPROC_DIR_ENV in os.environ:
+    # Not only for the workers, whose directory gunicorn creates, but e.g. for the
+    # scripts run in the same container
+    os.makedirs(os.environ[MULTIPROC_DIR_ENV], exist_ok=True)
+
+# Seconds, from fast cache hits to slow author pages and timed out upstream requests
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+REQUEST_LATENCY = Histogram(
+    "fyscience_request_duration_seconds",
+    "Time until requests were answered completely, per route",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS = Counter(
+    "fyscience_requests_total",
+    "Requests answered, per route and status",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "fyscience_requests_in_progress",
+    "Requests currently being answered, per route",
+    ["method", "route"],
+    multiprocess_mode="livesum",
+)
+UPSTREAM_LATENCY = Histogram(
+    "fyscience_upstream_request_duration_seconds",
+    "Time until upstream requests were answered (or failed), per provider",
+    ["provider"],
+    buckets=LATENCY_BUCKETS,
+)
+UPSTREAM_RESPONSES = Counter(
+    "fyscience_upstream_responses_total",
+    "Upstream responses, per provider and status",
+    ["provider", "status"],
+)
+UPSTREAM_ERRORS = Counter(
+    "fyscience_upstream_errors_total",
+    "Upstream requests that failed without response or weren't made, per provider "
+    "and error, e.g. ConnectTimeout, circuit_open or rate_limited",
+    ["provider", "error"],
+)
+UPSTREAM_IN_PROGRESS = Gauge(
+    "fyscience_upstream_requests_in_progress",
+    "Upstream requests currently waiting for a response, per provider",
+    ["provider"],
+    multiprocess_mode="livesum",
+)
+CACHE_LOOKUPS = Counter(
+    "fyscience_cache_lookups_total",
+    "Cache lookups, per cache and result (hit or miss)",
+    ["cache", "result"],
+)
+
+_MISSING = object()
+
+
+def observe_upstream(
+    provider: str,
+    seconds: float,
+    status: Optional[int] = None,
+    error: Optional[str] = None,
+):
+    """Record an upstream request, which either got a response with ``status`` or
+    failed with ``error``.
+    """
+    UPSTREAM_LATENCY.labels(provider).observe(seconds)
+    if status is not None:
+        UPSTREAM_RESPONSES.labels(provider, str(status)).inc()
+    if error is not None:
+        UPSTREAM_ERRORS.labels(provider, error).inc()
+
+
+def count_upstream_error(provider: str, error: str):
+    """Record a request that wasn't made, e.g. as the provider's circuit is open"""
+    UPSTREAM_ERRORS.labels(provider, error).inc()
+
+
+class MonitoredCache:
+    """Counts the hits and misses of the lookups in a cache as ``CACHE_LOOKUPS``,
+    where negative entries (see ``set_not_found``) count as hits.
+
+    Exposes ``get(key, default)`` and ``__setitem__`` like the cache itself.
+    """
+
+    def __init__(self, cache, name: str):
+        self.cache = cache
+        self.name = name
+        self._hits = CACHE_LOOKUPS.labels(name, "hit")
+        self._misses = CACHE_LOOKUPS.labels(name, "miss")
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value = self.cache.get(key, _MISSING)
+        if value is _MISSING:
+            self._misses.inc()
+            return default
+
+        self._hits.inc()
+        return value
+
+    def __setitem__(self, key: Hashable, value: Any):
+        self.cache[key] = value
+
+    def set_not_found(self, key: Hashable, value: Any = NOT_FOUND):
+        set_not_found(self.cache, key, value)
+
+    def __len__(self) -> int:
+        return len(self.cache)
+
+    def stats(self) -> dict:
+        return self.cache.stats()
+
+
+def _route(scope: Scope) -> str:
+    """Path template of the route a request is for, which unlike the path itself
+    doesn't make for a label value per DOI or author.
+    """
+    partial = None
+    for route in scope["app"].routes:
+        match, _ = route.matches(scope)
+        if match is Match.FULL:
+            return route.path
+        if match is Match.PARTIAL and partial is None:
+            partial = route.path
+
+    return "unmatched" if partial is None else partial
+
+
+class MetricsMiddleware:
+    """Records the latency, status and number in progress of the requests per route,
+    where streamed responses count until their last chunk was sent, while background
+    tasks run after the response was sent don't count.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method, route = scope["method"], _route(scope)
+        status = 500
+        start = time.perf_counter()
+        in_progress = REQUESTS_IN_PROGRESS.labels(method, route)
+        in_progress.inc()
+        answered = False
+
+        def answer():
+            nonlocal answered
+            if not answered:
+                answered = True
+                in_progress.dec()
+                REQUEST_LATENCY.labels(method, route).observe(
+                    time.perf_counter() - start
+                )
+                REQUESTS.labels(method, route, str(status)).inc()
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get(
+                "more_body", False
+            ):
+                answer()
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # In case the app failed before the response was sent completely
+            answer()
+
+
+def latest_metrics() -> bytes:
+    """All metrics in the Prometheus text format, i.e. of all workers in case of
+    ``PROMETHEUS_MULTIPROC_DIR`` and of this process otherwise.
+    """
+    if MULTIPROC_DIR_ENV not in os.environ:
+        return generate_latest(REGISTRY)
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
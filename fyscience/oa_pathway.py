@@ -1,39 +1,60 @@
 from copy import deepcopy
-from typing import Optional, Union
+from typing import List, Optional, Tuple, Union
 
+from fyscience.cache import set_not_found
+from fyscience.clients import UpstreamError
 from fyscience.schemas import (
     OAPathway,
     PaperWithOAStatus,
     PaperWithOAPathway,
     FullPaper,
+    PaperRecord,
+    add_failed_provider,
 )
+from fyscience.sherpa import Policy, intern_policies
 from fyscience.sherpa import get_pathway as sherpa_pathway_api
+from fyscience.sherpa import get_pathway_async as sherpa_pathway_api_async
 
 
-def oa_pathway(
-    paper: Union[PaperWithOAStatus, FullPaper],
-    cache=None,
-    api_key: Optional[str] = None,
-) -> Union[PaperWithOAStatus, FullPaper]:
-    """Enrich a given paper with information about the available open access pathway
-    collected from the Sherpa API.
-
-    Cache can be anything that exposes ``get(key, default)`` and ``__setitem__``
+def _from_cache(
+    cache, issn: str
+) -> Optional[Tuple[OAPathway, Optional[str], Optional[List[dict]]]]:
+    """Look up the ``(pathway, uri, details)`` of an ISSN in the cache, which can also
+    contain bare pathways (e.g. from caches written by earlier versions of the scripts)
+    and JSON decoded entries, whose policies are interned.
     """
-    details, pathway_uri = None, None
-    if paper.is_open_access:
-        pathway = OAPathway.already_oa
-    elif paper.is_open_access is None:
-        pathway = OAPathway.not_attempted
+    cached = cache.get(issn, None)
+    if cached is None:
+        return None
+
+    if isinstance(cached, str):
+        return OAPathway(cached), None, None
+
+    pathway, pathway_uri, details = cached
+    return OAPathway(pathway), pathway_uri, intern_policies(details)
+
+
+def _to_cache(
+    cache,
+    issn: str,
+    pathway: Tuple[OAPathway, Optional[str], Optional[List[dict]]],
+):
+    """ISSNs without policy are cached as negative entries, see ``set_not_found``"""
+    if cache is None:
+        return
+
+    if pathway[0] is OAPathway.not_found:
+        set_not_found(cache, issn, pathway)
     else:
-        if cache is not None:
-            pathway = cache.get(paper.issn, None)
-            if not pathway:
-                pathway, pathway_uri, details = sherpa_pathway_api(paper.issn, api_key)
-                cache[paper.issn] = pathway
-        else:
-            pathway, pathway_uri, details = sherpa_pathway_api(paper.issn, api_key)
+        cache[issn] = pathway
+
 
+def _with_pathway(
+    paper: Union[PaperWithOAStatus, FullPaper, PaperRecord],
+    pathway: OAPathway,
+    pathway_uri: Optional[str],
+    details: Optional[List[dict]],
+) -> Union[PaperWithOAStatus, FullPaper, PaperRecord]:
     if isinstance(paper, PaperWithOAStatus):
         return PaperWithOAPathway(
             oa_pathway=pathway,
@@ -48,8 +69,77 @@ def oa_pathway(
         return paper
 
 
+def oa_pathway(
+    paper: Union[PaperWithOAStatus, FullPaper, PaperRecord],
+    cache=None,
+    api_key: Optional[str] = None,
+) -> Union[PaperWithOAStatus, FullPaper, PaperRecord]:
+    """Enrich a given paper with information about the available open access pathway
+    collected from the Sherpa API.
+
+    Cache can be anything that exposes ``get(key, default)`` and ``__setitem__`` and
+    is filled with ``(pathway, uri, details)`` per ISSN. In case Sherpa fails to
+    answer, the pathway is ``not_found`` but, unlike for ISSNs without policy, this
+    is not cached, and a ``FullPaper`` lists Sherpa in its ``failed_providers``.
+
+    ``FullPaper`` and ``PaperRecord`` are enriched in place, whereas a
+    ``PaperWithOAPathway`` is validated and constructed for a ``PaperWithOAStatus``.
+    """
+    details, pathway_uri = None, None
+    if paper.is_open_access:
+        pathway = OAPathway.already_oa
+    elif paper.is_open_access is None:
+        pathway = OAPathway.not_attempted
+    else:
+        cached = None if cache is None else _from_cache(cache, paper.issn)
+        if cached is None:
+            try:
+                cached = sherpa_pathway_api(paper.issn, api_key)
+            except UpstreamError:
+                # Looked up again next time, as opposed to ISSNs without policy
+                add_failed_provider(paper, "sherpa")
+                cached = OAPathway.not_found, None, None
+            else:
+                _to_cache(cache, paper.issn, cached)
+        pathway, pathway_uri, details = cached
+
+    return _with_pathway(paper, pathway, pathway_uri, details)
+
+
+async def oa_pathway_async(
+    paper: Union[PaperWithOAStatus, FullPaper, PaperRecord],
+    cache=None,
+    api_key: Optional[str] = None,
+) -> Union[PaperWithOAStatus, FullPaper, PaperRecord]:
+    """Async version of ``oa_pathway``."""
+    details, pathway_uri = None, None
+    if paper.is_open_access:
+        pathway = OAPathway.already_oa
+    elif paper.is_open_access is None:
+        pathway = OAPathway.not_attempted
+    else:
+        cached = None if cache is None else _from_cache(cache, paper.issn)
+        if cached is None:
+            try:
+                cached = await sherpa_pathway_api_async(paper.issn, api_key)
+            except UpstreamError:
+                # Looked up again next time, as opposed to ISSNs without policy
+                add_failed_provider(paper, "sherpa")
+                cached = OAPathway.not_found, None, None
+            else:
+                _to_cache(cache, paper.issn, cached)
+        pathway, pathway_uri, details = cached
+
+    return _with_pathway(paper, pathway, pathway_uri, details)
+
+
 def remove_costly_oa_from_publisher_policy(policy: dict) -> dict:
-    """A potential input is ``FullPaper.oa_pathway_details[i]``"""
+    """A potential input is ``FullPaper.oa_pathway_details[i]``, which is an interned
+    ``Policy`` that has the result precomputed, unless constructed elsewhere.
+    """
+    if isinstance(policy, Policy):
+        return policy.no_cost()
+
     _policy = deepcopy(policy)
 
     _policy["permitted_oa"] = [
@@ -1,15 +1,49 @@
 from typing import Union
 
-from fyscience.schemas import Paper, PaperWithOAStatus, FullPaper
+from fyscience.clients import UpstreamError
+from fyscience.schemas import (
+    Paper,
+    PaperWithOAStatus,
+    PaperRecord,
+    FullPaper,
+    add_failed_provider,
+)
 from fyscience.unpaywall import get_paper as unpaywall_get_paper
 from fyscience.semantic_scholar import get_paper as s2_get_paper
+from fyscience.semantic_scholar import get_paper_async as s2_get_paper_async
 
 
 def validate_oa_status_from_s2(
-    paper: Union[PaperWithOAStatus, FullPaper], api_key: str = None
-) -> Union[PaperWithOAStatus, FullPaper]:
+    paper: Union[PaperWithOAStatus, FullPaper, PaperRecord],
+    api_key: str = None,
+    cache=None,
+) -> Union[PaperWithOAStatus, FullPaper, PaperRecord]:
     if not paper.is_open_access:
-        s2_paper = s2_get_paper(paper.doi, api_key)
+        try:
+            s2_paper = s2_get_paper(paper.doi, api_key, cache)
+        except UpstreamError:
+            # Keep the status as is, in case Semantic Scholar fails to answer
+            add_failed_provider(paper, "semantic_scholar")
+            return paper
+        if s2_paper is not None and s2_paper.is_open_access is not None:
+            paper.is_open_access = s2_paper.is_open_access
+            paper.oa_location_url = s2_paper.oa_location_url
+
+    return paper
+
+
+async def validate_oa_status_from_s2_async(
+    paper: Union[PaperWithOAStatus, FullPaper, PaperRecord],
+    api_key: str = None,
+    cache=None,
+) -> Union[PaperWithOAStatus, FullPaper, PaperRecord]:
+    if not paper.is_open_access:
+        try:
+            s2_paper = await s2_get_paper_async(paper.doi, api_key, cache)
+        except UpstreamError:
+            # Keep the status as is, in case Semantic Scholar fails to answer
+            add_failed_provider(paper, "semantic_scholar")
+            return paper
         if s2_paper is not None and s2_paper.is_open_access is not None:
             paper.is_open_access = s2_paper.is_open_access
             paper.oa_location_url = s2_paper.oa_location_url
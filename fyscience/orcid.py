@@ -1,14 +1,16 @@
 import re
-from typing import Optional
+from typing import Dict, Optional
 
 import requests
 import xml.etree.ElementTree as ET
 
+from fyscience import clients
 from fyscience.schemas import FullPaper, Author
 
 # TODO: Add API key for prod setting
 
 EXT_IDS = "{http://www.orcid.org/ns/common}external-ids"
+EXT_ID = "{http://www.orcid.org/ns/common}external-id"
 EXT_ID_TYPE = "{http://www.orcid.org/ns/common}external-id-type"
 EXT_ID_VALUE = "{http://www.orcid.org/ns/common}external-id-value"
 CREDIT_NAME = "{http://www.orcid.org/ns/personal-details}credit-name"
@@ -16,47 +18,124 @@ FAMILY_NAME = "{http://www.orcid.org/ns/personal-details}family-name"
 GIVEN_NAMES = "{http://www.orcid.org/ns/personal-details}given-names"
 WORKS = "{http://www.orcid.org/ns/activities}works"
 
+NAMES = (CREDIT_NAME, GIVEN_NAMES, FAMILY_NAME)
+
+# Bytes of the response body to parse at once while it is being downloaded
+CHUNK_SIZE = 64 * 1024
+
+
+class _AuthorParser:
+    """Parses the author name and DOI/ISSN pairs of their works from an ORCID record
+    in one pass, while the record is fed to it chunk by chunk, clearing elements as
+    soon as they are read so that the record is never held in memory as a whole.
+    """
+
+    def __init__(self, orcid: str):
+        self.orcid = orcid
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._names: Dict[str, Optional[str]] = {}
+        self._works_depth = 0
+        self._id_type: Optional[str] = None
+        self._id_value: Optional[str] = None
+        self._doi: Optional[str] = None
+        self._issn: Optional[str] = None
+        self._dois_with_issn: Dict[str, Optional[str]] = {}
+
+    def feed(self, data: bytes):
+        self._parser.feed(data)
+        self._read_events()
+
+    def close(self) -> Author:
+        self._parser.close()
+        self._read_events()
+
+        author_name = self._names.get(CREDIT_NAME)
+        if author_name is None:
+            names = (self._names.get(GIVEN_NAMES), self._names.get(FAMILY_NAME))
+            author_name = " ".join(name for name in names if name)
+
+        papers = [
+            FullPaper(doi=doi, issn=issn) for doi, issn in self._dois_with_issn.items()
+        ]
+        return Author(
+            name=author_name,
+            papers=papers,
+            provider="orcid",
+            profile_url=f"https://orcid.org/{self.orcid}",
+        )
+
+    def _read_events(self):
+        for event, element in self._parser.read_events():
+            tag = element.tag
+            if event == "start":
+                if tag == WORKS:
+                    self._works_depth += 1
+                continue
+
+            if tag == WORKS:
+                self._works_depth -= 1
+            elif tag in NAMES:
+                self._names.setdefault(tag, element.text)
+            elif self._works_depth:
+                self._read_works_element(tag, element.text)
+
+            element.clear()
+
+    def _read_works_element(self, tag: str, text: Optional[str]):
+        if tag == EXT_ID_TYPE:
+            self._id_type = text
+        elif tag == EXT_ID_VALUE:
+            self._id_value = text
+        elif tag == EXT_ID:
+            if self._id_type == "doi":
+                self._doi = self._id_value
+            elif self._id_type == "issn":
+                self._issn = self._id_value
+            self._id_type, self._id_value = None, None
+        elif tag == EXT_IDS:
+            doi, issn = self._doi, self._issn
+            if doi is not None and issn is not None:
+                self._dois_with_issn[doi] = issn
+            elif doi is not None and doi not in self._dois_with_issn:
+                self._dois_with_issn[doi] = None
+            self._doi, self._issn = None, None
+
+
+def _parse_author(orcid: str, content: bytes) -> Author:
+    parser = _AuthorParser(orcid)
+    parser.feed(content)
+    return parser.close()
+
 
 def get_author_with_papers(orcid: str) -> Optional[Author]:
-    r = requests.get(f"https://pub.orcid.org/{orcid}")
-    if not r.ok:
-        # TODO: Log and/or handle differently
-        return None
-
-    xml = r.content.decode()
-    root = ET.fromstring(xml)
-
-    credit_name = list(root.iter(CREDIT_NAME))
-    if credit_name:
-        author_name = credit_name[0].text
-    else:
-        given_names = list(root.iter(GIVEN_NAMES))[0].text
-        faily_name = list(root.iter(FAMILY_NAME))[0].text
-        author_name = f"{given_names} {faily_name}"
-
-    works = list(root.iter(WORKS))[0]
-    external_ids = [eid for eid in works.iter(EXT_IDS)]
-    dois_with_issn = {}
-    for eids in external_ids:
-        doi, issn = None, None
-        for child in eids:
-            if child.find(EXT_ID_TYPE).text == "doi":
-                doi = child.find(EXT_ID_VALUE).text
-            elif child.find(EXT_ID_TYPE).text == "issn":
-                issn = child.find(EXT_ID_VALUE).text
-
-        if doi is not None and issn is not None:
-            dois_with_issn[doi] = issn
-        elif doi is not None and doi not in dois_with_issn:
-            dois_with_issn[doi] = None
-
-    papers = [FullPaper(doi=doi, issn=issn) for doi, issn in dois_with_issn.items()]
-    return Author(
-        name=author_name,
-        papers=papers,
-        provider="orcid",
-        profile_url=f"https://orcid.org/{orcid}",
+    url = f"https://pub.orcid.org/{orcid}"
+    r = clients.call(
+        "orcid",
+        lambda: requests.get(url, stream=True, timeout=clients.SYNC_TIMEOUT),
     )
+    with r:
+        if not r.ok:
+            # TODO: Log and/or handle differently
+            return None
+
+        parser = _AuthorParser(orcid)
+        for chunk in r.iter_content(CHUNK_SIZE):
+            parser.feed(chunk)
+
+    return parser.close()
+
+
+async def get_author_with_papers_async(orcid: str) -> Optional[Author]:
+    async with clients.stream("orcid", f"https://pub.orcid.org/{orcid}") as r:
+        if not r.is_success:
+            # TODO: Log and/or handle differently
+            return None
+
+        parser = _AuthorParser(orcid)
+        async for chunk in r.aiter_bytes(CHUNK_SIZE):
+            parser.feed(chunk)
+
+    return parser.close()
 
 
 def is_orcid(orcid: str) -> bool:
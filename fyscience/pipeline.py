@@ -0,0 +1,94 @@
+import os
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Callable, Iterable, Optional, Tuple, Union
+
+from fyscience.data import calculate_metrics, chunked
+from fyscience.schemas import PaperRecord, PaperWithOAPathway, PaperWithOAStatus
+
+
+Metrics = Tuple[int, int, int, int]
+
+NO_METRICS: Metrics = (0, 0, 0, 0)
+
+
+def load_checkpoint(
+    path: Optional[str], run: Optional[dict] = None
+) -> Tuple[int, Metrics]:
+    """Return the number of papers processed and the metrics calculated for them so
+    far, as saved by ``save_checkpoint``, or nothing done if there is no checkpoint
+    or it was saved for another ``run`` (e.g. other input or limit).
+    """
+    if path is None or not os.path.exists(path):
+        return 0, NO_METRICS
+
+    with open(path, "r") as fh:
+        checkpoint = json.load(fh)
+
+    if checkpoint.get("run") != run:
+        return 0, NO_METRICS
+
+    return checkpoint["n_processed"], tuple(checkpoint["metrics"])
+
+
+def save_checkpoint(
+    path: str, n_processed: int, metrics: Metrics, run: Optional[dict] = None
+):
+    """Atomically replace the checkpoint, so that a crash never leaves a partial one"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as fh:
+        json.dump(
+            {"run": run, "n_processed": n_processed, "metrics": list(metrics)}, fh
+        )
+    os.replace(tmp_path, path)
+
+
+def run_pipeline(
+    papers: Iterable[Union[PaperWithOAStatus, PaperRecord]],
+    enrich: Callable[
+        [Union[PaperWithOAStatus, PaperRecord]], Union[PaperWithOAPathway, PaperRecord]
+    ],
+    workers: int = 8,
+    chunk_size: int = 1000,
+    checkpoint_path: Optional[str] = None,
+    report: Callable[[str], None] = print,
+    run: Optional[dict] = None,
+) -> Tuple[int, Metrics]:
+    """Enrich papers chunk by chunk on a pool of ``workers`` threads and return the
+    number of papers processed along with their metrics (see ``calculate_metrics``).
+
+    After each chunk the progress is saved to ``checkpoint_path``, from which a later
+    run over the same papers resumes, i.e. one with the same ``run`` (a JSON
+    serializable description of the input, e.g. its path and limit), while other runs
+    start over. The checkpoint is deleted once all papers are processed. Caches used
+    by ``enrich`` should persist their entries as they are written (e.g.
+    ``SQLiteCache``).
+    """
+    n_processed, metrics = load_checkpoint(checkpoint_path, run)
+    if n_processed:
+        report(f"Resuming after {n_processed} papers")
+
+    start = time.monotonic()
+    n_new = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for chunk in chunked(islice(papers, n_processed, None), chunk_size):
+            chunk_metrics = calculate_metrics(executor.map(enrich, chunk))
+            metrics = tuple(total + n for total, n in zip(metrics, chunk_metrics))
+            n_processed += len(chunk)
+            n_new += len(chunk)
+
+            if checkpoint_path is not None:
+                save_checkpoint(checkpoint_path, n_processed, metrics, run)
+
+            elapsed = time.monotonic() - start
+            report(
+                f"{n_processed} papers processed "
+                f"({n_new / elapsed if elapsed else 0:.1f} papers/s)"
+            )
+
+    if checkpoint_path is not None and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    return n_processed, metrics
@@ -0,0 +1,96 @@
+import time
+import threading
+from typing import Callable, Optional, Tuple
+
+from fyscience.cache import connect_sqlite
+
+
+class TokenBucket:
+    """Rate limiter allowing ``rate`` requests per second on average and bursts of up
+    to ``burst`` requests, implemented as generic cell rate algorithm, i.e. by keeping
+    track of the time at which the bucket is full again.
+
+    Rather than taking tokens, callers reserve them and wait the returned number of
+    seconds before making their request.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self.interval = 1 / rate
+        self.tolerance = burst * self.interval
+        self._full_at = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait: Optional[float] = None) -> Optional[float]:
+        """Reserve a token and return the seconds to wait for it, or None without
+        reserving if that would be longer than ``max_wait``.
+        """
+
+        def update(full_at: float, now: float) -> Tuple[float, Optional[float]]:
+            next_full_at = max(full_at, now) + self.interval
+            wait = max(0.0, next_full_at - self.tolerance - now)
+            if max_wait is not None and wait > max_wait:
+                return full_at, None
+            return next_full_at, wait
+
+        return self._update(update)
+
+    def pause(self, seconds: float):
+        """Hand out no tokens for the next ``seconds``, e.g. as told by a provider's
+        ``Retry-After`` header.
+        """
+
+        def update(full_at: float, now: float) -> Tuple[float, None]:
+            return max(full_at, now + seconds + self.tolerance - self.interval), None
+
+        self._update(update)
+
+    def _update(
+        self, update: Callable[[float, float], Tuple[float, Optional[float]]]
+    ) -> Optional[float]:
+        with self._lock:
+            self._full_at, result = update(self._full_at, time.time())
+        return result
+
+
+class SQLiteTokenBucket(TokenBucket):
+    """``TokenBucket`` whose state is kept in a SQLite database, so that it is shared
+    by all processes on a host (e.g. gunicorn workers and scripts), one per ``name``.
+    """
+
+    def __init__(self, path: str, name: str, rate: float, burst: int = 1):
+        super().__init__(rate, burst)
+        self.path = path
+        self.name = name
+        self._connection = connect_sqlite(path)
+        # Updated on every request, which mustn't wait for the disk each time, while
+        # losing the last updates on power loss only lets a few requests through
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS token_buckets ("
+            " name TEXT PRIMARY KEY,"
+            " full_at REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+
+    def _update(
+        self, update: Callable[[float, float], Tuple[float, Optional[float]]]
+    ) -> Optional[float]:
+        with self._lock:
+            # Taking the write lock up front serialises the update across processes
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._connection.execute(
+                    "SELECT full_at FROM token_buckets WHERE name = ?", (self.name,)
+                ).fetchone()
+                full_at, result = update(0.0 if row is None else row[0], time.time())
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO token_buckets VALUES (?, ?)",
+                    (self.name, full_at),
+                )
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+        return result
@@ -1,45 +1,94 @@
 import json
+import asyncio
+import hashlib
+from collections import Counter
+from contextlib import contextmanager
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    TypeVar,
+    Union,
+)
 
-from fastapi import APIRouter, HTTPException, Depends, Request
+import orjson
+
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from loguru import logger
 
-from fyscience.schemas import OAPathway, FullPaper, Author
-from fyscience.unpaywall import get_paper as unpaywall_get_paper
-from fyscience.oa_pathway import oa_pathway, remove_costly_oa_from_publisher_policy
-from fyscience.oa_status import validate_oa_status_from_s2
-from fyscience import orcid, semantic_scholar, crossref
-from fyscience.routers.deps import get_settings, Settings
+from fyscience.cache import set_not_found
+from fyscience.clients import DeadlineExceeded, UpstreamError
+from fyscience.schemas import (
+    OAPathway,
+    FullPaper,
+    Author,
+    PaperBatch,
+    PaperBatchWithPolicies,
+    StreamFormat,
+    add_failed_provider,
+)
+from fyscience.unpaywall import get_paper_async as unpaywall_get_paper_async
+from fyscience.oa_pathway import (
+    oa_pathway_async,
+    remove_costly_oa_from_publisher_policy,
+)
+from fyscience.oa_status import validate_oa_status_from_s2_async
+from fyscience import clients, orcid, semantic_scholar, crossref, singleflight
+from fyscience.sherpa import intern_policies, intern_policy
+from fyscience.routers.deps import (
+    get_settings,
+    get_provider_caches,
+    get_s2_cache,
+    get_etag_cache,
+    get_paper_cache,
+    response_max_age,
+    response_negative_max_age,
+    Cache,
+    ProviderCaches,
+    Settings,
+)
 
 
-api_router = APIRouter()
+api_router = APIRouter(default_response_class=ORJSONResponse)
 
 # TODO: Sanitize user input
 
 
-def _construct_paper(
-    doi: str, unpaywall_email: str, sherpa_api_key: str, s2_api_key: str
-) -> FullPaper:
+T = TypeVar("T")
 
-    paper = unpaywall_get_paper(doi=doi, email=unpaywall_email)
-    if paper is None:
-        paper = FullPaper(doi=doi)
+# Number of warm-ups and requests constructing the paper of a DOI at the moment
+_papers_in_flight: Counter = Counter()
+
+NO_CACHES = ProviderCaches(unpaywall=None, semantic_scholar=None, sherpa=None)
+
+STREAM_MEDIA_TYPES = {
+    StreamFormat.ndjson: "application/x-ndjson",
+    StreamFormat.sse: "text/event-stream",
+}
+
+NOT_MODIFIED = {304: {"description": "Not modified since the given ETag"}}
 
+
+def _is_paywalled_without_issn(paper: FullPaper) -> bool:
     if paper.issn is None and not paper.is_open_access:
         logger.warning(
             {
                 "message": "no_issn_for_paywalled_pub",
                 "provider": "unpaywall",
-                "doi": doi,
+                "doi": paper.doi,
                 "paper": json.dumps(paper.dict()),
             }
         )
-        return paper
+        return True
+
+    return False
 
-    # TODO: Don't do this twice if the author papers already have the s2 status
-    #       Potentially move towards an enrich as opposed to a construct approach
-    paper = validate_oa_status_from_s2(paper, s2_api_key)
 
-    paper = oa_pathway(paper=paper, api_key=sherpa_api_key)
+def _log_missing_policy(paper: FullPaper):
     if paper.oa_pathway is OAPathway.not_found:
         logger.warning(
             {
@@ -50,9 +99,247 @@ def _construct_paper(
             }
         )
 
+
+async def _unless_upstream_error(
+    awaitable: Awaitable[T], paper: FullPaper
+) -> Optional[T]:
+    """Await a provider lookup for a paper, treating a provider failing to answer like
+    it not knowing what was looked up, while the latter is cached and the former isn't,
+    i.e. the provider is added to the paper's ``failed_providers``.
+    """
+    try:
+        return await awaitable
+    except UpstreamError as e:
+        logger.warning(
+            {"message": "upstream_error", "provider": e.provider, "error": str(e)}
+        )
+        add_failed_provider(paper, e.provider)
+        return None
+
+
+async def _before_deadline(
+    provider: str, awaitable: Awaitable[T], paper: FullPaper
+) -> Optional[T]:
+    """Await a provider lookup for a paper, unless the request's deadline (see
+    ``clients.deadline``) passes first, in which case the provider is added to the
+    paper's ``skipped_providers`` and None is returned.
+    """
+    left = clients.remaining()
+    try:
+        return await asyncio.wait_for(awaitable, None if left is None else max(0, left))
+    except (asyncio.TimeoutError, DeadlineExceeded):
+        logger.info({"message": "provider_skipped", "provider": provider})
+        _skip(paper, provider)
+        return None
+
+
+def _skip(paper: FullPaper, provider: str):
+    paper.skipped_providers = [*(paper.skipped_providers or []), provider]
+
+
+def _was_skipped(paper: FullPaper, provider: str) -> bool:
+    return provider in (paper.skipped_providers or [])
+
+
+def _has_failed(paper: FullPaper, provider: str) -> bool:
+    return provider in (paper.failed_providers or [])
+
+
+def _skip_after_unpaywall(paper: FullPaper) -> bool:
+    """Skip the providers consulted after Unpaywall as well in case Unpaywall was
+    skipped, as they depend on its ISSN and OA status. Returns whether it was.
+    """
+    if not _was_skipped(paper, "unpaywall"):
+        return False
+
+    _skip(paper, "semantic_scholar")
+    _skip(paper, "sherpa")
+    return True
+
+
+async def _construct_paper(
+    doi: str,
+    unpaywall_email: str,
+    sherpa_api_key: str,
+    s2_api_key: str,
+    caches: ProviderCaches = NO_CACHES,
+    deadline: Optional[float] = None,
+) -> FullPaper:
+    """Look up a paper at Unpaywall, Semantic Scholar and Sherpa in turn, returning
+    what is known once ``deadline`` seconds have passed, with the providers that
+    weren't consulted until then listed in ``FullPaper.skipped_providers``.
+    """
+    with clients.deadline(deadline):
+        return await _enrich_paper(
+            doi, unpaywall_email, sherpa_api_key, s2_api_key, caches
+        )
+
+
+async def _enrich_paper(
+    doi: str,
+    unpaywall_email: str,
+    sherpa_api_key: str,
+    s2_api_key: str,
+    caches: ProviderCaches,
+) -> FullPaper:
+    partial_paper = FullPaper(doi=doi)
+    paper = await _before_deadline(
+        "unpaywall",
+        _unless_upstream_error(
+            unpaywall_get_paper_async(
+                doi=doi, email=unpaywall_email, cache=caches.unpaywall
+            ),
+            partial_paper,
+        ),
+        partial_paper,
+    )
+    if paper is None:
+        paper = partial_paper
+
+    if _skip_after_unpaywall(paper) or _is_paywalled_without_issn(paper):
+        return paper
+
+    # TODO: Don't do this twice if the author papers already have the s2 status
+    #       Potentially move towards an enrich as opposed to a construct approach
+    validated_paper = await _before_deadline(
+        "semantic_scholar",
+        validate_oa_status_from_s2_async(paper, s2_api_key, caches.semantic_scholar),
+        paper,
+    )
+    if validated_paper is not None:
+        paper = validated_paper
+
+    paper_with_pathway = await _before_deadline(
+        "sherpa",
+        oa_pathway_async(paper=paper, cache=caches.sherpa, api_key=sherpa_api_key),
+        paper,
+    )
+    if paper_with_pathway is not None:
+        paper = paper_with_pathway
+    _log_missing_policy(paper)
+
     return paper
 
 
+async def _construct_papers(
+    dois: List[str],
+    unpaywall_email: str,
+    sherpa_api_key: str,
+    s2_api_key: str,
+    concurrency: int,
+    caches: ProviderCaches = NO_CACHES,
+    deadline: Optional[float] = None,
+) -> List[FullPaper]:
+    """Batch version of ``_construct_paper``, which enriches all papers concurrently
+    with at most ``concurrency`` requests in flight per provider, and only queries
+    Sherpa once per distinct ISSN in the batch. The ``deadline`` applies to the
+    batch as a whole.
+    """
+    with clients.deadline(deadline):
+        return await _enrich_papers(
+            dois, unpaywall_email, sherpa_api_key, s2_api_key, concurrency, caches
+        )
+
+
+async def _enrich_papers(
+    dois: List[str],
+    unpaywall_email: str,
+    sherpa_api_key: str,
+    s2_api_key: str,
+    concurrency: int,
+    caches: ProviderCaches,
+) -> List[FullPaper]:
+    limits = {
+        provider: asyncio.Semaphore(concurrency)
+        for provider in ("unpaywall", "semantic_scholar", "sherpa")
+    }
+
+    async def limited(provider: str, awaitable: Awaitable[T]) -> T:
+        async with limits[provider]:
+            return await awaitable
+
+    partial_papers = [FullPaper(doi=doi) for doi in dois]
+    papers = await asyncio.gather(
+        *(
+            limited(
+                "unpaywall",
+                _before_deadline(
+                    "unpaywall",
+                    _unless_upstream_error(
+                        unpaywall_get_paper_async(
+                            doi=p.doi, email=unpaywall_email, cache=caches.unpaywall
+                        ),
+                        p,
+                    ),
+                    p,
+                ),
+            )
+            for p in partial_papers
+        )
+    )
+    papers = [
+        partial_paper if paper is None else paper
+        for partial_paper, paper in zip(partial_papers, papers)
+    ]
+
+    to_enrich = [
+        p
+        for p in papers
+        if not (_skip_after_unpaywall(p) or _is_paywalled_without_issn(p))
+    ]
+    await asyncio.gather(
+        *(
+            limited(
+                "semantic_scholar",
+                _before_deadline(
+                    "semantic_scholar",
+                    validate_oa_status_from_s2_async(
+                        p, s2_api_key, caches.semantic_scholar
+                    ),
+                    p,
+                ),
+            )
+            for p in to_enrich
+        )
+    )
+
+    # One representative paper per ISSN, whose pathway is shared with the others
+    pathway_papers = {p.issn: p for p in to_enrich if p.is_open_access is False}
+    await asyncio.gather(
+        *(
+            limited(
+                "sherpa",
+                _before_deadline(
+                    "sherpa",
+                    oa_pathway_async(
+                        paper=p, cache=caches.sherpa, api_key=sherpa_api_key
+                    ),
+                    p,
+                ),
+            )
+            for p in pathway_papers.values()
+        )
+    )
+
+    for paper in to_enrich:
+        if paper.is_open_access is False:
+            pathway_paper = pathway_papers[paper.issn]
+            paper.oa_pathway = pathway_paper.oa_pathway
+            paper.oa_pathway_uri = pathway_paper.oa_pathway_uri
+            paper.oa_pathway_details = pathway_paper.oa_pathway_details
+            if paper is not pathway_paper:
+                if _was_skipped(pathway_paper, "sherpa"):
+                    _skip(paper, "sherpa")
+                if _has_failed(pathway_paper, "sherpa"):
+                    add_failed_provider(paper, "sherpa")
+        else:
+            # Open access or unknown status, which doesn't require a Sherpa lookup
+            await oa_pathway_async(paper=paper, api_key=sherpa_api_key)
+        _log_missing_policy(paper)
+
+    return papers
+
+
 def _remove_costly_oa_paths_from_oa_pathway_details(paper: FullPaper) -> FullPaper:
     if paper.oa_pathway_details is None:
         return paper
@@ -63,33 +350,374 @@ def _remove_costly_oa_paths_from_oa_pathway_details(paper: FullPaper) -> FullPap
     return paper
 
 
-@api_router.get("/api/authors", response_model=Author)
-def get_author_with_papers(profile: str, settings: Settings = Depends(get_settings)):
+async def _stream_papers(
+    dois: List[str],
+    unpaywall_email: str,
+    sherpa_api_key: str,
+    s2_api_key: str,
+    concurrency: int,
+    caches: ProviderCaches = NO_CACHES,
+    deadline: Optional[float] = None,
+) -> AsyncIterator[FullPaper]:
+    """Construct papers for the given DOIs concurrently, with at most ``concurrency``
+    papers in flight, and yield them in the order in which they complete. The
+    ``deadline`` applies to each paper once its construction starts.
+    """
+    limit = asyncio.Semaphore(concurrency)
+
+    async def construct(doi: str) -> FullPaper:
+        async with limit:
+            try:
+                return await _construct_paper(
+                    doi=doi,
+                    unpaywall_email=unpaywall_email,
+                    sherpa_api_key=sherpa_api_key,
+                    s2_api_key=s2_api_key,
+                    caches=caches,
+                    deadline=deadline,
+                )
+            except Exception as e:
+                logger.warning(
+                    {
+                        "message": "paper_construction_failed",
+                        "doi": doi,
+                        "error": str(e),
+                    }
+                )
+                return FullPaper(doi=doi)
+
+    tasks = [asyncio.ensure_future(construct(doi)) for doi in dois]
+    try:
+        for next_paper in asyncio.as_completed(tasks):
+            yield await next_paper
+    finally:
+        # Stop enriching in case the client went away before the stream finished
+        for task in tasks:
+            task.cancel()
+
+
+def _is_complete(paper: FullPaper) -> bool:
+    """Whether all providers answered for a paper, i.e. none was skipped or failed"""
+    return not (
+        getattr(paper, "skipped_providers", None)
+        or getattr(paper, "failed_providers", None)
+    )
+
+
+def _has_not_found(paper: FullPaper) -> bool:
+    """Whether a provider had nothing for a paper, i.e. its OA status or pathway is
+    unknown, which may change any time like for the providers' negative cache entries.
+    """
+    return paper.is_open_access is None or paper.oa_pathway is OAPathway.not_found
+
+
+def _paper_max_age(paper: FullPaper, settings: Settings) -> Optional[int]:
+    """Seconds for which a response with a paper may be cached, which is None for
+    incomplete papers, and as long as negative cache entries for papers that a
+    provider had nothing for.
+    """
+    if not _is_complete(paper):
+        return None
+    if _has_not_found(paper):
+        return response_negative_max_age(settings)
+    return response_max_age(settings)
+
+
+def cached_papers(dois: List[str], paper_cache: Cache) -> List[FullPaper]:
+    """Papers for those of the given DOIs that are in the paper cache, whose policies
+    are interned again in case the cache decoded them.
+    """
+    papers = (paper_cache.get(doi) for doi in dois)
+    papers = [FullPaper(**paper) for paper in papers if paper is not None]
+    for paper in papers:
+        paper.oa_pathway_details = intern_policies(paper.oa_pathway_details)
+    return papers
+
+
+def _cache_paper(paper: FullPaper, paper_cache: Cache):
+    """Cache papers only if all providers answered for them, referring to their
+    policies rather than copying them. Papers that a provider had nothing for are
+    cached like negative entries, see ``set_not_found``.
+    """
+    if not _is_complete(paper):
+        return
+
+    content = _paper_content(paper, None)
+    if _has_not_found(paper):
+        set_not_found(paper_cache, paper.doi, content)
+    else:
+        paper_cache[paper.doi] = content
+
+
+@contextmanager
+def _in_flight(dois: List[str]) -> Iterator[None]:
+    """Count the papers of the given DOIs as being constructed within the context"""
+    _papers_in_flight.update(dois)
+    try:
+        yield
+    finally:
+        _papers_in_flight.subtract(dois)
+        for doi in dois:
+            if _papers_in_flight[doi] <= 0:
+                del _papers_in_flight[doi]
+
+
+async def warm_paper_cache(
+    dois: List[str], settings: Settings, caches: ProviderCaches, paper_cache: Cache
+):
+    """Construct and cache the papers for the given DOIs, e.g. in the background
+    after rendering a page that lets the client fetch them in the meantime.
+    Papers constructed already by another warm-up or request are left out, and at
+    most ``BATCH_MAX_DOIS`` papers are constructed, like for a batch request.
+    """
+    dois = [doi for doi in dict.fromkeys(dois) if doi not in _papers_in_flight]
+    dois = dois[: settings.batch_max_dois]
+    if not dois:
+        return
+
+    try:
+        with _in_flight(dois):
+            papers = await _construct_papers(
+                dois=dois,
+                sherpa_api_key=settings.sherpa_api_key,
+                unpaywall_email=settings.unpaywall_email,
+                s2_api_key=settings.s2_api_key,
+                concurrency=settings.batch_concurrency,
+                caches=caches,
+            )
+    except Exception as e:
+        logger.warning({"message": "paper_cache_warming_failed", "error": str(e)})
+        return
+
+    for paper in papers:
+        _cache_paper(paper, paper_cache)
+
+
+def _paper_fields(
+    fields: Optional[str] = Query(
+        None,
+        description="Comma separated attributes of the papers to respond with, "
+        "e.g. doi,is_open_access,oa_pathway (all by default)",
+    )
+) -> Optional[Set[str]]:
+    """Parse the ``fields`` query parameter into the set of ``FullPaper`` attributes
+    to respond with, which always includes the DOI, or None for all attributes.
+    """
+    if fields is None:
+        return None
+
+    selected = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = selected.difference(FullPaper.__fields__)
+    if unknown:
+        raise HTTPException(422, f"Unknown paper fields: {', '.join(sorted(unknown))}")
+
+    return selected | {"doi"}
+
+
+def _without_details(fields: Optional[Set[str]]) -> Set[str]:
+    return set(FullPaper.__fields__ if fields is None else fields) - {
+        "oa_pathway_details"
+    }
+
+
+def _paper_content(paper: FullPaper, fields: Optional[Set[str]]) -> dict:
+    """The (selected) attributes of a paper to serialize, which refer to the (interned)
+    policies of the paper instead of copying them like ``paper.dict()`` would.
+    """
+    content = paper.dict(include=fields, exclude={"oa_pathway_details"})
+    if fields is None or "oa_pathway_details" in fields:
+        content["oa_pathway_details"] = paper.oa_pathway_details
+    return content
+
+
+def _policy_table_content(papers: List[FullPaper], fields: Optional[Set[str]]) -> dict:
+    """Content of a ``PaperBatchWithPolicies``, which has every policy only once"""
+    policies = {}
+    contents = []
+    for paper in papers:
+        content = _paper_content(paper, fields)
+        details = content.pop("oa_pathway_details", None)
+        if details is not None:
+            details = [intern_policy(policy) for policy in details]
+            policies.update((policy.id, policy) for policy in details)
+            content["oa_pathway_policy_ids"] = [policy.id for policy in details]
+        contents.append(content)
+
+    return {"papers": contents, "policies": policies}
+
+
+def _author_content(author: Author, fields: Optional[Set[str]]) -> dict:
+    content = author.dict(exclude={"papers"})
+    if author.papers is not None:
+        content["papers"] = [_paper_content(p, fields) for p in author.papers]
+    return content
+
+
+def _cache_key(resource: str, fields: Optional[Set[str]]) -> str:
+    """Cache key of the representation of a resource with the given fields."""
+    if fields is None:
+        return resource
+    return f"{resource}?fields={','.join(sorted(fields))}"
+
+
+def _format_stream(
+    papers: AsyncIterator[FullPaper],
+    format: StreamFormat,
+    fields: Optional[Set[str]] = None,
+) -> AsyncIterator[str]:
+    def dumps(paper: FullPaper) -> str:
+        return orjson.dumps(_paper_content(paper, fields)).decode()
+
+    async def ndjson():
+        async for paper in papers:
+            yield dumps(paper) + "\n"
+
+    async def sse():
+        async for paper in papers:
+            yield f"event: paper\ndata: {dumps(paper)}\n\n"
+        yield "event: done\ndata: {}\n\n"
+
+    return sse() if format is StreamFormat.sse else ndjson()
+
+
+def _etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def _matches(request: Request, etag: Optional[str]) -> bool:
+    """Whether the ``If-None-Match`` header of a request matches an ETag, comparing
+    weakly, as e.g. proxies compressing responses turn ETags into weak ones.
+    """
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is None or etag is None:
+        return False
+
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    tags = [tag[2:] if tag.startswith("W/") else tag for tag in tags]
+    return "*" in tags or etag in tags
+
+
+def _cache_headers(etag: str, max_age: Optional[int]) -> dict:
+    cache_control = "no-cache" if max_age is None else f"public, max-age={max_age}"
+    return {"ETag": etag, "Cache-Control": cache_control}
+
+
+def _not_modified_since_cached(
+    request: Request, etags: Cache, key: str, max_age: int
+) -> Optional[Response]:
+    """Return a 304 response in case the request is conditional on the ETag that was
+    last sent for a resource (and is still cached), i.e. without constructing it.
+    """
+    etag = etags.get(key)
+    if not _matches(request, etag):
+        return None
+
+    return Response(status_code=304, headers=_cache_headers(etag, max_age))
+
+
+def _with_validators(
+    request: Request,
+    etags: Cache,
+    key: str,
+    content: dict,
+    max_age: Optional[int],
+    settings: Settings,
+) -> Response:
+    """Serialize a constructed resource, set its ``ETag`` and ``Cache-Control``
+    headers and remember its ETag, unless the resource is incomplete and therefore
+    not to be cached (``max_age`` None). Returns a 304 response instead of the
+    resource, in case the client already has it.
+    ETags are only remembered for resources that may be cached for the full
+    ``response_max_age``, as they are confirmed for as long without constructing
+    the resource again (see ``_not_modified_since_cached``).
+    """
+    response = ORJSONResponse(content)
+    etag = _etag(response.body)
+    headers = _cache_headers(etag, max_age)
+    if max_age == response_max_age(settings):
+        etags[key] = etag
+
+    if _matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return response
+
+
+@api_router.get("/api/authors", response_model=Author, responses=NOT_MODIFIED)
+async def get_author_with_papers(
+    profile: str,
+    request: Request,
+    details: bool = Query(True, description="Include the papers' OA pathway details"),
+    fields: Optional[Set[str]] = Depends(_paper_fields),
+    settings: Settings = Depends(get_settings),
+    s2_cache: Cache = Depends(get_s2_cache),
+    etags: Cache = Depends(get_etag_cache),
+):
     """Get all information associated with a specific author search string, which can
     either be an ORCID, Semantic Scholar Profile ID or URL, or an author name to be
     searched for with the Crossref meta-data search.
     The returned ``Author.papers`` contains a list of papers provided by the chosen
     search method, which is not fully populated with all information.
-    To fetch fully populated papers, use ``GET api/papers?doi=...``
+    To fetch fully populated papers, use ``GET api/papers?doi=...`` or
+    ``GET api/authors/stream?profile=...``
+    Semantic Scholar papers that could not be looked up in time are listed in
+    ``Author.unresolved_paper_ids`` and included in a later response for the author.
+    Responses carry an ``ETag``, i.e. can be requested again with ``If-None-Match``.
+    The papers can be limited to the given ``fields``, or to all but the OA pathway
+    details with ``details=false``.
+    """
+    if not details:
+        fields = _without_details(fields)
+    key = _cache_key(f"author:{profile}", fields)
+    max_age = response_max_age(settings)
+    not_modified = _not_modified_since_cached(request, etags, key, max_age)
+    if not_modified is not None:
+        return not_modified
+
+    author = await find_author(profile, settings, s2_cache)
+
+    if author.unresolved_paper_ids or author.failed_providers:
+        max_age = None
+    content = _author_content(author, fields)
+    return _with_validators(request, etags, key, content, max_age, settings)
+
+
+async def find_author(
+    profile: str, settings: Settings, s2_cache: Cache, complete: bool = False
+) -> Author:
+    """Find the author for a search string like ``GET api/authors?profile=...``,
+    raising a 404 ``HTTPException`` if there is none.
+    Semantic Scholar papers are only waited for ``S2_AUTHOR_TIMEOUT`` seconds, unless
+    the author is to be ``complete``, i.e. has no ``Author.unresolved_paper_ids``
+    (other than for upstream errors), for callers that can't return those.
     """
     extracted_orcid = orcid.extract_orcid(profile)
     if extracted_orcid is not None:
-        author = orcid.get_author_with_papers(extracted_orcid)
+        author = await orcid.get_author_with_papers_async(extracted_orcid)
 
     else:
         author_id = semantic_scholar.extract_profile_id_from_url(profile)
         if not author_id.isnumeric():
-            author_id = semantic_scholar.get_author_id(profile, settings.s2_api_key)
+            author_id = await semantic_scholar.get_author_id_async(
+                profile, settings.s2_api_key
+            )
 
         if author_id is not None:
             # TODO: Semantic scholar only seems to have the DOI of the preprint and not
             #       the finally published paper's DOI
             #       (see e.g. semantic scholar ID 51453144)
-            author = semantic_scholar.get_author_with_papers(
-                author_id, settings.s2_api_key
+            author = await semantic_scholar.get_author_with_papers_async(
+                author_id,
+                settings.s2_api_key,
+                cache=s2_cache,
+                concurrency=settings.s2_author_concurrency,
+                timeout=None if complete else settings.s2_author_timeout,
             )
         else:
-            author = crossref.get_author_with_papers(profile)
+            author = await crossref.get_author_with_papers_async(
+                profile, max_results=settings.crossref_max_results
+            )
 
     if author is None:
         raise HTTPException(404, f"No author found for {profile}")
@@ -103,19 +731,155 @@ def get_author_with_papers(profile: str, settings: Settings = Depends(get_settin
     return author
 
 
-@api_router.get("/api/papers", response_model=FullPaper)
-def get_paper(doi: str, settings: Settings = Depends(get_settings)):
-    """Get paper with OpenAccess status and pathway for a given DOI."""
-    paper = _construct_paper(
-        doi=doi,
+@api_router.get(
+    "/api/authors/stream",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {media_type: {} for media_type in STREAM_MEDIA_TYPES.values()},
+            "description": "Stream of fully populated papers",
+        }
+    },
+)
+async def stream_papers_for_author(
+    profile: str,
+    format: StreamFormat = StreamFormat.ndjson,
+    details: bool = Query(True, description="Include the papers' OA pathway details"),
+    fields: Optional[Set[str]] = Depends(_paper_fields),
+    settings: Settings = Depends(get_settings),
+    caches: ProviderCaches = Depends(get_provider_caches),
+):
+    """Find the author for a given search string like ``GET api/authors?profile=...``
+    and stream each of their fully populated papers as soon as it is available, either
+    as newline delimited JSON or as server-sent events.
+    The papers are streamed in the order in which their enrichment completes, limited
+    to ``fields`` and ``details`` like for ``GET api/authors?profile=...``.
+    """
+    if not details:
+        fields = _without_details(fields)
+    author = await find_author(
+        profile, settings, caches.semantic_scholar, complete=True
+    )
+
+    papers = _stream_papers(
+        dois=[p.doi for p in author.papers],
         sherpa_api_key=settings.sherpa_api_key,
         unpaywall_email=settings.unpaywall_email,
         s2_api_key=settings.s2_api_key,
+        concurrency=settings.stream_concurrency,
+        caches=caches,
+        deadline=settings.paper_deadline,
+    )
+
+    return StreamingResponse(
+        _format_stream(papers, format, fields), media_type=STREAM_MEDIA_TYPES[format]
     )
 
-    return paper
+
+@api_router.get("/api/papers", response_model=FullPaper, responses=NOT_MODIFIED)
+async def get_paper(
+    doi: str,
+    request: Request,
+    deadline: Optional[float] = Query(None, gt=0),
+    fields: Optional[Set[str]] = Depends(_paper_fields),
+    settings: Settings = Depends(get_settings),
+    caches: ProviderCaches = Depends(get_provider_caches),
+    etags: Cache = Depends(get_etag_cache),
+    paper_cache: Cache = Depends(get_paper_cache),
+):
+    """Get paper with OpenAccess status and pathway for a given DOI.
+    Providers that can't be consulted within ``deadline`` seconds (by default
+    ``PAPER_DEADLINE``) are skipped and listed in ``FullPaper.skipped_providers``,
+    in which case the paper can be requested again later to complete it.
+    Responses carry an ``ETag``, i.e. can be requested again with ``If-None-Match``.
+    Complete papers are cached, and served from the cache until they expire.
+    Only the attributes given as ``fields`` are included, if any.
+    """
+    key = _cache_key(f"paper:{doi}", fields)
+    max_age = response_max_age(settings)
+    not_modified = _not_modified_since_cached(request, etags, key, max_age)
+    if not_modified is not None:
+        return not_modified
+
+    cached = cached_papers([doi], paper_cache)
+    if cached:
+        max_age = _paper_max_age(cached[0], settings)
+        content = _paper_content(cached[0], fields)
+        return _with_validators(request, etags, key, content, max_age, settings)
+
+    with _in_flight([doi]):
+        paper = await _construct_paper(
+            doi=doi,
+            sherpa_api_key=settings.sherpa_api_key,
+            unpaywall_email=settings.unpaywall_email,
+            s2_api_key=settings.s2_api_key,
+            caches=caches,
+            deadline=settings.paper_deadline if deadline is None else deadline,
+        )
+
+    _cache_paper(paper, paper_cache)
+    max_age = _paper_max_age(paper, settings)
+    content = _paper_content(paper, fields)
+    return _with_validators(request, etags, key, content, max_age, settings)
+
+
+@api_router.post(
+    "/api/papers/batch",
+    response_model=Union[List[FullPaper], PaperBatchWithPolicies],
+)
+async def get_papers(
+    batch: PaperBatch,
+    deadline: Optional[float] = Query(None, gt=0),
+    fields: Optional[Set[str]] = Depends(_paper_fields),
+    policy_table: bool = Query(
+        False, description="Respond with the policies once, referred to by ID"
+    ),
+    settings: Settings = Depends(get_settings),
+    caches: ProviderCaches = Depends(get_provider_caches),
+):
+    """Get papers with OpenAccess status and pathway for a batch of DOIs at once.
+    The papers are returned in the order of the given DOIs. The ``deadline`` applies
+    to the whole batch, like for ``GET api/papers?doi=...``, as do the ``fields``.
+    With ``policy_table=true`` a ``PaperBatchWithPolicies`` is returned instead, in
+    which the papers refer to the policies by their ``oa_pathway_policy_ids``.
+    """
+    if len(batch.dois) > settings.batch_max_dois:
+        raise HTTPException(
+            413, f"At most {settings.batch_max_dois} DOIs are allowed per batch"
+        )
+
+    papers = await _construct_papers(
+        dois=batch.dois,
+        sherpa_api_key=settings.sherpa_api_key,
+        unpaywall_email=settings.unpaywall_email,
+        s2_api_key=settings.s2_api_key,
+        concurrency=settings.batch_concurrency,
+        caches=caches,
+        deadline=settings.paper_deadline if deadline is None else deadline,
+    )
+
+    if policy_table:
+        return ORJSONResponse(_policy_table_content(papers, fields))
+    return ORJSONResponse([_paper_content(paper, fields) for paper in papers])
 
 
 @api_router.get("/debug", include_in_schema=False)
 def get_request_headers(request: Request):
     return {"headers": request.headers, "url_scheme": request.url.scheme}
+
+
+@api_router.get("/debug/cache", include_in_schema=False)
+def get_cache_stats(caches: ProviderCaches = Depends(get_provider_caches)):
+    return {provider: cache.stats() for provider, cache in caches._asdict().items()}
+
+
+@api_router.get("/debug/singleflight", include_in_schema=False)
+def get_singleflight_stats():
+    """Upstream calls made and coalesced with concurrent identical calls per provider"""
+    return singleflight.stats()
+
+
+@api_router.get("/debug/clients", include_in_schema=False)
+def get_client_stats():
+    """Circuit breaker state and recent latencies per upstream provider"""
+    return clients.stats()
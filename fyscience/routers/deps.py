@@ -1,8 +1,15 @@
 import os
-from typing import Optional
+from typing import NamedTuple, Optional, Union
 from functools import lru_cache
+
+from fastapi import Depends
 from pydantic import BaseSettings
 
+from fyscience.cache import LayeredCache, SQLiteCache, TTLCache
+from fyscience.monitoring import MonitoredCache
+from fyscience.sherpa import SherpaPolicyTable
+from fyscience.unpaywall import UnpaywallIndex
+
 
 TEMPLATE_PATH = os.path.join(
     os.path.abspath(os.path.dirname(__file__)), "..", "templates"
@@ -13,6 +20,25 @@ class Settings(BaseSettings):
     sherpa_api_key: str
     unpaywall_email: str
     s2_api_key: Optional[str] = None
+    batch_max_dois: int = 500
+    batch_concurrency: int = 10
+    stream_concurrency: int = 10
+    s2_author_concurrency: int = 10
+    s2_author_timeout: float = 5.0
+    paper_deadline: Optional[float] = 10.0
+    crossref_max_results: int = 500
+    cache_path: Optional[str] = None
+    unpaywall_index_path: Optional[str] = None
+    sherpa_policy_table_path: Optional[str] = None
+    metrics_summary_path: Optional[str] = None
+    pathway_cache_size: int = 10000
+    pathway_cache_ttl: int = 24 * 60 * 60
+    pathway_negative_cache_ttl: int = 60 * 60
+    paper_cache_size: int = 50000
+    unpaywall_cache_ttl: int = 24 * 60 * 60
+    unpaywall_negative_cache_ttl: int = 60 * 60
+    s2_cache_ttl: int = 24 * 60 * 60
+    s2_negative_cache_ttl: int = 60 * 60
 
     class Config:
         env_file = ".env"
@@ -21,3 +47,156 @@ class Settings(BaseSettings):
 @lru_cache()
 def get_settings():
     return Settings()
+
+
+Cache = Union[TTLCache, SQLiteCache, LayeredCache, MonitoredCache]
+
+
+class ProviderCaches(NamedTuple):
+    unpaywall: Cache
+    semantic_scholar: Cache
+    sherpa: Cache
+
+
+@lru_cache()
+def _cache(
+    namespace: str, path: Optional[str], maxsize: int, ttl: int, negative_ttl: int
+) -> Cache:
+    """Caches are shared by all requests handled by this process and, in case a
+    ``cache_path`` is configured, also by all other processes on the host. Their hit
+    ratio is exposed as ``fyscience_cache_lookups_total`` under ``namespace``.
+    """
+    return MonitoredCache(
+        _new_cache(namespace, path, maxsize, ttl, negative_ttl), namespace
+    )
+
+
+def _new_cache(
+    namespace: str, path: Optional[str], maxsize: int, ttl: int, negative_ttl: int
+) -> Union[SQLiteCache, TTLCache]:
+    if path is not None:
+        cache = SQLiteCache(
+            path, namespace=namespace, ttl=ttl, negative_ttl=negative_ttl
+        )
+        cache.purge_expired()
+        return cache
+
+    return TTLCache(maxsize=maxsize, ttl=ttl, negative_ttl=negative_ttl)
+
+
+@lru_cache()
+def _pathway_cache(
+    policy_table_path: Optional[str],
+    path: Optional[str],
+    maxsize: int,
+    ttl: int,
+    negative_ttl: int,
+) -> Cache:
+    cache = _new_cache("sherpa", path, maxsize, ttl, negative_ttl)
+    if policy_table_path is not None:
+        cache = LayeredCache(cache, SherpaPolicyTable(policy_table_path))
+
+    return MonitoredCache(cache, "sherpa")
+
+
+def get_pathway_cache(settings: Settings = Depends(get_settings)) -> Cache:
+    """Cache of Sherpa ``(pathway, uri, details)`` per ISSN, which is preceded by the
+    local Sherpa policy table, in case a ``sherpa_policy_table_path`` is configured.
+    """
+    return _pathway_cache(
+        settings.sherpa_policy_table_path,
+        settings.cache_path,
+        settings.pathway_cache_size,
+        settings.pathway_cache_ttl,
+        settings.pathway_negative_cache_ttl,
+    )
+
+
+@lru_cache()
+def _unpaywall_cache(
+    index_path: Optional[str],
+    path: Optional[str],
+    maxsize: int,
+    ttl: int,
+    negative_ttl: int,
+) -> Cache:
+    cache = _new_cache("unpaywall", path, maxsize, ttl, negative_ttl)
+    if index_path is not None:
+        cache = LayeredCache(cache, UnpaywallIndex(index_path))
+
+    return MonitoredCache(cache, "unpaywall")
+
+
+def get_unpaywall_cache(settings: Settings = Depends(get_settings)) -> Cache:
+    """Cache of unpaywall papers per DOI, which is preceded by the local unpaywall
+    snapshot index, in case an ``unpaywall_index_path`` is configured.
+    """
+    return _unpaywall_cache(
+        settings.unpaywall_index_path,
+        settings.cache_path,
+        settings.paper_cache_size,
+        settings.unpaywall_cache_ttl,
+        settings.unpaywall_negative_cache_ttl,
+    )
+
+
+def get_s2_cache(settings: Settings = Depends(get_settings)) -> Cache:
+    """Cache of Semantic Scholar papers per DOI."""
+    return _cache(
+        "semantic_scholar",
+        settings.cache_path,
+        settings.paper_cache_size,
+        settings.s2_cache_ttl,
+        settings.s2_negative_cache_ttl,
+    )
+
+
+def response_max_age(settings: Settings) -> int:
+    """Seconds for which API responses may be cached by clients and proxies, i.e. as
+    long as the provider lookups they are constructed from are cached for.
+    """
+    return min(
+        settings.unpaywall_cache_ttl, settings.s2_cache_ttl, settings.pathway_cache_ttl
+    )
+
+
+def response_negative_max_age(settings: Settings) -> int:
+    """Seconds for which API responses with lookups that a provider had nothing for
+    may be cached, i.e. as long as the providers' negative cache entries are.
+    """
+    return min(
+        settings.unpaywall_negative_cache_ttl,
+        settings.s2_negative_cache_ttl,
+        settings.pathway_negative_cache_ttl,
+    )
+
+
+def get_etag_cache(settings: Settings = Depends(get_settings)) -> Cache:
+    """Cache of the ETags of the API responses sent, per resource, to answer
+    conditional requests without constructing the response again.
+    """
+    max_age = response_max_age(settings)
+    return _cache("etags", settings.cache_path, settings.paper_cache_size, max_age, 0)
+
+
+def get_paper_cache(settings: Settings = Depends(get_settings)) -> Cache:
+    """Cache of the fully constructed papers per DOI, to serve them without
+    consulting the providers again for as long as the responses may be cached.
+    """
+    return _cache(
+        "papers",
+        settings.cache_path,
+        settings.paper_cache_size,
+        response_max_age(settings),
+        response_negative_max_age(settings),
+    )
+
+
+def get_provider_caches(
+    unpaywall: Cache = Depends(get_unpaywall_cache),
+    semantic_scholar: Cache = Depends(get_s2_cache),
+    sherpa: Cache = Depends(get_pathway_cache),
+) -> ProviderCaches:
+    return ProviderCaches(
+        unpaywall=unpaywall, semantic_scholar=semantic_scholar, sherpa=sherpa
+    )
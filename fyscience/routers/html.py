@@ -4,10 +4,20 @@ from fastapi import APIRouter, Depends, Request
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from loguru import logger
+from starlette.background import BackgroundTask
 
+from fyscience.metrics import format_count, load_summary
 from fyscience.schemas import OAPathway, FullPaper
-from fyscience.routers.api import get_author_with_papers
-from fyscience.routers.deps import get_settings, Settings, TEMPLATE_PATH
+from fyscience.routers.api import cached_papers, find_author, warm_paper_cache
+from fyscience.routers.deps import (
+    get_paper_cache,
+    get_provider_caches,
+    get_settings,
+    Cache,
+    ProviderCaches,
+    Settings,
+    TEMPLATE_PATH,
+)
 
 html_router = APIRouter()
 templates = Jinja2Templates(directory=TEMPLATE_PATH)
@@ -34,16 +44,32 @@ def _render_paper_page(
     )
 
 
-def _render_author_page(
-    author_query: str, settings: Settings, request: Request
+async def _render_author_page(
+    author_query: str,
+    settings: Settings,
+    caches: ProviderCaches,
+    paper_cache: Cache,
+    request: Request,
 ) -> templates.TemplateResponse:
-    author = get_author_with_papers(author_query, settings)
+    """Papers that are cached already are embedded in the page, the others are
+    fetched by the client and constructed in the background meanwhile.
+    """
+    # The client only fetches papers by DOI, i.e. can't resolve Semantic Scholar
+    # papers later on
+    author = await find_author(
+        author_query, settings, caches.semantic_scholar, complete=True
+    )
+    dois = [p.doi for p in author.papers]
+    papers = cached_papers(dois, paper_cache)
+    cached_dois = {p.doi for p in papers}
+    missing_dois = [doi for doi in dois if doi not in cached_dois]
 
     logger.debug(
         {
             "query": author_query,
             "provider": author.provider,
             "n_papers": len(author.papers),
+            "n_cached_papers": len(papers),
         }
     )
 
@@ -52,6 +78,12 @@ def _render_author_page(
         "https://" + host if host.endswith("freeyourscience.org") else "http://" + host
     )
 
+    warming = None
+    if missing_dois:
+        warming = BackgroundTask(
+            warm_paper_cache, missing_dois, settings, caches, paper_cache
+        )
+
     return templates.TemplateResponse(
         "publications_for_author.html",
         {
@@ -59,8 +91,10 @@ def _render_author_page(
             "serverURL": serverURL,
             "author": author,
             "search_string": author_query,
-            "dois": [p.doi for p in author.papers],
+            "dois": dois,
+            "papers": [p.dict() for p in papers],
         },
+        background=warming,
     )
 
 
@@ -68,24 +102,55 @@ def _is_doi_query(string: str) -> bool:
     return re.match("\\b[0-9]{2}.[0-9]+/", string) is not None
 
 
+N_NOCOST_PAPERS_FALLBACK = 46796300
+
+
+def _n_nocost_papers(settings: Settings) -> int:
+    """Number of paywalled papers with a no cost pathway, as calculated over the
+    unpaywall snapshot by ``scripts/calculate_metrics.py``.
+    """
+    if settings.metrics_summary_path is None:
+        return N_NOCOST_PAPERS_FALLBACK
+
+    try:
+        return load_summary(settings.metrics_summary_path)["n_pathway_nocost"]
+    except (OSError, ValueError, KeyError) as e:
+        logger.error(
+            {"metrics_summary_path": settings.metrics_summary_path, "error": e}
+        )
+        return N_NOCOST_PAPERS_FALLBACK
+
+
 @html_router.get("/", response_class=HTMLResponse)
-def get_landing_page(request: Request):
+def get_landing_page(request: Request, settings: Settings = Depends(get_settings)):
     return templates.TemplateResponse(
-        "landing_page.html", {"request": request, "n_nocost_papers": "46.796.300"}
+        "landing_page.html",
+        {
+            "request": request,
+            "n_nocost_papers": format_count(_n_nocost_papers(settings)),
+        },
     )
 
 
 @html_router.get("/search", response_class=HTMLResponse)
-def get_search_result_html(
-    query: str, request: Request, settings: Settings = Depends(get_settings)
+async def get_search_result_html(
+    query: str,
+    request: Request,
+    settings: Settings = Depends(get_settings),
+    caches: ProviderCaches = Depends(get_provider_caches),
+    paper_cache: Cache = Depends(get_paper_cache),
 ):
     """Allows author name, ORCID, Semantic Scholar ID / profile URL and DOI queries."""
 
     if _is_doi_query(query):
         return _render_paper_page(doi=query, settings=settings, request=request)
     else:
-        return _render_author_page(
-            author_query=query, settings=settings, request=request
+        return await _render_author_page(
+            author_query=query,
+            settings=settings,
+            caches=caches,
+            paper_cache=paper_cache,
+            request=request,
         )
 
 
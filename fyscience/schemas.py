@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from enum import Enum
 
 from pydantic import BaseModel, Field
@@ -14,6 +14,11 @@ class OAPathway(str, Enum):
     not_found = "not_found"
 
 
+class StreamFormat(str, Enum):
+    ndjson = "ndjson"
+    sse = "sse"
+
+
 class Paper(BaseModel):
     """The data model for a paper"""
 
@@ -56,6 +61,79 @@ class FullPaper(BaseModel):
     oa_pathway: Optional[OAPathway] = None
     oa_pathway_uri: Optional[str] = None
     oa_pathway_details: Optional[List[dict]] = None
+    # IDs of the policies in ``oa_pathway_details``, set instead of the details when
+    # responding with a separate policy table, see ``PaperBatchWithPolicies``
+    oa_pathway_policy_ids: Optional[List[str]] = None
+    # Providers not consulted before the request's deadline, i.e. the paper is only
+    # partially populated and can be requested again later
+    skipped_providers: Optional[List[str]] = None
+    # Providers that failed to answer, i.e. the paper is only partially populated as
+    # well, even though e.g. its pathway says ``not_found``
+    failed_providers: Optional[List[str]] = None
+
+
+def add_failed_provider(paper, provider: str):
+    """Record that a provider failed to answer for a paper, in case it is a
+    ``FullPaper``, which unlike the other paper models keeps track of that.
+    """
+    if isinstance(paper, FullPaper):
+        paper.failed_providers = [*(paper.failed_providers or []), provider]
+
+
+class PaperRecord:
+    """Compact paper for bulk enrichment of records from trusted sources like the
+    unpaywall snapshot, which is constructed without validation and only converted to
+    a ``FullPaper`` at the API boundary. Can be enriched in place like a ``FullPaper``.
+    """
+
+    __slots__ = (
+        "doi",
+        "issn",
+        "year",
+        "is_open_access",
+        "oa_location_url",
+        "oa_pathway",
+        "oa_pathway_uri",
+        "oa_pathway_details",
+    )
+
+    def __init__(
+        self,
+        doi: str,
+        issn: Optional[str] = None,
+        is_open_access: Optional[bool] = None,
+        year: Optional[int] = None,
+    ):
+        self.doi = doi
+        self.issn = issn
+        self.year = year
+        self.is_open_access = is_open_access
+        self.oa_location_url: Optional[str] = None
+        self.oa_pathway: Optional[OAPathway] = None
+        self.oa_pathway_uri: Optional[str] = None
+        self.oa_pathway_details: Optional[List[dict]] = None
+
+    @classmethod
+    def from_unpaywall(cls, record: dict) -> "PaperRecord":
+        """From a record of the unpaywall snapshot or its extracts"""
+        return cls(
+            record["doi"],
+            record.get("journal_issn_l"),
+            record.get("is_oa"),
+            record.get("year"),
+        )
+
+    def to_full_paper(self) -> FullPaper:
+        return FullPaper(**{name: getattr(self, name) for name in self.__slots__})
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, PaperRecord):
+            return NotImplemented
+        return all(getattr(self, n) == getattr(other, n) for n in self.__slots__)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{n}={getattr(self, n)!r}" for n in self.__slots__)
+        return f"PaperRecord({fields})"
 
 
 class Author(BaseModel):
@@ -63,3 +141,18 @@ class Author(BaseModel):
     profile_url: Optional[str] = None
     papers: Optional[List[FullPaper]] = None
     provider: Optional[str] = None
+    # IDs (of the provider) of papers that could not be looked up in time
+    unresolved_paper_ids: Optional[List[str]] = None
+    # Providers that failed to answer while listing the papers, which are therefore
+    # incomplete, e.g. when Crossref fails after the first page
+    failed_providers: Optional[List[str]] = None
+
+
+class PaperBatch(BaseModel):
+    dois: List[str]
+
+
+class PaperBatchWithPolicies(BaseModel):
+    papers: List[FullPaper]
+    # Policies referred to by the papers' ``oa_pathway_policy_ids``, per ID
+    policies: Dict[str, dict]
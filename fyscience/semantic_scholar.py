@@ -1,8 +1,12 @@
-from typing import List, Optional
+import asyncio
+from typing import List, Optional, Set, Tuple
 
+import httpx
 import requests
 from pydantic import BaseModel
 
+from fyscience import clients, singleflight
+from fyscience.cache import is_not_found, set_not_found
 from fyscience.schemas import FullPaper, Author
 
 
@@ -43,7 +47,7 @@ class S2Author(BaseModel):
     url: Optional[str] = None
 
 
-def _get_request(relative_url: str, api_key: str, **kwargs) -> requests.Response:
+def _prepare_request(relative_url: str, api_key: str, **kwargs) -> Tuple[str, dict]:
     if api_key is not None:
         headers = kwargs.pop("headers", None)
         if isinstance(headers, dict):
@@ -57,11 +61,26 @@ def _get_request(relative_url: str, api_key: str, **kwargs) -> requests.Response
     else:
         url = f"https://api.semanticscholar.org/v1/{relative_url}"
 
+    return url, kwargs
+
+
+def _get_request(relative_url: str, api_key: str, **kwargs) -> requests.Response:
+    url, kwargs = _prepare_request(relative_url, api_key, **kwargs)
+    kwargs.setdefault("timeout", clients.SYNC_TIMEOUT)
     return requests.get(url, **kwargs)
 
 
+async def _get_request_async(
+    relative_url: str, api_key: str, **kwargs
+) -> httpx.Response:
+    url, kwargs = _prepare_request(relative_url, api_key, **kwargs)
+    return await clients.get("semantic_scholar", url, **kwargs)
+
+
 def _get_paper(paper_id: str, api_key: str = None) -> Optional[Paper]:
-    r = _get_request(f"paper/{paper_id}", api_key)
+    r = clients.call(
+        "semantic_scholar", lambda: _get_request(f"paper/{paper_id}", api_key)
+    )
 
     if not r.ok:
         # TODO: Log and/or handle differently.
@@ -70,8 +89,17 @@ def _get_paper(paper_id: str, api_key: str = None) -> Optional[Paper]:
     return Paper(**r.json())
 
 
-def get_paper(paper_id: str, api_key: str = None) -> Optional[FullPaper]:
-    paper = _get_paper(paper_id, api_key)
+async def _get_paper_async(paper_id: str, api_key: str = None) -> Optional[Paper]:
+    r = await _get_request_async(f"paper/{paper_id}", api_key)
+
+    if not r.is_success:
+        # TODO: Log and/or handle differently.
+        return None
+
+    return Paper(**r.json())
+
+
+def _to_full_paper(paper: Optional[Paper]) -> Optional[FullPaper]:
     if paper is None or paper.doi is None:
         return None
 
@@ -85,8 +113,59 @@ def get_paper(paper_id: str, api_key: str = None) -> Optional[FullPaper]:
     )
 
 
+def _cache_paper(cache, paper_id: str, paper: Optional[FullPaper]):
+    if cache is None:
+        return
+
+    if paper is None:
+        set_not_found(cache, paper_id)
+    else:
+        cache[paper_id] = paper.dict()
+
+
+def get_paper(paper_id: str, api_key: str = None, cache=None) -> Optional[FullPaper]:
+    """Cache can be anything that exposes ``get(key, default)`` and ``__setitem__``
+    and is filled with ``FullPaper.dict()`` per paper ID. Papers unknown to Semantic
+    Scholar or without DOI are cached as negative entries, whereas
+    ``fyscience.clients.UpstreamError`` is raised without caching anything in case
+    Semantic Scholar fails to answer.
+    """
+    if cache is not None:
+        cached = cache.get(paper_id, None)
+        if cached is not None:
+            return None if is_not_found(cached) else FullPaper(**cached)
+
+    paper = _to_full_paper(_get_paper(paper_id, api_key))
+    _cache_paper(cache, paper_id, paper)
+
+    return paper
+
+
+async def get_paper_async(
+    paper_id: str, api_key: str = None, cache=None
+) -> Optional[FullPaper]:
+    """Cache can be anything that exposes ``get(key, default)`` and ``__setitem__``
+    and is filled with ``FullPaper.dict()`` per paper ID.
+    """
+    if cache is not None:
+        cached = cache.get(paper_id, None)
+        if cached is not None:
+            return None if is_not_found(cached) else FullPaper(**cached)
+
+    # Concurrent lookups of a paper share one request, but each gets its own FullPaper
+    s2_paper = await singleflight.get_group("semantic_scholar").do(
+        paper_id, lambda: _get_paper_async(paper_id, api_key)
+    )
+    paper = _to_full_paper(s2_paper)
+    _cache_paper(cache, paper_id, paper)
+
+    return paper
+
+
 def _get_author(author_id: str, api_key: str = None) -> Optional[S2Author]:
-    r = _get_request(f"author/{author_id}", api_key)
+    r = clients.call(
+        "semantic_scholar", lambda: _get_request(f"author/{author_id}", api_key)
+    )
 
     if not r.ok:
         # TODO: Log and/or handle differently.
@@ -95,23 +174,102 @@ def _get_author(author_id: str, api_key: str = None) -> Optional[S2Author]:
     return S2Author(**r.json())
 
 
-def get_author_with_papers(author_id: str, api_key: str = None) -> Optional[Author]:
-    author = _get_author(author_id, api_key)
-    if author is None:
+async def _get_author_async(author_id: str, api_key: str = None) -> Optional[S2Author]:
+    r = await _get_request_async(f"author/{author_id}", api_key)
+
+    if not r.is_success:
+        # TODO: Log and/or handle differently.
         return None
 
-    author.papers = [] if author.papers is None else author.papers
-    papers = [get_paper(paper["paperId"], api_key) for paper in author.papers]
-    papers = [p for p in papers if p is not None]
+    return S2Author(**r.json())
 
+
+def _to_author(
+    author: S2Author,
+    papers: List[Optional[FullPaper]],
+    unresolved_paper_ids: Optional[List[str]] = None,
+) -> Author:
     return Author(
         name=author.name,
         provider="semantic_scholar",
         profile_url=author.url,
-        papers=papers,
+        papers=[p for p in papers if p is not None],
+        unresolved_paper_ids=unresolved_paper_ids,
     )
 
 
+def get_author_with_papers(author_id: str, api_key: str = None) -> Optional[Author]:
+    author = _get_author(author_id, api_key)
+    if author is None:
+        return None
+
+    author.papers = [] if author.papers is None else author.papers
+    papers = [get_paper(paper["paperId"], api_key) for paper in author.papers]
+
+    return _to_author(author, papers)
+
+
+# Paper lookups that outlived the deadline of their author lookup, referenced here so
+# they are not garbage collected before they complete
+_background_lookups: Set[asyncio.Future] = set()
+
+
+def _background_lookup_done(lookup: asyncio.Future):
+    _background_lookups.discard(lookup)
+    if not lookup.cancelled():
+        lookup.exception()
+
+
+async def get_author_with_papers_async(
+    author_id: str,
+    api_key: str = None,
+    cache=None,
+    concurrency: int = 10,
+    timeout: Optional[float] = None,
+) -> Optional[Author]:
+    """Async version of ``get_author_with_papers``, which looks up at most
+    ``concurrency`` papers at a time.
+
+    Papers not looked up within ``timeout`` seconds, or for which Semantic Scholar
+    failed to answer, are listed by their Semantic Scholar ID in
+    ``Author.unresolved_paper_ids``. Pending lookups carry on in the background and
+    fill the ``cache`` (see ``get_paper_async``), so that they are available to a
+    follow-up request.
+    """
+    author = await _get_author_async(author_id, api_key)
+    if author is None:
+        return None
+
+    author.papers = [] if author.papers is None else author.papers
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited_get_paper(paper_id: str) -> Optional[FullPaper]:
+        async with semaphore:
+            return await get_paper_async(paper_id, api_key, cache)
+
+    lookups = {
+        asyncio.ensure_future(limited_get_paper(paper["paperId"])): paper["paperId"]
+        for paper in author.papers
+    }
+    if not lookups:
+        return _to_author(author, [])
+
+    _, pending = await asyncio.wait(lookups, timeout=timeout)
+    for pending_lookup in pending:
+        _background_lookups.add(pending_lookup)
+        pending_lookup.add_done_callback(_background_lookup_done)
+
+    papers = []
+    unresolved_paper_ids = []
+    for lookup, paper_id in lookups.items():
+        if lookup in pending or isinstance(lookup.exception(), clients.UpstreamError):
+            unresolved_paper_ids.append(paper_id)
+        else:
+            papers.append(lookup.result())
+
+    return _to_author(author, papers, unresolved_paper_ids or None)
+
+
 def get_dois(author_id: str, api_key: str = None) -> List[str]:
     author = get_author_with_papers(author_id, api_key)
     if author is None:
@@ -130,17 +288,40 @@ def extract_profile_id_from_url(url: str) -> Optional[str]:
     return author_id
 
 
+AUTHOR_SEARCH_URL = "https://www.semanticscholar.org/api/1/completion"
+
+
+def _author_id_from_suggestions(result: dict) -> Optional[str]:
+    suggestions = result.get("suggestions")
+    if not suggestions:
+        return None
+
+    return suggestions[0]["linkedId"]
+
+
 def get_author_id(author_name: str, api_key: str = None) -> Optional[str]:
     """Get S2 author ID via the name search."""
-    r = requests.get(
-        "https://www.semanticscholar.org/api/1/completion",
-        params={"q": author_name, "fresh": "false"},
+    params = {"q": author_name, "fresh": "false"}
+    r = clients.call(
+        "semantic_scholar",
+        lambda: requests.get(
+            AUTHOR_SEARCH_URL, params=params, timeout=clients.SYNC_TIMEOUT
+        ),
     )
     if not r.ok:
         return None
 
-    suggestions = r.json().get("suggestions")
-    if not suggestions:
+    return _author_id_from_suggestions(r.json())
+
+
+async def get_author_id_async(author_name: str, api_key: str = None) -> Optional[str]:
+    """Get S2 author ID via the name search."""
+    r = await clients.get(
+        "semantic_scholar",
+        AUTHOR_SEARCH_URL,
+        params={"q": author_name, "fresh": "false"},
+    )
+    if not r.is_success:
         return None
 
-    return suggestions[0]["linkedId"]
+    return _author_id_from_suggestions(r.json())
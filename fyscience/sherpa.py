@@ -1,9 +1,16 @@
 import os
+import gzip
 import json
-from typing import Optional, Tuple, List
+import hashlib
+import threading
+import weakref
+from typing import Iterable, Iterator, Optional, Tuple, List
 
 import requests
 
+from fyscience import clients, singleflight
+from fyscience.cache import connect_sqlite
+from fyscience.data import chunked
 from fyscience.schemas import OAPathway
 
 
@@ -26,40 +33,99 @@ def has_no_cost_oa_policy(policy: dict) -> bool:
         return False
 
 
-def get_pathway(
-    issn: str, api_key: Optional[str] = None
-) -> Tuple[OAPathway, Optional[str], Optional[List[dict]]]:
-    """Fetch information about the available open access pathways for the publciation
-    (e.g. journal) with a given ISSN from the Sherpa API (v2.sherpa.ac.uk)
+class Policy(dict):
+    """Sherpa publisher policy as interned by ``intern_policy``, i.e. one object shared
+    by all papers of all journals with the same policy, which is therefore read-only.
+    Copies (e.g. ``deepcopy``) are plain dicts again.
+    """
 
-    Returns
-    -------
-    OA Pathway
-    URI to the Sherpa publication details
-    publisher policies with no cost pathways
+    __slots__ = ("__weakref__", "_id", "_no_cost")
 
-    Raises
-    ------
-    RuntimeError
-        In case no Sherpa API key is passed to the function as an argument and none is
-        found in the ``SHERPA_API_KEY`` environment variable.
-        To obtain an API key, register at https://v2.sherpa.ac.uk/cgi/register
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Interned policies are read-only")
+
+    __setitem__ = __delitem__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+    @property
+    def id(self) -> str:
+        """Hash of the policy's content, prefixed by its Sherpa ID if it has one, as
+        e.g. its ``no_cost`` variant and its versions before and after Sherpa updated
+        it share the Sherpa ID.
+        """
+        policy_id = getattr(self, "_id", None)
+        if policy_id is None:
+            policy_id = hashlib.sha256(_policy_key(self).encode()).hexdigest()[:16]
+            if "id" in self:
+                policy_id = f"{self['id']}-{policy_id}"
+            self._id = policy_id
+        return policy_id
+
+    def no_cost(self) -> "Policy":
+        """The policy with only the permitted OA without additional fee, which is
+        computed once per policy. Entries without fee information are left out.
+        """
+        no_cost = getattr(self, "_no_cost", None)
+        if no_cost is None:
+            permitted_oa = [
+                poa
+                for poa in self["permitted_oa"]
+                if "additional_oa_fee" in poa and poa["additional_oa_fee"] == "no"
+            ]
+            no_cost = intern_policy({**self, "permitted_oa": permitted_oa})
+            self._no_cost = no_cost
+        return no_cost
+
+
+_interned_policies: "weakref.WeakValueDictionary[str, Policy]" = (
+    weakref.WeakValueDictionary()
+)
+_interned_policies_lock = threading.Lock()
+
+
+def _policy_key(policy: dict) -> str:
+    return json.dumps(policy, sort_keys=True, separators=(",", ":"))
+
+
+def intern_policy(policy: dict) -> Policy:
+    """The ``Policy`` equal to a given policy, e.g. as decoded from a cache, which is
+    kept in memory once for as long as any paper or cache entry refers to it.
     """
+    if isinstance(policy, Policy):
+        return policy
+
+    key = _policy_key(policy)
+    with _interned_policies_lock:
+        interned = _interned_policies.get(key)
+        if interned is None:
+            interned = _interned_policies[key] = Policy(policy)
+    return interned
+
+
+def intern_policies(policies: Optional[Iterable[dict]]) -> Optional[List[Policy]]:
+    return None if policies is None else [intern_policy(p) for p in policies]
+
+
+def _get_pathway_url(issn: str, api_key: Optional[str] = None) -> str:
     api_key = os.getenv("SHERPA_API_KEY") if api_key is None else api_key
     if api_key is None or not api_key:
         raise RuntimeError(
             "No Sherpa API key available in the 'SHERPA_API_KEY' environment variable."
         )
 
-    response = requests.get(
+    return (
         "https://v2.sherpa.ac.uk/cgi/retrieve?"
         + f"item-type=publication&api-key={api_key}&format=Json&"
         + f'filter=[["issn","equals","{issn}"]]'
     )
-    if not response.ok:
-        return OAPathway.not_found, None, None
 
-    publications = response.json()
+
+def _pathway_from_publications(
+    publications: dict,
+) -> Tuple[OAPathway, Optional[str], Optional[List[dict]]]:
     try:
         if (
             not publications
@@ -73,7 +139,7 @@ def get_pathway(
 
     # TODO: How to handle multiple publications found for ISSN?
     publication = publications["items"][0]
-    oa_policies_no_cost = list(
+    oa_policies_no_cost = intern_policies(
         filter(has_no_cost_oa_policy, publication["publisher_policy"])
     )
     sherpa_publication_uri = (
@@ -85,3 +151,151 @@ def get_pathway(
         return OAPathway.other, sherpa_publication_uri, None
 
     return OAPathway.nocost, sherpa_publication_uri, oa_policies_no_cost
+
+
+def get_pathway(
+    issn: str, api_key: Optional[str] = None
+) -> Tuple[OAPathway, Optional[str], Optional[List[dict]]]:
+    """Fetch information about the available open access pathways for the publciation
+    (e.g. journal) with a given ISSN from the Sherpa API (v2.sherpa.ac.uk)
+
+    Returns
+    -------
+    OA Pathway
+    URI to the Sherpa publication details
+    publisher policies with no cost pathways
+
+    Raises
+    ------
+    RuntimeError
+        In case no Sherpa API key is passed to the function as an argument and none is
+        found in the ``SHERPA_API_KEY`` environment variable.
+        To obtain an API key, register at https://v2.sherpa.ac.uk/cgi/register
+    fyscience.clients.UpstreamError
+        In case Sherpa fails to answer, e.g. is unavailable or rate limits.
+    """
+    url = _get_pathway_url(issn, api_key)
+    response = clients.call(
+        "sherpa", lambda: requests.get(url, timeout=clients.SYNC_TIMEOUT)
+    )
+    if not response.ok:
+        return OAPathway.not_found, None, None
+
+    return _pathway_from_publications(response.json())
+
+
+async def get_pathway_async(
+    issn: str, api_key: Optional[str] = None
+) -> Tuple[OAPathway, Optional[str], Optional[List[dict]]]:
+    """Async version of ``get_pathway`` using the shared Sherpa connection pool, with
+    concurrent lookups of the same ISSN coalesced into one request.
+    """
+    return await singleflight.get_group("sherpa").do(
+        issn, lambda: _get_pathway_async(issn, api_key)
+    )
+
+
+async def _get_pathway_async(
+    issn: str, api_key: Optional[str] = None
+) -> Tuple[OAPathway, Optional[str], Optional[List[dict]]]:
+    response = await clients.get("sherpa", _get_pathway_url(issn, api_key))
+    if not response.is_success:
+        return OAPathway.not_found, None, None
+
+    return _pathway_from_publications(response.json())
+
+
+class SherpaPolicyTable:
+    """Local, ISSN keyed table of the precomputed ``(pathway, uri, details)`` as
+    returned by ``get_pathway``, built from a bulk export of Sherpa publications (see
+    ``build_policy_table``) and kept in a SQLite database.
+
+    Exposes ``get(issn, default)`` like the caches passed to ``oa_pathway``, but is
+    read-only, i.e. to be used via a ``fyscience.cache.LayeredCache``.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = connect_sqlite(path)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS policies ("
+            " issn TEXT PRIMARY KEY,"
+            " pathway TEXT NOT NULL,"
+            " uri TEXT,"
+            " details TEXT"
+            ") WITHOUT ROWID"
+        )
+
+    def get(
+        self, issn: str, default=None
+    ) -> Optional[Tuple[OAPathway, Optional[str], Optional[List[dict]]]]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT pathway, uri, details FROM policies WHERE issn = ?",
+                (issn.upper(),),
+            ).fetchone()
+
+        if row is None:
+            return default
+
+        pathway, uri, details = row
+        return OAPathway(pathway), uri, None if details is None else json.loads(details)
+
+    def insert(self, publications: Iterator[dict], batch_size: int = 1000) -> int:
+        """Insert the pathways of Sherpa publications for each of their ISSNs and return
+        the number of ISSNs written. For ISSNs that occur in several publications, the
+        first publication is used, as with ``get_pathway``.
+        """
+        n_issns = 0
+        for batch in chunked(publications, batch_size):
+            rows = []
+            for publication in batch:
+                pathway, uri, details = _pathway_from_publications(
+                    {"items": [publication]}
+                )
+                details = None if details is None else json.dumps(details)
+                rows.extend(
+                    (issn["issn"].upper(), pathway.value, uri, details)
+                    for issn in publication.get("issns", [])
+                    if "issn" in issn
+                )
+
+            with self._lock:
+                self._connection.execute("BEGIN")
+                n_issns += self._connection.executemany(
+                    "INSERT OR IGNORE INTO policies VALUES (?, ?, ?, ?)", rows
+                ).rowcount
+                self._connection.execute("COMMIT")
+
+        return n_issns
+
+    def __len__(self) -> int:
+        with self._lock:
+            (n_issns,) = self._connection.execute(
+                "SELECT COUNT(*) FROM policies"
+            ).fetchone()
+        return n_issns
+
+
+def load_publications_export(path: str) -> Iterator[dict]:
+    """Yields Sherpa publications from an export, which is either JSON as returned by
+    the API (``{"items": [...]}``) or JSON lines with one publication per line, both
+    optionally gzipped.
+    """
+    open_export = gzip.open if path.endswith(".gz") else open
+    with open_export(path, "rt") as fh:
+        if ".jsonl" in os.path.basename(path):
+            for line in fh:
+                yield json.loads(line)
+        else:
+            yield from json.load(fh)["items"]
+
+
+def build_policy_table(export_path: str, table_path: str) -> SherpaPolicyTable:
+    """Build a ``SherpaPolicyTable`` from a bulk export of Sherpa publications, e.g.
+    collected by paging through https://v2.sherpa.ac.uk/cgi/retrieve
+    """
+    table = SherpaPolicyTable(table_path)
+    table.insert(load_publications_export(export_path))
+    return table
@@ -0,0 +1,89 @@
+import asyncio
+from collections import Counter
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+from fyscience import clients
+
+T = TypeVar("T")
+
+_groups: Dict[str, "SingleFlight"] = {}
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key, i.e. while a call for a key is in
+    flight, further calls for that key wait for and share its result (or exception)
+    instead of calling upstream themselves.
+
+    The call runs without the deadline (see ``clients.deadline``) of whoever made it
+    first, as the callers coalesced with it may have later deadlines or none, so each
+    caller has to give up waiting at its own deadline, e.g. with ``asyncio.wait_for``.
+
+    Counts the calls made and coalesced, the latter also per key for up to
+    ``max_keys`` keys, to see how many upstream calls are saved during bursts.
+    """
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self.calls = 0
+        self.coalesced = 0
+        self.coalesced_per_key: Counter = Counter()
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        future = self._in_flight.get(key)
+        if future is not None and not future.done():
+            self.coalesced += 1
+            if (
+                key in self.coalesced_per_key
+                or len(self.coalesced_per_key) < self.max_keys
+            ):
+                self.coalesced_per_key[key] += 1
+            # Shielded, so that a cancelled caller doesn't cancel the call for all
+            return await asyncio.shield(future)
+
+        self.calls += 1
+        future = asyncio.ensure_future(_without_deadline(call))
+        self._in_flight[key] = future
+        future.add_done_callback(lambda _: self._forget(key, future))
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, future: asyncio.Future):
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+        # Mark the exception as retrieved, in case all callers were cancelled
+        if not future.cancelled():
+            future.exception()
+
+    def stats(self, top: int = 20) -> dict:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+            "most_coalesced": [
+                {"key": str(key), "coalesced": n}
+                for key, n in self.coalesced_per_key.most_common(top)
+            ],
+        }
+
+
+async def _without_deadline(call: Callable[[], Awaitable[T]]) -> T:
+    # The task runs in a copy of the caller's context, so this doesn't lift the
+    # caller's deadline
+    with clients.without_deadline():
+        return await call()
+
+
+def get_group(name: str) -> SingleFlight:
+    """Return the process wide single-flight group of a given name (e.g. a provider),
+    creating it on first use.
+    """
+    group = _groups.get(name)
+    if group is None:
+        group = SingleFlight()
+        _groups[name] = group
+
+    return group
+
+
+def stats() -> Dict[str, dict]:
+    return {name: group.stats() for name, group in _groups.items()}
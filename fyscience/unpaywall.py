@@ -1,9 +1,15 @@
 import os
-from typing import Optional, List
+import threading
+from collections import Counter
+from itertools import islice
+from typing import Callable, Dict, Iterable, Optional, List, Tuple
 
 import requests
 from pydantic import BaseModel
 
+from fyscience import clients, singleflight
+from fyscience.cache import connect_sqlite, is_not_found, set_not_found
+from fyscience.data import chunked, load_unpaywall_snapshot
 from fyscience.schemas import FullPaper
 
 
@@ -33,10 +39,8 @@ class Paper(BaseModel):
     z_authors: Optional[List[dict]] = None
 
 
-def _get_paper(doi: str, email: Optional[str] = None) -> Optional[Paper]:
-    """Fetch paper information, most notable information about the availability of an
-    open access version as well as the ISSN for a given DOI from the unpaywall API
-    (api.unpaywall.org)
+def _get_paper_url(doi: str, email: Optional[str] = None) -> str:
+    """Construct the unpaywall API (api.unpaywall.org) URL for a given DOI.
 
     Raises
     ------
@@ -51,7 +55,18 @@ def _get_paper(doi: str, email: Optional[str] = None) -> Optional[Paper]:
             + " environment variable."
         )
 
-    response = requests.get(f"https://api.unpaywall.org/v2/{doi}?email={email}")
+    return f"https://api.unpaywall.org/v2/{doi}?email={email}"
+
+
+def _get_paper(doi: str, email: Optional[str] = None) -> Optional[Paper]:
+    """Fetch paper information, most notable information about the availability of an
+    open access version as well as the ISSN for a given DOI from the unpaywall API
+    (api.unpaywall.org)
+    """
+    url = _get_paper_url(doi, email)
+    response = clients.call(
+        "unpaywall", lambda: requests.get(url, timeout=clients.SYNC_TIMEOUT)
+    )
     if not response.ok:
         return None
 
@@ -60,6 +75,17 @@ def _get_paper(doi: str, email: Optional[str] = None) -> Optional[Paper]:
     return paper
 
 
+async def _get_paper_async(doi: str, email: Optional[str] = None) -> Optional[Paper]:
+    """Async version of ``_get_paper`` using the shared unpaywall connection pool."""
+    response = await clients.get("unpaywall", _get_paper_url(doi, email))
+    if not response.is_success:
+        return None
+
+    data = response.json()
+    paper = Paper(**data)
+    return paper
+
+
 def _extract_authors(authors: List[dict]) -> str:
     if "sequence" in authors[0]:
         first_authors = [a for a in authors if a["sequence"] == "first"]
@@ -74,20 +100,18 @@ def _extract_authors(authors: List[dict]) -> str:
     return extracted_author
 
 
-def get_paper(doi: str, email: Optional[str] = None) -> Optional[FullPaper]:
-    paper = _get_paper(doi, email)
+def _extract_oa_location_url(best_oa_location: Optional[dict]) -> Optional[str]:
+    if best_oa_location is None:
+        return None
+
+    return best_oa_location.get("url", best_oa_location.get("url_for_pdf", None))
+
+
+def _to_full_paper(doi: str, paper: Optional[Paper]) -> Optional[FullPaper]:
     if paper is None:
         return None
 
-    oa_location_url = None
-    if paper.best_oa_location is not None:
-        oa_location_url = paper.best_oa_location.get(
-            "url",
-            paper.best_oa_location.get(
-                "url_for_pdf",
-                None,
-            ),
-        )
+    oa_location_url = _extract_oa_location_url(paper.best_oa_location)
 
     return FullPaper(
         doi=doi,
@@ -99,3 +123,326 @@ def get_paper(doi: str, email: Optional[str] = None) -> Optional[FullPaper]:
         authors=_extract_authors(paper.z_authors) if paper.z_authors else None,
         oa_location_url=oa_location_url,
     )
+
+
+def _cache_paper(cache, doi: str, paper: Optional[FullPaper]):
+    if cache is None:
+        return
+
+    if paper is None:
+        set_not_found(cache, doi)
+    else:
+        cache[doi] = paper.dict()
+
+
+def get_paper(doi: str, email: Optional[str] = None, cache=None) -> Optional[FullPaper]:
+    """Cache can be anything that exposes ``get(key, default)`` and ``__setitem__``
+    and is filled with ``FullPaper.dict()`` per DOI, e.g. also an ``UnpaywallIndex``
+    wrapped in a ``fyscience.cache.LayeredCache``. DOIs unknown to unpaywall are
+    cached as negative entries, whereas ``fyscience.clients.UpstreamError`` is raised
+    without caching anything in case unpaywall fails to answer.
+    """
+    if cache is not None:
+        cached = cache.get(doi, None)
+        if cached is not None:
+            return None if is_not_found(cached) else FullPaper(**cached)
+
+    paper = _to_full_paper(doi, _get_paper(doi, email))
+    _cache_paper(cache, doi, paper)
+
+    return paper
+
+
+async def get_paper_async(
+    doi: str, email: Optional[str] = None, cache=None
+) -> Optional[FullPaper]:
+    """Async version of ``get_paper``."""
+    if cache is not None:
+        cached = cache.get(doi, None)
+        if cached is not None:
+            return None if is_not_found(cached) else FullPaper(**cached)
+
+    # Concurrent lookups of a DOI share one request, but each gets its own FullPaper
+    unpaywall_paper = await singleflight.get_group("unpaywall").do(
+        doi, lambda: _get_paper_async(doi, email)
+    )
+    paper = _to_full_paper(doi, unpaywall_paper)
+    _cache_paper(cache, doi, paper)
+
+    return paper
+
+
+PAPER_COLUMNS = "is_oa, issn_l, title, year, journal, authors, oa_location_url"
+
+# Change to counters caused by replacing an index entry (None if new) with a record
+CountChange = Callable[[Optional[dict], dict], Dict[str, int]]
+
+
+class UnpaywallIndex:
+    """Local, DOI keyed store of the information ``get_paper`` extracts from unpaywall
+    records, built from an unpaywall snapshot (see ``build_index``) and kept in a
+    SQLite database.
+
+    Exposes ``get(doi, default)`` returning ``FullPaper.dict()`` like the caches passed
+    to ``get_paper``, but is read-only, i.e. to be used via a
+    ``fyscience.cache.LayeredCache``.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = connect_sqlite(path)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS papers ("
+            " doi TEXT PRIMARY KEY,"
+            " is_oa INTEGER NOT NULL,"
+            " issn_l TEXT,"
+            " title TEXT,"
+            " year INTEGER,"
+            " journal TEXT,"
+            " authors TEXT,"
+            " oa_location_url TEXT"
+            ") WITHOUT ROWID"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS changefiles ("
+            " name TEXT PRIMARY KEY,"
+            " n_records INTEGER NOT NULL,"
+            " completed INTEGER NOT NULL"
+            ")"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS counters ("
+            " name TEXT PRIMARY KEY,"
+            " value INTEGER NOT NULL"
+            ")"
+        )
+
+    def get(self, doi: str, default=None) -> Optional[dict]:
+        with self._lock:
+            row = self._connection.execute(
+                f"SELECT {PAPER_COLUMNS} FROM papers WHERE doi = ?", (doi.lower(),)
+            ).fetchone()
+
+        return default if row is None else _from_index_row(doi, row)
+
+    def get_many(self, dois: List[str]) -> Dict[str, dict]:
+        """Entries of the given DOIs that are in the index, by lower case DOI"""
+        entries = {}
+        for batch in chunked(dois, 500):
+            lower_dois = [doi.lower() for doi in batch]
+            with self._lock:
+                rows = self._connection.execute(
+                    f"SELECT doi, {PAPER_COLUMNS} FROM papers"
+                    f" WHERE doi IN ({', '.join('?' * len(lower_dois))})",
+                    lower_dois,
+                ).fetchall()
+            entries.update((row[0], _from_index_row(row[0], row[1:])) for row in rows)
+
+        return entries
+
+    def upsert(self, records: Iterable[dict], batch_size: int = 10000) -> int:
+        """Insert or replace unpaywall records (as in the snapshot and the API) and
+        return the number of records written.
+        """
+        n_records = 0
+        for batch in chunked(records, batch_size):
+            n_records += self._write([_to_index_row(r) for r in batch])
+
+        return n_records
+
+    def ingest_changefile(
+        self,
+        path: str,
+        batch_size: int = 10000,
+        count: Optional[CountChange] = None,
+    ) -> int:
+        """Apply an unpaywall changefile (jsonl.gz) as upserts and return the number of
+        records written.
+
+        The progress is committed together with every batch of records, so an
+        interrupted ingestion resumes after the last committed batch, and changefiles
+        that were ingested completely before are skipped.
+
+        ``count`` is called with the current entry of each record's DOI (or None) and
+        the record, to return how the record changes the ``counters``, which are
+        committed together with the batch, too.
+        """
+        name = os.path.basename(path)
+        n_ingested, completed = self._changefile_progress(name)
+        if completed:
+            return 0
+
+        records = islice(load_unpaywall_snapshot(path), n_ingested, None)
+        n_records = 0
+        for batch in chunked(records, batch_size):
+            n_records += self._write(
+                [_to_index_row(r) for r in batch],
+                progress=(name, n_ingested + n_records + len(batch), False),
+                counter_changes=None if count is None else self._count(batch, count),
+            )
+
+        self._write([], progress=(name, n_ingested + n_records, True))
+        return n_records
+
+    def high_water_mark(self) -> Optional[str]:
+        """Name of the most recent changefile that was ingested completely."""
+        with self._lock:
+            return self._connection.execute(
+                "SELECT MAX(name) FROM changefiles WHERE completed = 1"
+            ).fetchone()[0]
+
+    def n_changefiles_since_compaction(self) -> int:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM changefiles WHERE completed = 1 AND name > "
+                "COALESCE((SELECT value FROM meta WHERE key = 'compacted_after'), '')"
+            ).fetchone()[0]
+
+    def compact(self):
+        """Reclaim the space of replaced records and fold the write-ahead log back
+        into the database file.
+        """
+        high_water_mark = self.high_water_mark()
+        with self._lock:
+            self._connection.execute("VACUUM")
+            self._connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._connection.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('compacted_after', ?)",
+                (high_water_mark or "",),
+            )
+
+    def counters(self) -> Dict[str, int]:
+        """Counts kept up to date by ``ingest_changefile``, e.g. the metrics summary"""
+        with self._lock:
+            return dict(
+                self._connection.execute("SELECT name, value FROM counters").fetchall()
+            )
+
+    def set_counters(self, counters: Dict[str, int]):
+        with self._lock:
+            self._connection.execute("BEGIN")
+            self._connection.execute("DELETE FROM counters")
+            self._connection.executemany(
+                "INSERT INTO counters VALUES (?, ?)", counters.items()
+            )
+            self._connection.execute("COMMIT")
+
+    def _count(self, records: List[dict], count: CountChange) -> Counter:
+        entries = self.get_many([r["doi"] for r in records])
+        changes: Counter = Counter()
+        # The last of several records for the same DOI in a batch is the one written
+        for record in {r["doi"].lower(): r for r in records}.values():
+            changes.update(count(entries.get(record["doi"].lower()), record))
+
+        return changes
+
+    def _changefile_progress(self, name: str) -> Tuple[int, bool]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT n_records, completed FROM changefiles WHERE name = ?", (name,)
+            ).fetchone()
+
+        return (0, False) if row is None else (row[0], bool(row[1]))
+
+    def _write(
+        self,
+        rows: List[tuple],
+        progress: Optional[Tuple[str, int, bool]] = None,
+        counter_changes: Optional[Dict[str, int]] = None,
+    ) -> int:
+        with self._lock:
+            self._connection.execute("BEGIN")
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO papers VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            if progress is not None:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO changefiles VALUES (?, ?, ?)", progress
+                )
+            if counter_changes:
+                self._connection.executemany(
+                    "INSERT INTO counters VALUES (?, ?) ON CONFLICT(name)"
+                    " DO UPDATE SET value = value + excluded.value",
+                    counter_changes.items(),
+                )
+            self._connection.execute("COMMIT")
+        return len(rows)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+
+
+def _from_index_row(doi: str, row: tuple) -> dict:
+    is_oa, issn_l, title, year, journal, authors, oa_location_url = row
+    return dict(
+        doi=doi,
+        issn=issn_l,
+        is_open_access=bool(is_oa),
+        title=title,
+        year=year,
+        journal=journal,
+        authors=authors,
+        oa_location_url=oa_location_url,
+    )
+
+
+def _to_index_row(record: dict) -> tuple:
+    try:
+        authors = (
+            _extract_authors(record["z_authors"]) if record.get("z_authors") else None
+        )
+    except KeyError:
+        # E.g. consortia, which are listed by name only
+        authors = None
+
+    return (
+        record["doi"].lower(),
+        record["is_oa"],
+        record.get("journal_issn_l"),
+        record.get("title"),
+        record.get("year"),
+        record.get("journal_name"),
+        authors,
+        _extract_oa_location_url(record.get("best_oa_location")),
+    )
+
+
+def build_index(snapshot_path: str, index_path: str) -> UnpaywallIndex:
+    """Build an ``UnpaywallIndex`` from an unpaywall snapshot (jsonl.gz) as available
+    at https://unpaywall.org/products/snapshot
+    """
+    index = UnpaywallIndex(index_path)
+    index.upsert(load_unpaywall_snapshot(snapshot_path))
+    return index
+
+
+def ingest_changefiles(
+    index: UnpaywallIndex,
+    paths: Iterable[str],
+    compact_every: int = 30,
+    count: Optional[CountChange] = None,
+) -> int:
+    """Ingest unpaywall changefiles into the index in chronological (i.e. file name)
+    order and return the number of records written, updating the index's counters
+    with ``count`` (see ``UnpaywallIndex.ingest_changefile``).
+
+    Changefiles older than the index's high water mark are skipped, as they would
+    overwrite more recent records. The index is compacted whenever ``compact_every``
+    changefiles have been ingested since the last compaction.
+    """
+    high_water_mark = index.high_water_mark()
+    n_records = 0
+    for path in sorted(paths, key=os.path.basename):
+        if high_water_mark is not None and os.path.basename(path) < high_water_mark:
+            continue
+
+        n_records += index.ingest_changefile(path, count=count)
+        if index.n_changefiles_since_compaction() >= compact_every:
+            index.compact()
+
+    return n_records
@@ -1,6 +1,7 @@
 import json
 import multiprocessing
 import os
+import shutil
 
 workers_per_core_str = os.getenv("WORKERS_PER_CORE", "1")
 max_workers_str = os.getenv("MAX_WORKERS")
@@ -48,6 +49,26 @@ timeout = int(timeout_str)
 keepalive = int(keepalive_str)
 
 
+# Workers write their metrics to files in PROMETHEUS_MULTIPROC_DIR, from which /metrics
+# aggregates those of all workers, see fyscience.monitoring
+prometheus_multiproc_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR", None)
+
+
+def on_starting(server):
+    """Start with empty metrics, rather than those of a previous run"""
+    if prometheus_multiproc_dir:
+        shutil.rmtree(prometheus_multiproc_dir, ignore_errors=True)
+        os.makedirs(prometheus_multiproc_dir)
+
+
+def child_exit(server, worker):
+    """Drop the in progress gauges of exited workers, but keep their counters"""
+    if prometheus_multiproc_dir:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
+
+
 # For debugging and testing
 log_data = {
     "loglevel": loglevel,
@@ -56,6 +77,7 @@ log_data = {
     "graceful_timeout": graceful_timeout,
     "timeout": timeout,
     "keepalive": keepalive,
+    "prometheus_multiproc_dir": prometheus_multiproc_dir,
     "errorlog": errorlog,
     "accesslog": accesslog,
     # Additional, non-gunicorn variables
@@ -1,23 +1,33 @@
 import os
 import argparse
-from functools import partial
+from itertools import islice
 
-from fyscience.cache import json_filesystem_cache
-from fyscience.data import load_jsonl, calculate_metrics
+from fyscience.cache import LayeredCache, SQLiteCache
+from fyscience.data import load_jsonl
 from fyscience.oa_pathway import oa_pathway
 from fyscience.oa_status import validate_oa_status_from_s2
-from fyscience.schemas import PaperWithOAStatus
+from fyscience.pipeline import run_pipeline
+from fyscience.schemas import PaperRecord
+from fyscience.sherpa import SherpaPolicyTable
+
+
+CACHE_TTL = 30 * 24 * 60 * 60
 
 
 if __name__ == "__main__":
     # TODO: Consider checking against publicly available publishers / ISSNS (e.g. elife)
     parser = argparse.ArgumentParser()
-    # TODO: find way to reintroduce '--limit' for generator based loading
     parser.add_argument(
-        "--pathway-cache",
+        "--cache",
+        type=str,
+        default="./cache.sqlite",
+        help="Path to the SQLite cache of pathway and Semantic Scholar lookups.",
+    )
+    parser.add_argument(
+        "--policy-table",
         type=str,
-        default="./pathway.json",
-        help="Path to cache open access pathway information at.",
+        default=None,
+        help="Path to a Sherpa policy table to look up pathways in before the API.",
     )
     parser.add_argument(
         "--unpaywall-extract",
@@ -25,37 +35,74 @@ if __name__ == "__main__":
         default="../tests/assets/unpaywall_subset.jsonl",
         help="Path to extract of unpaywall dataset with doi, issn and oa status",
     )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=None,
+        help="Only process the first papers of the extract.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="Number of papers looked up concurrently.",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=1000,
+        help="Number of papers processed between checkpoints.",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=str,
+        default="./are_we_right.checkpoint.json",
+        help="Path to save progress at, from which an interrupted run with the same "
+        "extract, limit and policy table resumes. Deleted once the run completes.",
+    )
     args = parser.parse_args()
 
     # Load data
     dataset_file_path = os.path.join(os.path.dirname(__file__), args.unpaywall_extract)
 
     # TODO: Skip papers with ISSNs for which cache says no policy could be found
-    papers_with_oa_status = (
-        PaperWithOAStatus(
-            doi=paper["doi"],
-            issn=paper["journal_issn_l"],
-            is_open_access=paper["is_oa"],
-        )
-        for paper in load_jsonl(dataset_file_path)
-        if paper["journal_issn_l"] is not None
+    papers_with_oa_status = islice(
+        (
+            PaperRecord.from_unpaywall(paper)
+            for paper in load_jsonl(dataset_file_path)
+            if paper["journal_issn_l"] is not None
+        ),
+        args.limit,
     )
 
-    with json_filesystem_cache(args.pathway_cache) as pathway_cache:
-        # Enrich data
-        papers_with_s2_validated_oa_status = map(
-            validate_oa_status_from_s2, papers_with_oa_status
-        )
-        papers_with_pathway = map(
-            partial(oa_pathway, cache=pathway_cache), papers_with_s2_validated_oa_status
+    pathway_cache = SQLiteCache(args.cache, namespace="sherpa", ttl=CACHE_TTL)
+    if args.policy_table is not None:
+        pathway_cache = LayeredCache(
+            pathway_cache, SherpaPolicyTable(args.policy_table)
         )
+    s2_cache = SQLiteCache(args.cache, namespace="semantic_scholar", ttl=CACHE_TTL)
 
-        # Calculate & report metrics
-        # TODO: count number of papers from generator
-        n_oa, n_pathway_nocost, n_pathway_other, n_unknown = calculate_metrics(
-            papers_with_pathway
-        )
+    def enrich(paper):
+        paper = validate_oa_status_from_s2(paper, cache=s2_cache)
+        return oa_pathway(paper, cache=pathway_cache)
+
+    # Enrich data & calculate metrics
+    n_papers, (n_oa, n_pathway_nocost, n_pathway_other, n_unknown) = run_pipeline(
+        papers_with_oa_status,
+        enrich,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        checkpoint_path=args.checkpoint,
+        run={
+            "unpaywall_extract": os.path.abspath(dataset_file_path),
+            "limit": args.limit,
+            "policy_table": args.policy_table,
+            "policy_table_mtime": args.policy_table
+            and os.path.getmtime(args.policy_table),
+        },
+    )
 
+    print(f"Out of {n_papers} papers")
     print(f"{n_oa} are already OA")
     print(f"{n_pathway_nocost} could be OA at no cost")
     print(f"{n_pathway_other} has other OA pathway(s)")
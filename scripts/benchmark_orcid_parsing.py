@@ -0,0 +1,104 @@
+import os
+import re
+import time
+import argparse
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+from fyscience.orcid import (
+    CHUNK_SIZE,
+    CREDIT_NAME,
+    EXT_IDS,
+    EXT_ID_TYPE,
+    EXT_ID_VALUE,
+    WORKS,
+    _AuthorParser,
+)
+
+
+ASSETS_PATH = os.path.join(os.path.dirname(__file__), "..", "tests", "assets")
+
+
+def build_record(n_copies: int) -> bytes:
+    """ORCID record of the author fixture with the groups of the works fixture copied
+    ``n_copies`` times as their works, each copy with distinct DOIs.
+    """
+    with open(os.path.join(ASSETS_PATH, "orcid_author.xml"), "r") as fh:
+        record = fh.read()
+    with open(os.path.join(ASSETS_PATH, "orcid_works.xml"), "r") as fh:
+        works = fh.read()
+
+    groups_start = works.index("<activities:group>")
+    groups = works[groups_start : works.rindex("</activities:works>")]
+    doi_pattern = re.compile(r"(<common:external-id-value>10\.[^<]*)")
+    copies = (doi_pattern.sub(rf"\g<1>.{i}", groups) for i in range(n_copies))
+
+    works_start = record.index(">", record.index("<activities:works ")) + 1
+    works_end = record.index("</activities:works>")
+    return (record[:works_start] + "".join(copies) + record[works_end:]).encode()
+
+
+def parse_tree(content: bytes) -> tuple:
+    """Previous implementation, which builds the whole tree before reading it"""
+    root = ET.fromstring(content.decode())
+    author_name = list(root.iter(CREDIT_NAME))[0].text
+    works = list(root.iter(WORKS))[0]
+    dois_with_issn = {}
+    for eids in works.iter(EXT_IDS):
+        doi, issn = None, None
+        for child in eids:
+            if child.find(EXT_ID_TYPE).text == "doi":
+                doi = child.find(EXT_ID_VALUE).text
+            elif child.find(EXT_ID_TYPE).text == "issn":
+                issn = child.find(EXT_ID_VALUE).text
+
+        if doi is not None and issn is not None:
+            dois_with_issn[doi] = issn
+        elif doi is not None and doi not in dois_with_issn:
+            dois_with_issn[doi] = None
+
+    return author_name, dois_with_issn
+
+
+def parse_incrementally(content: bytes) -> tuple:
+    parser = _AuthorParser("0000-0000-0000-0000")
+    for i in range(0, len(content), CHUNK_SIZE):
+        parser.feed(content[i : i + CHUNK_SIZE])
+    author = parser.close()
+    return author.name, {p.doi: p.issn for p in author.papers}
+
+
+def measure(parse, content: bytes, repeat: int) -> tuple:
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(content)
+        seconds.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    parse(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return min(seconds), peak
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--copies",
+        type=int,
+        default=500,
+        help="How many times to copy the works of tests/assets/orcid_works.xml.",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    content = build_record(args.copies)
+    name, dois_with_issn = parse_incrementally(content)
+    assert (name, dois_with_issn) == parse_tree(content)
+    print(f"Record of {len(content) / 1e6:.1f} MB with {len(dois_with_issn)} DOIs")
+
+    for label, parse in (("tree", parse_tree), ("incremental", parse_incrementally)):
+        seconds, peak = measure(parse, content, args.repeat)
+        print(f"{label}:\t{seconds * 1000:.0f} ms\t{peak / 1e6:.1f} MB peak")
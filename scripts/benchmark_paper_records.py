@@ -0,0 +1,87 @@
+import time
+import argparse
+import tracemalloc
+
+from fyscience.oa_pathway import oa_pathway
+from fyscience.schemas import OAPathway, PaperRecord, PaperWithOAStatus
+
+
+def build_records(n_records: int, n_issns: int) -> list:
+    """Records like those of the unpaywall snapshot, with a third of them OA"""
+    return [
+        {
+            "doi": f"10.1/{i}",
+            "journal_issn_l": f"{i % n_issns:04d}-0000",
+            "is_oa": i % 3 == 0,
+            "year": 2000 + i % 20,
+        }
+        for i in range(n_records)
+    ]
+
+
+def enrich_models(records: list, cache: dict) -> list:
+    """Previous representation, validating every record and the enriched paper"""
+    return [
+        oa_pathway(
+            PaperWithOAStatus(
+                doi=record["doi"],
+                issn=record["journal_issn_l"],
+                is_open_access=record["is_oa"],
+            ),
+            cache=cache,
+        )
+        for record in records
+    ]
+
+
+def enrich_records(records: list, cache: dict) -> list:
+    return [
+        oa_pathway(PaperRecord.from_unpaywall(record), cache=cache)
+        for record in records
+    ]
+
+
+def measure(enrich, records: list, cache: dict, repeat: int) -> tuple:
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        enrich(records, cache)
+        seconds.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    papers = enrich(records, cache)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del papers
+
+    return min(seconds), retained - baseline
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=100000)
+    parser.add_argument("--issns", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    records = build_records(args.records, args.issns)
+    # Pathways as cached per ISSN, i.e. without any Sherpa requests
+    cache = {
+        f"{i:04d}-0000": (OAPathway.nocost, f"https://sherpa/{i}", [{"id": i}])
+        for i in range(args.issns)
+    }
+
+    papers = enrich_records(records, cache)
+    assert [p.to_full_paper().oa_pathway for p in papers] == [
+        p.oa_pathway for p in enrich_models(records, cache)
+    ]
+    print(f"Enriching {len(records)} records with {args.issns} ISSNs")
+
+    for label, enrich in (("models", enrich_models), ("records", enrich_records)):
+        seconds, retained = measure(enrich, records, cache, args.repeat)
+        print(
+            f"{label}:\t{seconds * 1000:.0f} ms"
+            f"\t{seconds / len(records) * 1e6:.2f} µs/record"
+            f"\t{retained / len(records):.0f} B/record retained"
+        )
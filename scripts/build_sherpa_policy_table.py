@@ -0,0 +1,25 @@
+import time
+import argparse
+
+from fyscience.sherpa import build_policy_table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--export",
+        type=str,
+        default="/mnt/data/fyscience/sherpa_publications.jsonl.gz",
+        help="Path to the Sherpa publications export (json or jsonl, maybe gzipped).",
+    )
+    parser.add_argument(
+        "--table",
+        type=str,
+        default="/mnt/data/fyscience/sherpa.sqlite",
+        help="Path to write the table to, to be set as SHERPA_POLICY_TABLE_PATH.",
+    )
+    args = parser.parse_args()
+
+    start = time.monotonic()
+    table = build_policy_table(args.export, args.table)
+    print(f"Stored pathways of {len(table)} ISSNs in {time.monotonic() - start:.0f}s")
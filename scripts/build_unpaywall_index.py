@@ -0,0 +1,25 @@
+import time
+import argparse
+
+from fyscience.unpaywall import build_index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--snapshot",
+        type=str,
+        default="/mnt/data/fyscience/unpaywall.jsonl.gz",
+        help="Path to the unpaywall snapshot (jsonl.gz).",
+    )
+    parser.add_argument(
+        "--index",
+        type=str,
+        default="/mnt/data/fyscience/unpaywall.sqlite",
+        help="Path to write the DOI index to, to be set as UNPAYWALL_INDEX_PATH.",
+    )
+    args = parser.parse_args()
+
+    start = time.monotonic()
+    index = build_index(args.snapshot, args.index)
+    print(f"Indexed {len(index)} DOIs in {time.monotonic() - start:.0f}s")
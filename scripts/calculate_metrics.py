@@ -0,0 +1,104 @@
+import os
+import time
+import argparse
+
+from fyscience.cache import LayeredCache, SQLiteCache
+from fyscience.data import load_unpaywall_snapshot
+from fyscience.metrics import GROUP_BY_COLUMNS, PaperColumns, save_summary, summarize
+from fyscience.oa_pathway import oa_pathway
+from fyscience.schemas import PaperRecord
+from fyscience.sherpa import SherpaPolicyTable
+from fyscience.unpaywall import UnpaywallIndex
+
+
+CACHE_TTL = 30 * 24 * 60 * 60
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--snapshot",
+        type=str,
+        default="/mnt/data/fyscience/unpaywall.jsonl.gz",
+        help="Path to the unpaywall snapshot (jsonl.gz).",
+    )
+    parser.add_argument(
+        "--columns",
+        type=str,
+        default="/mnt/data/fyscience/unpaywall_columns.npz",
+        help="Path to save the columns at, which are loaded instead of the snapshot "
+        "if they exist. Delete them to parse the snapshot again.",
+    )
+    parser.add_argument(
+        "--cache",
+        type=str,
+        default="./cache.sqlite",
+        help="Path to the SQLite cache of pathway lookups.",
+    )
+    parser.add_argument(
+        "--policy-table",
+        type=str,
+        default=None,
+        help="Path to a Sherpa policy table to look up pathways in before the API.",
+    )
+    parser.add_argument(
+        "--summary",
+        type=str,
+        default="/mnt/data/fyscience/metrics.json",
+        help="Path to write the metrics to, to be set as METRICS_SUMMARY_PATH.",
+    )
+    parser.add_argument(
+        "--index",
+        type=str,
+        default=None,
+        help="Path to the unpaywall index built from the same snapshot, to keep the "
+        "metrics in, so that ingest_unpaywall_changefiles.py keeps them up to date.",
+    )
+    parser.add_argument(
+        "--group-by",
+        type=str,
+        choices=GROUP_BY_COLUMNS,
+        default=None,
+        help="Also report the metrics per year, issn or publisher.",
+    )
+    args = parser.parse_args()
+
+    start = time.monotonic()
+    if os.path.exists(args.columns):
+        columns = PaperColumns.load(args.columns)
+    else:
+        columns = PaperColumns.from_records(load_unpaywall_snapshot(args.snapshot))
+        columns.save(args.columns)
+    print(f"Loaded {len(columns)} papers in {time.monotonic() - start:.0f}s")
+
+    pathway_cache = SQLiteCache(args.cache, namespace="sherpa", ttl=CACHE_TTL)
+    if args.policy_table is not None:
+        pathway_cache = LayeredCache(
+            pathway_cache, SherpaPolicyTable(args.policy_table)
+        )
+
+    def lookup(issn):
+        paper = PaperRecord("", issn, is_open_access=False)
+        return oa_pathway(paper, cache=pathway_cache).oa_pathway
+
+    start = time.monotonic()
+    columns.with_pathways(lookup)
+    print(
+        f"Looked up pathways of {len(columns.issn_categories)} ISSNs "
+        f"in {time.monotonic() - start:.0f}s"
+    )
+
+    save_summary(args.summary, columns)
+    if args.index is not None:
+        UnpaywallIndex(args.index).set_counters(summarize(columns))
+
+    n_oa, n_pathway_nocost, n_pathway_other, n_unknown = columns.metrics()
+    print(f"{n_oa} are already OA")
+    print(f"{n_pathway_nocost} could be OA at no cost")
+    print(f"{n_pathway_other} has other OA pathway(s)")
+    print(f"{n_unknown} could not be determined")
+
+    if args.group_by is not None:
+        print(f"\n{args.group_by}\tOA\tno cost\tother\tunknown")
+        for key, metrics in columns.metrics_by(args.group_by).items():
+            print("\t".join(str(v) for v in (key, *metrics)))
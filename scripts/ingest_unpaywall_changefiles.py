@@ -0,0 +1,92 @@
+import os
+import glob
+import time
+import argparse
+
+from fyscience.cache import LayeredCache, SQLiteCache
+from fyscience.metrics import summary_change, write_summary
+from fyscience.oa_pathway import oa_pathway
+from fyscience.schemas import PaperRecord
+from fyscience.sherpa import SherpaPolicyTable
+from fyscience.unpaywall import UnpaywallIndex, ingest_changefiles
+
+
+CACHE_TTL = 30 * 24 * 60 * 60
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--changefiles",
+        type=str,
+        default="/mnt/data/fyscience/changefiles",
+        help="Directory with the downloaded unpaywall changefiles (jsonl.gz).",
+    )
+    parser.add_argument(
+        "--index",
+        type=str,
+        default="/mnt/data/fyscience/unpaywall.sqlite",
+        help="Path to the DOI index built with build_unpaywall_index.py.",
+    )
+    parser.add_argument(
+        "--compact-every",
+        type=int,
+        default=30,
+        help="Compact the index after this many ingested changefiles.",
+    )
+    parser.add_argument(
+        "--summary",
+        type=str,
+        default=None,
+        help="Path of the metrics summary (METRICS_SUMMARY_PATH) to update with the "
+        "changes, which requires calculate_metrics.py to have been run with --index.",
+    )
+    parser.add_argument(
+        "--cache",
+        type=str,
+        default="./cache.sqlite",
+        help="Path to the SQLite cache of pathway lookups.",
+    )
+    parser.add_argument(
+        "--policy-table",
+        type=str,
+        default=None,
+        help="Path to a Sherpa policy table to look up pathways in before the API.",
+    )
+    args = parser.parse_args()
+
+    index = UnpaywallIndex(args.index)
+    count = None
+    if args.summary is not None:
+        if not index.counters():
+            parser.error("The index has no metrics, run calculate_metrics.py --index")
+
+        pathway_cache = SQLiteCache(args.cache, namespace="sherpa", ttl=CACHE_TTL)
+        if args.policy_table is not None:
+            pathway_cache = LayeredCache(
+                pathway_cache, SherpaPolicyTable(args.policy_table)
+            )
+
+        def lookup(issn):
+            paper = PaperRecord("", issn, is_open_access=False)
+            return oa_pathway(paper, cache=pathway_cache).oa_pathway
+
+        count = summary_change(lookup)
+
+    print(f"Ingesting changefiles after {index.high_water_mark()}")
+
+    start = time.monotonic()
+    n_records = ingest_changefiles(
+        index,
+        glob.glob(os.path.join(args.changefiles, "*.jsonl.gz")),
+        compact_every=args.compact_every,
+        count=count,
+    )
+    print(
+        f"Upserted {n_records} records in {time.monotonic() - start:.0f}s,"
+        + f" now up to {index.high_water_mark()}"
+    )
+
+    if args.summary is not None:
+        write_summary(args.summary, index.counters())
+        print(f"Updated the metrics summary at {args.summary}")
@@ -1,6 +1,7 @@
-import gzip
 import json
 
+from fyscience.data import load_unpaywall_snapshot
+
 UNPAYWALL_SNAPSHOT_PATH = "/mnt/data/fyscience/unpaywall.jsonl.gz"
 
 
@@ -15,13 +16,6 @@ def extract_fields(json_loader):
         )
 
 
-def load_unpaywall_snapshot(jsonl_gzip_path):
-    """Yields records from unpaywall snapshot jsonl.gzip"""
-    with gzip.open(jsonl_gzip_path) as file:
-        for line in file:
-            yield json.loads(line)
-
-
 if __name__ == "__main__":
     doi_issn = extract_fields(load_unpaywall_snapshot(UNPAYWALL_SNAPSHOT_PATH))
     with open("tests/assets/unpaywall_subset.jsonl", "w") as fh:
@@ -0,0 +1,126 @@
+import time
+import json
+
+from fyscience.cache import (
+    NOT_FOUND,
+    LayeredCache,
+    SQLiteCache,
+    TTLCache,
+    is_not_found,
+    json_filesystem_cache,
+    set_not_found,
+)
+
+
+def test_ttl_cache_get_and_set():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache["a"] = 1
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("b", "default") == "default"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache["a"] = 1
+    cache["b"] = 2
+    cache.get("a")
+    cache["c"] = 3
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(maxsize=2, ttl=0.01)
+    cache["a"] = 1
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    assert cache.stats()["evictions"] == 1
+
+
+def test_json_filesystem_cache_persists(tmp_path):
+    cache_path = str(tmp_path / "pathway.json")
+
+    with json_filesystem_cache(cache_path) as cache:
+        cache["1234-1234"] = ("nocost", None, None)
+
+    with open(cache_path) as fh:
+        assert json.load(fh) == {"1234-1234": ["nocost", None, None]}
+
+    with json_filesystem_cache(cache_path) as cache:
+        assert cache.get("1234-1234") == ["nocost", None, None]
+
+
+def test_sqlite_cache_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    worker_a = SQLiteCache(path, namespace="sherpa")
+    worker_b = SQLiteCache(path, namespace="sherpa")
+    other_namespace = SQLiteCache(path, namespace="unpaywall")
+
+    worker_a["1234-1234"] = ("nocost", "https://sherpa/uri", [{"id": 1}])
+
+    assert worker_b.get("1234-1234") == ["nocost", "https://sherpa/uri", [{"id": 1}]]
+    assert other_namespace.get("1234-1234") is None
+    assert worker_b.stats()["hits"] == 1
+    assert other_namespace.stats()["misses"] == 1
+
+
+def test_sqlite_cache_expires_entries(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite"), namespace="sherpa", ttl=0.01)
+    cache["a"] = 1
+    cache["b"] = 2
+    time.sleep(0.02)
+
+    assert cache.get("a", "default") == "default"
+    assert cache.purge_expired() == 1
+    assert len(cache) == 0
+    assert cache.stats()["evictions"] == 2
+
+
+def test_layered_cache_prefers_stores_and_writes_to_cache():
+    store, cache = {"a": "from store"}, TTLCache()
+    layered = LayeredCache(cache, store)
+
+    layered["a"] = "from api"
+    layered["b"] = "from api"
+
+    assert layered.get("a") == "from store"
+    assert layered.get("b") == "from api"
+    assert layered.get("c", "default") == "default"
+    assert store == {"a": "from store"}
+    assert layered.stats()["store_hits"] == 1
+    assert layered.stats()["hits"] == 1
+
+
+def test_negative_entries_expire_after_negative_ttl(tmp_path):
+    for cache in (
+        TTLCache(ttl=60, negative_ttl=0.01),
+        SQLiteCache(str(tmp_path / "cache.sqlite"), "sherpa", 60, negative_ttl=0.01),
+    ):
+        cache["a"] = 1
+        set_not_found(cache, "b")
+        assert is_not_found(cache.get("b"))
+
+        time.sleep(0.02)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+
+
+def test_set_not_found_on_plain_and_layered_caches():
+    plain = {}
+    set_not_found(plain, "a")
+    assert plain == {"a": NOT_FOUND}
+
+    cache = TTLCache(negative_ttl=60)
+    set_not_found(LayeredCache(cache, {}), "a", ("not_found", None, None))
+    assert cache.get("a") == ("not_found", None, None)
@@ -0,0 +1,330 @@
+import asyncio
+import threading
+
+import httpx
+import pytest
+from requests import ConnectionError, Response
+
+from fyscience import clients
+from fyscience.ratelimit import SQLiteTokenBucket
+
+
+def test_get_client_is_shared_per_provider():
+    assert clients.get_client("sherpa") is clients.get_client("sherpa")
+    assert clients.get_client("sherpa") is not clients.get_client("unpaywall")
+    asyncio.run(clients.close_clients())
+
+
+def test_get_client_unknown_provider():
+    with pytest.raises(ValueError):
+        clients.get_client("not-a-provider")
+
+
+def test_close_clients_recreates_client_on_next_use():
+    client = clients.get_client("orcid")
+    asyncio.run(clients.close_clients())
+
+    assert client.is_closed
+    assert clients.get_client("orcid") is not client
+    asyncio.run(clients.close_clients())
+
+
+def test_get_uses_provider_client(monkeypatch):
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.host == "api.crossref.org"
+        return httpx.Response(200, json={"ok": True})
+
+    mock_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(clients, "get_client", lambda provider: mock_client)
+
+    response = asyncio.run(clients.get("crossref", "https://api.crossref.org/works"))
+    assert response.json() == {"ok": True}
+
+
+@pytest.mark.parametrize("status_code", [401, 429, 500, 503])
+def test_get_raises_upstream_error(status_code, monkeypatch):
+    mock_client = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(status_code))
+    )
+    monkeypatch.setattr(clients, "get_client", lambda provider: mock_client)
+
+    with pytest.raises(clients.UpstreamError) as e:
+        asyncio.run(clients.get("sherpa", "https://v2.sherpa.ac.uk"))
+    assert e.value.provider == "sherpa"
+
+
+def test_get_raises_upstream_error_on_transport_error(monkeypatch):
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectTimeout("Timed out", request=request)
+
+    mock_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(clients, "get_client", lambda provider: mock_client)
+
+    with pytest.raises(clients.UpstreamError):
+        asyncio.run(clients.get("orcid", "https://pub.orcid.org"))
+
+
+def test_get_returns_not_found(monkeypatch):
+    mock_client = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(404))
+    )
+    monkeypatch.setattr(clients, "get_client", lambda provider: mock_client)
+
+    response = asyncio.run(clients.get("unpaywall", "https://api.unpaywall.org"))
+    assert response.status_code == 404
+
+
+def test_get_retries_until_success(monkeypatch):
+    status_codes = [503, 429, 200]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(status_codes.pop(0))
+
+    mock_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(clients, "get_client", lambda provider: mock_client)
+
+    response = asyncio.run(clients.get("crossref", "https://api.crossref.org"))
+    assert response.status_code == 200
+    assert status_codes == []
+
+
+def test_get_doesnt_retry_auth_errors(monkeypatch):
+    received = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        received.append(request)
+        return httpx.Response(401)
+
+    mock_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(clients, "get_client", lambda provider: mock_client)
+
+    with pytest.raises(clients.UpstreamError):
+        asyncio.run(clients.get("sherpa", "https://v2.sherpa.ac.uk"))
+    assert len(received) == 1
+
+
+@pytest.mark.parametrize("retry_after", ["0.05", "Wed, 21 Oct 2015 07:28:00 GMT"])
+def test_get_honors_retry_after(retry_after, monkeypatch):
+    status_codes = [429, 200]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(status_codes.pop(0), headers={"Retry-After": retry_after})
+
+    mock_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(clients, "get_client", lambda provider: mock_client)
+    paused = []
+    monkeypatch.setattr(clients.get_bucket("sherpa"), "pause", paused.append)
+
+    response = asyncio.run(clients.get("sherpa", "https://v2.sherpa.ac.uk"))
+
+    assert response.status_code == 200
+    # Dates in the past mean retrying right away
+    assert paused == [0.05 if retry_after == "0.05" else 0.0]
+
+
+def test_get_gives_up_on_long_retry_after(monkeypatch):
+    mock_client = httpx.AsyncClient(
+        transport=httpx.MockTransport(
+            lambda request: httpx.Response(429, headers={"Retry-After": "3600"})
+        )
+    )
+    monkeypatch.setattr(clients, "get_client", lambda provider: mock_client)
+
+    with pytest.raises(clients.UpstreamError):
+        asyncio.run(clients.get("orcid", "https://pub.orcid.org"))
+    # Other requests don't even try while the provider asks to wait
+    with pytest.raises(clients.UpstreamError, match="Rate limited"):
+        asyncio.run(clients.get("orcid", "https://pub.orcid.org"))
+
+
+def test_call_retries_until_success():
+    status_codes = [502, 200]
+
+    def request():
+        response = Response()
+        response.status_code = status_codes.pop(0)
+        return response
+
+    assert clients.call("unpaywall", request).status_code == 200
+
+
+def test_call_raises_upstream_error_on_connection_error():
+    def request():
+        raise ConnectionError("Connection refused")
+
+    with pytest.raises(clients.UpstreamError):
+        clients.call("unpaywall", request)
+
+
+def test_get_bucket_is_shared_between_processes(tmp_path, monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_PATH", str(tmp_path / "ratelimit.sqlite"))
+    monkeypatch.setenv("RATE_LIMIT_SHERPA", "2")
+
+    bucket = clients.get_bucket("sherpa")
+
+    assert isinstance(bucket, SQLiteTokenBucket)
+    assert bucket.rate == 2
+    assert clients.get_bucket("sherpa") is bucket
+
+
+def test_get_reserves_shared_tokens_off_the_event_loop(tmp_path, monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_PATH", str(tmp_path / "ratelimit.sqlite"))
+    reserving_threads = []
+    reserve = SQLiteTokenBucket.reserve
+
+    def mock_reserve(self, max_wait=None):
+        reserving_threads.append(threading.get_ident())
+        return reserve(self, max_wait)
+
+    monkeypatch.setattr(SQLiteTokenBucket, "reserve", mock_reserve)
+    mock_client = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(200))
+    )
+    monkeypatch.setattr(clients, "get_client", lambda provider: mock_client)
+
+    async def get_with_deadline():
+        with clients.deadline(0.5):
+            return await clients.get("orcid", "https://pub.orcid.org/found")
+
+    assert asyncio.run(get_with_deadline()).status_code == 200
+    assert len(reserving_threads) == 1
+    assert reserving_threads[0] != threading.get_ident()
+
+
+def test_call_fails_fast_while_circuit_is_open():
+    n_requests = 0
+
+    def request():
+        nonlocal n_requests
+        n_requests += 1
+        response = Response()
+        response.status_code = 503
+        return response
+
+    with pytest.raises(clients.UpstreamError, match="HTTP 503"):
+        clients.call("orcid", request)
+    assert n_requests == clients.MAX_RETRIES + 1
+    # Retries stop as soon as the circuit opens
+    with pytest.raises(clients.UpstreamError, match="Circuit open"):
+        clients.call("orcid", request)
+    assert n_requests == clients.CIRCUIT_FAILURE_THRESHOLD
+
+    with pytest.raises(clients.UpstreamError, match="Circuit open"):
+        clients.call("orcid", request)
+    assert n_requests == clients.CIRCUIT_FAILURE_THRESHOLD
+    assert clients.stats()["orcid"]["state"] == "open"
+
+
+def test_get_hedges_slow_requests(monkeypatch):
+    n_requests = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal n_requests
+        n_requests += 1
+        if n_requests == 1:
+            await asyncio.sleep(10)
+        return httpx.Response(200, json={"request": n_requests})
+
+    mock_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(clients, "get_client", lambda provider: mock_client)
+    monkeypatch.setenv("HEDGE_PROVIDERS", "sherpa,orcid")
+    clients._latency_window("sherpa").extend([0.01] * clients.HEDGE_MIN_SAMPLES)
+
+    response = asyncio.run(
+        asyncio.wait_for(clients.get("sherpa", "https://v2.sherpa.ac.uk"), 1)
+    )
+
+    assert response.json() == {"request": 2}
+    assert clients.stats()["sherpa"]["hedge_delay"] == 0.01
+
+
+def test_get_cancels_requests_in_flight_when_cancelled(monkeypatch):
+    cancelled = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(request.url.host)
+            raise
+        return httpx.Response(200)
+
+    mock_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(clients, "get_client", lambda provider: mock_client)
+    monkeypatch.setenv("HEDGE_PROVIDERS", "sherpa")
+    clients._latency_window("sherpa").extend([0.2] * clients.HEDGE_MIN_SAMPLES)
+
+    async def get_cancelled(timeout: float) -> list:
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(
+                clients.get("sherpa", "https://v2.sherpa.ac.uk"), timeout
+            )
+        await asyncio.sleep(0.01)
+        # Rather than only once the event loop is closed
+        return list(cancelled)
+
+    # Cancelled before the request is hedged, and once it is
+    assert asyncio.run(get_cancelled(0.05)) == ["v2.sherpa.ac.uk"]
+    cancelled.clear()
+    assert asyncio.run(get_cancelled(0.3)) == ["v2.sherpa.ac.uk"] * 2
+
+    # The cancelled requests count with the time until they were cancelled
+    assert len(clients._latency_window("sherpa")) == clients.HEDGE_MIN_SAMPLES + 3
+
+
+def test_get_doesnt_hedge_by_default(monkeypatch):
+    clients._latency_window("sherpa").extend([0.01] * clients.HEDGE_MIN_SAMPLES)
+
+    assert clients._hedge_delay("sherpa") is None
+
+
+def test_deadline_can_only_be_shortened():
+    assert clients.remaining() is None
+
+    with clients.deadline(10):
+        assert 9 < clients.remaining() <= 10
+        with clients.deadline(60):
+            assert clients.remaining() <= 10
+        with clients.deadline(None):
+            assert clients.remaining() <= 10
+        with clients.deadline(1):
+            assert clients.remaining() <= 1
+
+    assert clients.remaining() is None
+
+
+def test_get_raises_deadline_exceeded_once_deadline_passed(monkeypatch):
+    n_requests = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal n_requests
+        n_requests += 1
+        return httpx.Response(200)
+
+    mock_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(clients, "get_client", lambda provider: mock_client)
+
+    async def get_after_deadline():
+        with clients.deadline(0):
+            return await clients.get("sherpa", "https://v2.sherpa.ac.uk")
+
+    with pytest.raises(clients.DeadlineExceeded):
+        asyncio.run(get_after_deadline())
+    assert n_requests == 0
+
+
+def test_call_doesnt_retry_past_deadline(monkeypatch):
+    monkeypatch.setattr(clients, "BACKOFF_BASE", 10.0)
+    monkeypatch.setattr(clients.random, "uniform", lambda low, high: high)
+    n_requests = 0
+
+    def request():
+        nonlocal n_requests
+        n_requests += 1
+        response = Response()
+        response.status_code = 503
+        return response
+
+    with clients.deadline(5), pytest.raises(clients.DeadlineExceeded):
+        clients.call("unpaywall", request)
+    assert n_requests == 1
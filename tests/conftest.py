@@ -6,6 +6,18 @@ from fastapi.testclient import TestClient
 from fyscience.main import app
 
 
+@pytest.fixture(autouse=True)
+def fast_provider_requests(monkeypatch):
+    """Provider requests are rate limited and retried as usual, but without waiting
+    in between retries and with rate limits, circuit breakers and latencies not
+    carrying over between tests.
+    """
+    monkeypatch.setattr("fyscience.clients.BACKOFF_BASE", 0.0)
+    monkeypatch.setattr("fyscience.clients._buckets", {})
+    monkeypatch.setattr("fyscience.clients._breakers", {})
+    monkeypatch.setattr("fyscience.clients._latencies", {})
+
+
 @pytest.fixture(scope="module")
 def client() -> Generator:
     with TestClient(app) as c:
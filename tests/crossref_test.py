@@ -1,8 +1,13 @@
 import os
+import json
+import asyncio
 
+import httpx
+import pytest
 from requests import Response
 
-from fyscience.crossref import get_author_with_papers
+from fyscience import clients, crossref
+from fyscience.crossref import get_author_with_papers, get_author_with_papers_async
 
 
 ASSETS_PATH = os.path.join(os.path.dirname(__file__), "assets")
@@ -26,3 +31,95 @@ def test_get_author_with_papers(monkeypatch):
     dois_with_issn = {p.doi: p.issn for p in author.papers}
     assert dois_with_issn["10.1371/journal.pcbi.1006283"] == "1553-7358"
     assert author.name == author_name
+
+
+def _page(n_items: int, offset: int, next_cursor: str) -> dict:
+    items = [
+        {"DOI": f"10.1/{i}", "ISSN": ["1111-1111"], "title": [f"Paper {i}"]}
+        for i in range(offset, offset + n_items)
+    ]
+    return {"message": {"items": items, "next-cursor": next_cursor}}
+
+
+def test_get_author_with_papers_pages_with_cursor(monkeypatch):
+    monkeypatch.setattr(crossref, "ROWS", 2)
+    pages = {"*": _page(2, 0, "c1"), "c1": _page(2, 2, "c2"), "c2": _page(1, 4, "c3")}
+    requested_params = []
+
+    def mock_get(url, params, **kwargs):
+        requested_params.append(params)
+        r = Response()
+        r._content = json.dumps(pages[params["cursor"]]).encode()
+        r.status_code = 200
+        return r
+
+    monkeypatch.setattr("fyscience.crossref.requests.get", mock_get)
+    author = get_author_with_papers("author name")
+
+    assert [p.doi for p in author.papers] == [f"10.1/{i}" for i in range(5)]
+    assert [p["cursor"] for p in requested_params] == ["*", "c1", "c2"]
+    assert all(p["select"] == "DOI,ISSN,title" for p in requested_params)
+    assert requested_params[0]["query.author"] == "author name"
+
+
+def test_get_author_with_papers_async_stops_at_max_results(monkeypatch):
+    monkeypatch.setattr(crossref, "ROWS", 2)
+    requested_rows = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        rows = int(request.url.params["rows"])
+        requested_rows.append(rows)
+        offset = sum(requested_rows[:-1])
+        return httpx.Response(200, json=_page(rows, offset, f"c{offset + rows}"))
+
+    mock_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(clients, "get_client", lambda provider: mock_client)
+
+    author = asyncio.run(get_author_with_papers_async("author name", max_results=3))
+
+    assert [p.doi for p in author.papers] == ["10.1/0", "10.1/1", "10.1/2"]
+    assert requested_rows == [2, 1]
+
+
+def test_get_author_with_papers_async_keeps_pages_before_upstream_error(monkeypatch):
+    monkeypatch.setattr(crossref, "ROWS", 2)
+    monkeypatch.setattr(clients, "MAX_RETRIES", 0)
+    failing_cursors = set()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        cursor = request.url.params["cursor"]
+        if cursor in failing_cursors:
+            return httpx.Response(503)
+        return httpx.Response(200, json=_page(2, 0 if cursor == "*" else 2, "c1"))
+
+    mock_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(clients, "get_client", lambda provider: mock_client)
+
+    failing_cursors.add("c1")
+    author = asyncio.run(get_author_with_papers_async("author name", max_results=4))
+    assert [p.doi for p in author.papers] == ["10.1/0", "10.1/1"]
+    assert author.failed_providers == ["crossref"]
+
+    failing_cursors.add("*")
+    with pytest.raises(clients.UpstreamError):
+        asyncio.run(get_author_with_papers_async("author name", max_results=4))
+
+
+def test_get_author_with_papers_keeps_pages_before_upstream_error(monkeypatch):
+    monkeypatch.setattr(crossref, "ROWS", 2)
+    monkeypatch.setattr(clients, "MAX_RETRIES", 0)
+
+    def mock_get(url, params, **kwargs):
+        r = Response()
+        if params["cursor"] == "*":
+            r._content = json.dumps(_page(2, 0, "c1")).encode()
+            r.status_code = 200
+        else:
+            r.status_code = 503
+        return r
+
+    monkeypatch.setattr("fyscience.crossref.requests.get", mock_get)
+    author = get_author_with_papers("author name", max_results=4)
+
+    assert [p.doi for p in author.papers] == ["10.1/0", "10.1/1"]
+    assert author.failed_providers == ["crossref"]
@@ -1,7 +1,9 @@
 import os
+import sys
 import json
+import subprocess
 
-from fyscience.data import calculate_metrics
+from fyscience.data import calculate_metrics, chunked
 from fyscience.schemas import PaperWithOAPathway
 
 
@@ -20,3 +22,17 @@ def test_calculate_metrics():
     assert n_pathway_nocost == 1
     assert n_pathway_other == 1
     assert n_unknown == 1
+
+
+def test_chunked():
+    assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(chunked([], 2)) == []
+
+
+def test_providers_do_not_import_numpy():
+    code = (
+        "import sys\n"
+        "from fyscience import data, sherpa, unpaywall\n"
+        "assert 'numpy' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -0,0 +1,138 @@
+import os
+import gzip
+import json
+
+import pytest
+
+from fyscience.data import calculate_metrics
+from fyscience.metrics import (
+    PaperColumns,
+    format_count,
+    load_summary,
+    save_summary,
+    summarize,
+    summary_change,
+    write_summary,
+)
+from fyscience.schemas import OAPathway, PaperWithOAPathway
+from fyscience.unpaywall import UnpaywallIndex, ingest_changefiles
+
+
+ASSETS_PATH = os.path.join(os.path.dirname(__file__), "assets")
+
+RECORDS = [
+    {"doi": "10.1/a", "journal_issn_l": "1111-1111", "is_oa": True, "year": 2019},
+    {"doi": "10.1/b", "journal_issn_l": "1111-1111", "is_oa": False, "year": 2019},
+    {"doi": "10.1/ü", "journal_issn_l": "2222-2222", "is_oa": False, "year": 2020},
+    {"doi": "10.1/d", "journal_issn_l": "3333-3333", "is_oa": None, "year": None},
+    {"doi": "10.1/e", "journal_issn_l": None, "is_oa": False, "publisher": "eLife"},
+]
+
+PATHWAYS = {
+    "1111-1111": OAPathway.nocost,
+    "2222-2222": OAPathway.other,
+    "3333-3333": OAPathway.not_found,
+}
+
+
+def test_metrics_match_calculate_metrics():
+    with open(os.path.join(ASSETS_PATH, "papers_enriched_dummy.json"), "r") as fh:
+        papers = [PaperWithOAPathway(**paper) for paper in json.load(fh)]
+
+    columns = PaperColumns.from_papers(papers)
+
+    assert columns.metrics() == calculate_metrics(papers) == (1, 1, 1, 1)
+
+
+def test_with_pathways_looks_up_each_issn_once():
+    lookups = []
+
+    def lookup(issn):
+        lookups.append(issn)
+        return PATHWAYS[issn]
+
+    columns = PaperColumns.from_records(RECORDS).with_pathways(lookup)
+
+    assert sorted(lookups) == sorted(PATHWAYS)
+    assert columns.metrics() == (1, 1, 1, 1)
+
+
+def test_metrics_by():
+    columns = PaperColumns.from_records(RECORDS).with_pathways(PATHWAYS.get)
+
+    assert columns.metrics_by("year") == {
+        None: (0, 0, 0, 1),
+        2019: (1, 1, 0, 0),
+        2020: (0, 0, 1, 0),
+    }
+    assert columns.metrics_by("issn") == {
+        None: (0, 0, 0, 0),
+        "1111-1111": (1, 1, 0, 0),
+        "2222-2222": (0, 0, 1, 0),
+        "3333-3333": (0, 0, 0, 1),
+    }
+    assert columns.metrics_by("publisher") == {
+        None: (1, 1, 1, 1),
+        "eLife": (0, 0, 0, 0),
+    }
+
+    with pytest.raises(ValueError):
+        columns.metrics_by("doi")
+
+
+def test_save_and_load(tmp_path):
+    columns = PaperColumns.from_records(RECORDS).with_pathways(PATHWAYS.get)
+    path = str(tmp_path / "columns.npz")
+    columns.save(path)
+
+    loaded = PaperColumns.load(path)
+
+    assert len(loaded) == 5
+    assert loaded.doi(2) == "10.1/ü"
+    assert loaded.metrics() == columns.metrics()
+    assert loaded.metrics_by("issn") == columns.metrics_by("issn")
+
+
+def test_summary(tmp_path):
+    columns = PaperColumns.from_records(RECORDS).with_pathways(PATHWAYS.get)
+    path = str(tmp_path / "metrics.json")
+    save_summary(path, columns)
+
+    assert load_summary(path) == {
+        "n_papers": 5,
+        "n_oa": 1,
+        "n_pathway_nocost": 1,
+        "n_pathway_other": 1,
+        "n_unknown": 1,
+    }
+    assert format_count(46796300) == "46.796.300"
+
+
+def test_summary_is_kept_up_to_date_with_changefiles(tmp_path):
+    records = [r for r in RECORDS if r["is_oa"] is not None]
+    index = UnpaywallIndex(str(tmp_path / "unpaywall.sqlite"))
+    index.upsert(records)
+    columns = PaperColumns.from_records(records).with_pathways(PATHWAYS.get)
+    index.set_counters(summarize(columns))
+
+    changes = [
+        dict(records[0], is_oa=False),
+        dict(records[1], journal_issn_l="2222-2222"),
+        dict(records[1], journal_issn_l="3333-3333"),
+        {"doi": "10.1/new", "journal_issn_l": "1111-1111", "is_oa": False},
+        {"doi": "10.1/E", "journal_issn_l": "1111-1111", "is_oa": True},
+    ]
+    changefile = str(tmp_path / "changed_dois_2021-03-01.jsonl.gz")
+    with gzip.open(changefile, "wt") as fh:
+        fh.writelines(json.dumps(record) + "\n" for record in changes)
+
+    ingest_changefiles(index, [changefile], count=summary_change(PATHWAYS.get))
+
+    changed_records = {r["doi"].lower(): r for r in records + changes}.values()
+    expected = PaperColumns.from_records(changed_records).with_pathways(PATHWAYS.get)
+    assert index.counters() == summarize(expected)
+    assert index.counters()["n_papers"] == 5
+
+    path = str(tmp_path / "metrics.json")
+    write_summary(path, index.counters())
+    assert load_summary(path)["n_pathway_nocost"] == 2
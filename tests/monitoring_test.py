@@ -0,0 +1,147 @@
+import os
+import sys
+import time
+import asyncio
+import subprocess
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from starlette.background import BackgroundTask
+from starlette.responses import Response
+
+from fyscience import clients
+from fyscience.cache import TTLCache, set_not_found
+from fyscience.monitoring import MetricsMiddleware, MonitoredCache
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_metrics_per_route(client: TestClient) -> None:
+    labels = {"method": "GET", "route": "/static"}
+    n_requests = sample("fyscience_request_duration_seconds_count", **labels)
+
+    r = client.get("/static/not-a-file.css")
+    assert r.status_code == 404
+
+    r = client.get("/metrics")
+    assert r.ok
+    assert r.headers["content-type"].startswith("text/plain")
+    assert 'fyscience_requests_in_progress{method="GET",route="/metrics"} 1.0' in r.text
+    assert sample("fyscience_request_duration_seconds_count", **labels) == (
+        n_requests + 1
+    )
+    assert sample("fyscience_requests_total", status="404", **labels) >= 1
+    assert sample("fyscience_requests_in_progress", **labels) == 0
+
+    client.get("/not/a/route")
+    labels = {"method": "GET", "route": "unmatched", "status": "404"}
+    assert sample("fyscience_requests_total", **labels) >= 1
+
+
+def test_request_latency_excludes_background_tasks() -> None:
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    in_progress = []
+
+    def background():
+        in_progress.append(
+            sample("fyscience_requests_in_progress", method="GET", route="/background")
+        )
+        time.sleep(0.2)
+
+    @app.get("/background")
+    def with_background_task():
+        return Response("done", background=BackgroundTask(background))
+
+    labels = {"method": "GET", "route": "/background"}
+    seconds = sample("fyscience_request_duration_seconds_sum", **labels)
+
+    r = TestClient(app).get("/background")
+    assert r.ok
+    assert in_progress == [0]
+    assert sample("fyscience_request_duration_seconds_count", **labels) >= 1
+    assert sample("fyscience_request_duration_seconds_sum", **labels) - seconds < 0.2
+
+
+def test_upstream_metrics(monkeypatch):
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/timeout":
+            raise httpx.ConnectTimeout("Timed out", request=request)
+        return httpx.Response(404)
+
+    mock_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(clients, "get_client", lambda provider: mock_client)
+    monkeypatch.setattr(clients, "MAX_RETRIES", 0)
+
+    responses = sample(
+        "fyscience_upstream_responses_total", provider="orcid", status="404"
+    )
+    errors = sample(
+        "fyscience_upstream_errors_total", provider="orcid", error="ConnectTimeout"
+    )
+    latencies = sample(
+        "fyscience_upstream_request_duration_seconds_count", provider="orcid"
+    )
+
+    asyncio.run(clients.get("orcid", "https://pub.orcid.org/found"))
+    try:
+        asyncio.run(clients.get("orcid", "https://pub.orcid.org/timeout"))
+    except clients.UpstreamError:
+        pass
+
+    assert (
+        sample("fyscience_upstream_responses_total", provider="orcid", status="404")
+        == responses + 1
+    )
+    assert (
+        sample(
+            "fyscience_upstream_errors_total", provider="orcid", error="ConnectTimeout"
+        )
+        == errors + 1
+    )
+    assert (
+        sample("fyscience_upstream_request_duration_seconds_count", provider="orcid")
+        == latencies + 2
+    )
+    assert sample("fyscience_upstream_requests_in_progress", provider="orcid") == 0
+
+
+def test_monitored_cache_counts_hits_and_misses():
+    cache = MonitoredCache(TTLCache(), "test")
+
+    assert cache.get("a", "default") == "default"
+    cache["a"] = 1
+    assert cache.get("a") == 1
+    set_not_found(cache, "b")
+    assert cache.get("b") is not None
+
+    assert sample("fyscience_cache_lookups_total", cache="test", result="hit") == 2
+    assert sample("fyscience_cache_lookups_total", cache="test", result="miss") == 1
+    assert cache.stats()["hits"] == 2
+
+
+def test_metrics_are_aggregated_across_processes(tmp_path):
+    # Created on import unless it exists, e.g. as gunicorn didn't start the process
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path / "metrics")}
+
+    def run(code: str) -> str:
+        return subprocess.run(
+            [sys.executable, "-c", f"from fyscience import monitoring\n{code}"],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+
+    for _ in range(2):
+        run("monitoring.count_upstream_error('sherpa', 'circuit_open')")
+
+    metrics = run("print(monitoring.latest_metrics().decode())")
+    assert (
+        'fyscience_upstream_errors_total{error="circuit_open",provider="sherpa"} 2.0'
+        in metrics
+    )
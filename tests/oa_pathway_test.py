@@ -1,10 +1,16 @@
 import os
 import json
+import time
 
 import fyscience.oa_pathway as oa_pathway_module
+from fyscience.cache import TTLCache
+from fyscience.clients import UpstreamError
 from fyscience.oa_pathway import oa_pathway, remove_costly_oa_from_publisher_policy
+from fyscience.sherpa import intern_policy
 from fyscience.schemas import (
+    FullPaper,
     Paper,
+    PaperRecord,
     PaperWithOAStatus,
     OAPathway,
 )
@@ -70,7 +76,106 @@ def test_oa_pathway_chaches_after_api_call(monkeypatch):
     )
 
     assert issn in cache
-    assert cache[issn] is target_pathway
+    assert cache[issn] == (target_pathway, "", [])
+
+
+def test_oa_pathway_caches_not_found_as_negative_entry(monkeypatch):
+    issn = "1234-1234"
+    cache = TTLCache(ttl=60, negative_ttl=0.01)
+    calls = []
+
+    def mock_sherpa_pathway_api(*args, **kwargs):
+        calls.append(args)
+        return OAPathway.not_found, None, None
+
+    monkeypatch.setattr(
+        "fyscience.oa_pathway.sherpa_pathway_api", mock_sherpa_pathway_api
+    )
+
+    paper = PaperWithOAStatus(doi="10.1011/111111", issn=issn, is_open_access=False)
+    for _ in range(2):
+        assert oa_pathway(paper, cache=cache).oa_pathway is OAPathway.not_found
+    assert len(calls) == 1
+
+    time.sleep(0.02)
+    oa_pathway(paper, cache=cache)
+    assert len(calls) == 2
+
+
+def test_oa_pathway_doesnt_cache_upstream_errors(monkeypatch):
+    issn = "1234-1234"
+    cache = {}
+
+    def mock_sherpa_pathway_api(*args, **kwargs):
+        raise UpstreamError("sherpa", "HTTP 503")
+
+    monkeypatch.setattr(
+        "fyscience.oa_pathway.sherpa_pathway_api", mock_sherpa_pathway_api
+    )
+
+    updated_paper = oa_pathway(
+        PaperWithOAStatus(doi="10.1011/111111", issn=issn, is_open_access=False),
+        cache=cache,
+    )
+
+    assert updated_paper.oa_pathway is OAPathway.not_found
+    assert cache == {}
+
+    paper = FullPaper(doi="10.1011/111111", issn=issn, is_open_access=False)
+    assert oa_pathway(paper, cache=cache).failed_providers == ["sherpa"]
+
+
+def test_oa_pathway_uses_cached_uri_and_details(mocker):
+    sherpa_pathway_api_spy = mocker.spy(oa_pathway_module, "sherpa_pathway_api")
+    issn = "0003-987X"
+    details = [{"open_access_prohibited": "no"}]
+    # As e.g. read back from a JSON file cache
+    cache = {issn: ["nocost", "https://v2.sherpa.ac.uk/id/publication/1", details]}
+
+    updated_paper = oa_pathway(
+        PaperWithOAStatus(doi="10.1011/111111", issn=issn, is_open_access=False),
+        cache=cache,
+    )
+
+    assert sherpa_pathway_api_spy.call_count == 0
+    assert updated_paper.oa_pathway is OAPathway.nocost
+    assert updated_paper.oa_pathway_uri == "https://v2.sherpa.ac.uk/id/publication/1"
+    assert updated_paper.oa_pathway_details == details
+
+
+def test_oa_pathway_enriches_paper_record_in_place():
+    issn = "1234-1234"
+    cache = {issn: (OAPathway.nocost, "https://sherpa/uri", [{"id": 1}])}
+    paper = PaperRecord.from_unpaywall(
+        {"doi": "10.1011/111111", "journal_issn_l": issn, "is_oa": False, "year": 2020}
+    )
+
+    assert oa_pathway(paper, cache=cache) is paper
+    assert paper.to_full_paper() == FullPaper(
+        doi="10.1011/111111",
+        issn=issn,
+        year=2020,
+        is_open_access=False,
+        oa_pathway=OAPathway.nocost,
+        oa_pathway_uri="https://sherpa/uri",
+        oa_pathway_details=[{"id": 1}],
+    )
+
+    other = PaperRecord("10.1011/222222", issn=None, is_open_access=None)
+    assert oa_pathway(other).oa_pathway is OAPathway.not_attempted
+    assert other != paper
+    assert not hasattr(other, "__dict__")
+
+
+def test_remove_costly_oa_from_interned_policy():
+    with open(
+        os.path.join(ASSETS_PATH, "policy_without_additional_oa_fee_key.json")
+    ) as fh:
+        policy = intern_policy(json.load(fh))
+
+    updated_policy = remove_costly_oa_from_publisher_policy(policy)
+    assert len(updated_policy["permitted_oa"]) == 2
+    assert remove_costly_oa_from_publisher_policy(policy) is updated_policy
 
 
 def test_remove_costly_oa_from_publisher_policy_without_additional_oa_fee_key():
@@ -1,5 +1,6 @@
 import pytest
 
+from fyscience.clients import UpstreamError
 from fyscience.oa_status import validate_oa_status_from_s2
 from fyscience.schemas import FullPaper
 
@@ -26,3 +27,16 @@ def test_validate_oa_status_from_s2(initial, reference, expected, monkeypatch):
     )
     updated_paper = validate_oa_status_from_s2(paper)
     assert updated_paper.is_open_access == expected
+
+
+def test_validate_oa_status_from_s2_upstream_error(monkeypatch):
+    def mock_s2_get_paper(*args, **kwargs):
+        raise UpstreamError("semantic_scholar", "HTTP 503")
+
+    monkeypatch.setattr("fyscience.oa_status.s2_get_paper", mock_s2_get_paper)
+
+    paper = validate_oa_status_from_s2(
+        FullPaper(doi="10.110/dummy", is_open_access=False)
+    )
+    assert paper.is_open_access is False
+    assert paper.failed_providers == ["semantic_scholar"]
@@ -1,8 +1,19 @@
+import io
 import os
+import asyncio
+
+import httpx
 import pytest
 
 from requests import Response
-from fyscience.orcid import get_author_with_papers, is_orcid, extract_orcid
+from fyscience import clients
+from fyscience.orcid import (
+    _AuthorParser,
+    get_author_with_papers,
+    get_author_with_papers_async,
+    is_orcid,
+    extract_orcid,
+)
 
 
 ASSETS_PATH = os.path.join(os.path.dirname(__file__), "assets")
@@ -13,7 +24,7 @@ def test_get_author_with_papers(monkeypatch):
         with open(os.path.join(ASSETS_PATH, "orcid_author.xml"), "r") as fh:
             xml = fh.read()
         r = Response()
-        r._content = xml.encode()
+        r.raw = io.BytesIO(xml.encode())
         r.status_code = 200
         return r
 
@@ -27,6 +38,46 @@ def test_get_author_with_papers(monkeypatch):
     assert author.name == "Sofia Maria Hernandez Garcia"
 
 
+def test_get_author_with_papers_async_parses_streamed_record(monkeypatch):
+    with open(os.path.join(ASSETS_PATH, "orcid_author.xml"), "rb") as fh:
+        content = fh.read()
+
+    async def chunks():
+        for i in range(0, len(content), 100):
+            yield content[i : i + 100]
+
+    mock_client = httpx.AsyncClient(
+        transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, content=chunks())
+        )
+    )
+    monkeypatch.setattr(clients, "get_client", lambda provider: mock_client)
+
+    author = asyncio.run(get_author_with_papers_async("0000-0000-0000-0000"))
+
+    assert {p.doi: p.issn for p in author.papers} == {
+        "10.1087/20120404": "1741-4857",
+        "10.1111/test.12241": None,
+    }
+    assert author.name == "Sofia Maria Hernandez Garcia"
+    assert author.profile_url == "https://orcid.org/0000-0000-0000-0000"
+
+
+def test_parser_falls_back_to_given_and_family_name():
+    parser = _AuthorParser("0000-0000-0000-0000")
+    parser.feed(
+        b'<record xmlns:pd="http://www.orcid.org/ns/personal-details">'
+        b"<pd:given-names>Sofia</pd:given-names>"
+        b"<pd:family-name>Garcia</pd:family-name>"
+        b"</record>"
+    )
+
+    author = parser.close()
+
+    assert author.name == "Sofia Garcia"
+    assert author.papers == []
+
+
 @pytest.mark.parametrize(
     "orcid,expected",
     [
@@ -0,0 +1,98 @@
+import os
+
+import pytest
+
+from fyscience.pipeline import load_checkpoint, run_pipeline
+from fyscience.schemas import OAPathway, PaperWithOAPathway, PaperWithOAStatus
+
+
+def _papers(n):
+    return (
+        PaperWithOAStatus(doi=f"10.1/{i}", issn="1234-5678", is_open_access=i % 2 == 0)
+        for i in range(n)
+    )
+
+
+def _enrich(paper):
+    return PaperWithOAPathway(oa_pathway=OAPathway.nocost, **paper.dict())
+
+
+def test_run_pipeline():
+    reports = []
+    n_papers, metrics = run_pipeline(
+        _papers(5), _enrich, workers=2, chunk_size=2, report=reports.append
+    )
+
+    assert n_papers == 5
+    assert metrics == (3, 2, 0, 0)
+    assert len(reports) == 3
+
+
+def test_run_pipeline_resumes_from_checkpoint(tmp_path):
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+    enriched = []
+
+    def failing_enrich(paper):
+        if paper.doi == "10.1/3":
+            raise RuntimeError("Upstream went away")
+        enriched.append(paper.doi)
+        return _enrich(paper)
+
+    with pytest.raises(RuntimeError):
+        run_pipeline(
+            _papers(5),
+            failing_enrich,
+            chunk_size=2,
+            checkpoint_path=checkpoint_path,
+            report=lambda _: None,
+        )
+    assert load_checkpoint(checkpoint_path) == (2, (1, 1, 0, 0))
+
+    def enrich(paper):
+        enriched.append(paper.doi)
+        return _enrich(paper)
+
+    enriched.clear()
+    n_papers, metrics = run_pipeline(
+        _papers(5),
+        enrich,
+        chunk_size=2,
+        checkpoint_path=checkpoint_path,
+        report=lambda _: None,
+    )
+
+    assert sorted(enriched) == ["10.1/2", "10.1/3", "10.1/4"]
+    assert n_papers == 5
+    assert metrics == (3, 2, 0, 0)
+    assert not os.path.exists(checkpoint_path)
+
+
+def test_run_pipeline_restarts_for_other_run(tmp_path):
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+
+    def failing_enrich(paper):
+        if paper.doi == "10.1/4":
+            raise RuntimeError("Upstream went away")
+        return _enrich(paper)
+
+    with pytest.raises(RuntimeError):
+        run_pipeline(
+            _papers(5),
+            failing_enrich,
+            chunk_size=2,
+            checkpoint_path=checkpoint_path,
+            report=lambda _: None,
+            run={"limit": 5},
+        )
+    assert load_checkpoint(checkpoint_path, {"limit": 5}) == (4, (2, 2, 0, 0))
+    assert load_checkpoint(checkpoint_path, {"limit": 3}) == (0, (0, 0, 0, 0))
+
+    n_papers, metrics = run_pipeline(
+        _papers(3),
+        _enrich,
+        chunk_size=2,
+        checkpoint_path=checkpoint_path,
+        report=lambda _: None,
+        run={"limit": 3},
+    )
+    assert (n_papers, metrics) == (3, (2, 1, 0, 0))
@@ -0,0 +1,42 @@
+import pytest
+
+from fyscience.ratelimit import SQLiteTokenBucket, TokenBucket
+
+
+def test_token_bucket_allows_bursts_then_rate():
+    bucket = TokenBucket(rate=10, burst=3)
+
+    waits = [bucket.reserve() for _ in range(5)]
+
+    assert waits[:3] == [0, 0, 0]
+    assert waits[3] == pytest.approx(0.1, abs=0.01)
+    assert waits[4] == pytest.approx(0.2, abs=0.01)
+
+
+def test_token_bucket_max_wait_doesnt_reserve():
+    bucket = TokenBucket(rate=10, burst=1)
+    bucket.reserve()
+
+    assert bucket.reserve(max_wait=0.05) is None
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+
+
+def test_token_bucket_pause():
+    bucket = TokenBucket(rate=10, burst=3)
+    bucket.pause(5)
+
+    assert bucket.reserve() == pytest.approx(5, abs=0.01)
+
+
+def test_sqlite_token_bucket_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "ratelimit.sqlite")
+    bucket = SQLiteTokenBucket(path, "sherpa", rate=10, burst=1)
+    other_process_bucket = SQLiteTokenBucket(path, "sherpa", rate=10, burst=1)
+    other_provider_bucket = SQLiteTokenBucket(path, "orcid", rate=10, burst=1)
+
+    assert bucket.reserve() == 0
+    assert other_process_bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert other_provider_bucket.reserve() == 0
+
+    other_process_bucket.pause(5)
+    assert bucket.reserve() == pytest.approx(5, abs=0.01)
@@ -1,3 +1,6 @@
+import json
+import asyncio
+
 import pytest
 from fastapi.testclient import TestClient
 
@@ -8,8 +11,24 @@ from fyscience.schemas import (
     PaperWithOAStatus,
 )
 from fyscience import main
-from fyscience.routers.deps import Settings, get_settings
+from fyscience.routers import api
+from fyscience.cache import TTLCache
+from fyscience.clients import UpstreamError
+from fyscience.routers.deps import (
+    Settings,
+    get_settings,
+    get_pathway_cache,
+    get_unpaywall_cache,
+    get_s2_cache,
+    get_etag_cache,
+    get_paper_cache,
+)
 from fyscience.semantic_scholar import Author
+from fyscience.sherpa import intern_policy
+
+
+async def return_none(*args, **kwargs):
+    return None
 
 
 def get_settings_override():
@@ -17,19 +36,27 @@ def get_settings_override():
 
 
 main.app.dependency_overrides[get_settings] = get_settings_override
+main.app.dependency_overrides[get_pathway_cache] = TTLCache
+main.app.dependency_overrides[get_unpaywall_cache] = TTLCache
+main.app.dependency_overrides[get_s2_cache] = TTLCache
+main.app.dependency_overrides[get_etag_cache] = TTLCache
+main.app.dependency_overrides[get_paper_cache] = TTLCache
 
 
 @pytest.mark.parametrize(
     "profile,provider",
     [
-        (51453144, "semantic_scholar.get_author_with_papers"),
+        (51453144, "semantic_scholar.get_author_with_papers_async"),
         (
             "https://www.semanticscholar.org/author/Lukas-Gro%C3%9Fberger/51453144",
-            "semantic_scholar.get_author_with_papers",
+            "semantic_scholar.get_author_with_papers_async",
         ),
-        ("https://orcid.org/0000-0000-0000-0000", "orcid.get_author_with_papers"),
-        ("0000-0000-0000-0000", "orcid.get_author_with_papers"),
-        ("firstname lastname", "crossref.get_author_with_papers"),
+        (
+            "https://orcid.org/0000-0000-0000-0000",
+            "orcid.get_author_with_papers_async",
+        ),
+        ("0000-0000-0000-0000", "orcid.get_author_with_papers_async"),
+        ("firstname lastname", "crossref.get_author_with_papers_async"),
     ],
 )
 def test_get_publications_for_author(
@@ -37,17 +64,22 @@ def test_get_publications_for_author(
 ) -> None:
     url = f"/api/authors?profile={profile}"
 
-    monkeypatch.setattr(
-        f"fyscience.routers.api.{provider}",
-        lambda *a, **kw: Author(
+    async def mock_get_author_with_papers(*args, **kwargs):
+        return Author(
             name="Dummy Author", papers=[FullPaper(doi="10.1007/s00580-005-0536-0")]
-        ),
+        )
+
+    monkeypatch.setattr(
+        "fyscience.routers.api.semantic_scholar.get_author_id_async", return_none
+    )
+    monkeypatch.setattr(
+        f"fyscience.routers.api.{provider}", mock_get_author_with_papers
     )
 
     r = client.get(url)
     assert r.ok
 
-    monkeypatch.setattr(f"fyscience.routers.api.{provider}", lambda *a, **kw: None)
+    monkeypatch.setattr(f"fyscience.routers.api.{provider}", return_none)
 
     r = client.get(url)
     assert r.status_code == 404
@@ -65,20 +97,23 @@ def test_get_paper(monkeypatch, client: TestClient) -> None:
     is_open_access = False
     oa_pathway = OAPathway.nocost.value
 
+    async def mock_unpaywall_get_paper(*args, **kwargs):
+        return FullPaper(doi=doi, issn=issn, is_open_access=is_open_access)
+
+    async def mock_validate_oa_status_from_s2(*args, **kwargs):
+        return PaperWithOAStatus(doi=doi, issn=issn, is_open_access=is_open_access)
+
+    async def mock_oa_pathway(paper, **kwargs):
+        return PaperWithOAPathway(oa_pathway=oa_pathway, **paper.dict())
+
     monkeypatch.setattr(
-        "fyscience.routers.api.unpaywall_get_paper",
-        lambda *a, **kw: FullPaper(doi=doi, issn=issn, is_open_access=is_open_access),
-    )
-    monkeypatch.setattr(
-        "fyscience.routers.api.validate_oa_status_from_s2",
-        lambda *a, **kw: PaperWithOAStatus(
-            doi=doi, issn=issn, is_open_access=is_open_access
-        ),
+        "fyscience.routers.api.unpaywall_get_paper_async", mock_unpaywall_get_paper
     )
     monkeypatch.setattr(
-        "fyscience.routers.api.oa_pathway",
-        lambda paper, **kw: PaperWithOAPathway(oa_pathway=oa_pathway, **paper.dict()),
+        "fyscience.routers.api.validate_oa_status_from_s2_async",
+        mock_validate_oa_status_from_s2,
     )
+    monkeypatch.setattr("fyscience.routers.api.oa_pathway_async", mock_oa_pathway)
 
     r = client.get(f"/api/papers?doi={doi}")
     assert r.ok
@@ -87,3 +122,634 @@ def test_get_paper(monkeypatch, client: TestClient) -> None:
     assert paper["oa_pathway"] == oa_pathway
     assert paper["doi"] == doi
     assert paper["issn"] == issn
+
+
+def test_get_papers_batch(monkeypatch, client: TestClient) -> None:
+    shared_issn, other_issn = "1618-5641", "2050-084X"
+    papers = {
+        "10.1/a": FullPaper(doi="10.1/a", issn=shared_issn, is_open_access=False),
+        "10.1/b": FullPaper(doi="10.1/b", issn=shared_issn, is_open_access=False),
+        "10.1/c": FullPaper(doi="10.1/c", issn=other_issn, is_open_access=True),
+    }
+    sherpa_calls = []
+
+    async def mock_unpaywall_get_paper(doi, **kwargs):
+        return papers.get(doi)
+
+    async def mock_validate_oa_status_from_s2(paper, *args, **kwargs):
+        return paper
+
+    async def mock_sherpa_get_pathway(issn, *args, **kwargs):
+        sherpa_calls.append(issn)
+        return OAPathway.nocost, "https://sherpa/uri", []
+
+    monkeypatch.setattr(
+        "fyscience.routers.api.unpaywall_get_paper_async", mock_unpaywall_get_paper
+    )
+    monkeypatch.setattr(
+        "fyscience.routers.api.validate_oa_status_from_s2_async",
+        mock_validate_oa_status_from_s2,
+    )
+    monkeypatch.setattr(
+        "fyscience.oa_pathway.sherpa_pathway_api_async", mock_sherpa_get_pathway
+    )
+
+    dois = ["10.1/a", "10.1/b", "10.1/c", "10.1/unknown"]
+    r = client.post("/api/papers/batch", json={"dois": dois})
+    assert r.ok
+
+    batch = r.json()
+    assert [p["doi"] for p in batch] == dois
+    assert [p["oa_pathway"] for p in batch] == [
+        OAPathway.nocost.value,
+        OAPathway.nocost.value,
+        OAPathway.already_oa.value,
+        None,
+    ]
+    assert sherpa_calls == [shared_issn]
+
+
+def test_get_papers_with_fields(monkeypatch, client: TestClient) -> None:
+    async def mock_construct_papers(dois, **kwargs):
+        return [
+            FullPaper(
+                doi=doi,
+                title="Best Paper Ever!",
+                oa_pathway=OAPathway.nocost,
+                oa_pathway_details=[{"id": 1}],
+            )
+            for doi in dois
+        ]
+
+    async def mock_construct_paper(doi, **kwargs):
+        return (await mock_construct_papers([doi]))[0]
+
+    monkeypatch.setattr(
+        "fyscience.routers.api._construct_papers", mock_construct_papers
+    )
+    monkeypatch.setattr("fyscience.routers.api._construct_paper", mock_construct_paper)
+
+    r = client.get("/api/papers?doi=10.1/a&fields=oa_pathway")
+    assert r.headers["content-type"] == "application/json"
+    assert r.json() == {"doi": "10.1/a", "oa_pathway": "nocost"}
+
+    r = client.get("/api/papers?doi=10.1/a")
+    assert r.json()["oa_pathway_details"] == [{"id": 1}]
+
+    r = client.post(
+        "/api/papers/batch?fields=title, oa_pathway", json={"dois": ["10.1/a"]}
+    )
+    assert r.json() == [
+        {"doi": "10.1/a", "title": "Best Paper Ever!", "oa_pathway": "nocost"}
+    ]
+
+    r = client.get("/api/papers?doi=10.1/a&fields=oa_pathway,publisher")
+    assert r.status_code == 422
+    assert "publisher" in r.json()["detail"]
+
+
+def test_get_papers_batch_with_policy_table(monkeypatch, client: TestClient) -> None:
+    policy = {"id": 42, "permitted_oa": [{"additional_oa_fee": "no"}]}
+
+    async def mock_construct_papers(dois, **kwargs):
+        return [
+            FullPaper(
+                doi=doi,
+                oa_pathway=OAPathway.nocost,
+                oa_pathway_details=[policy] if doi != "10.1/oa" else None,
+            )
+            for doi in dois
+        ]
+
+    monkeypatch.setattr(
+        "fyscience.routers.api._construct_papers", mock_construct_papers
+    )
+
+    dois = ["10.1/a", "10.1/b", "10.1/oa"]
+    r = client.post("/api/papers/batch?policy_table=true", json={"dois": dois})
+    assert r.ok
+
+    batch = r.json()
+    [policy_id] = batch["policies"]
+    assert policy_id.startswith("42-")
+    assert batch["policies"] == {policy_id: policy}
+    assert [p["oa_pathway_policy_ids"] for p in batch["papers"]] == [
+        [policy_id],
+        [policy_id],
+        None,
+    ]
+    assert not any("oa_pathway_details" in p for p in batch["papers"])
+
+    r = client.post("/api/papers/batch", json={"dois": dois})
+    assert [p["oa_pathway_details"] for p in r.json()] == [[policy], [policy], None]
+
+
+def test_get_paper_caches_pathway(monkeypatch, client: TestClient) -> None:
+    pathway_cache = TTLCache()
+    main.app.dependency_overrides[get_pathway_cache] = lambda: pathway_cache
+    issn = "1618-5641"
+    sherpa_calls = []
+
+    async def mock_unpaywall_get_paper(doi, **kwargs):
+        return FullPaper(doi=doi, issn=issn, is_open_access=False)
+
+    async def mock_validate_oa_status_from_s2(paper, *args, **kwargs):
+        return paper
+
+    async def mock_sherpa_get_pathway(issn, *args, **kwargs):
+        sherpa_calls.append(issn)
+        return OAPathway.nocost, "https://sherpa/uri", [{"id": 1}]
+
+    monkeypatch.setattr(
+        "fyscience.routers.api.unpaywall_get_paper_async", mock_unpaywall_get_paper
+    )
+    monkeypatch.setattr(
+        "fyscience.routers.api.validate_oa_status_from_s2_async",
+        mock_validate_oa_status_from_s2,
+    )
+    monkeypatch.setattr(
+        "fyscience.oa_pathway.sherpa_pathway_api_async", mock_sherpa_get_pathway
+    )
+
+    try:
+        papers = [client.get(f"/api/papers?doi=10.1/{i}").json() for i in range(3)]
+        stats = client.get("/debug/cache").json()["sherpa"]
+    finally:
+        main.app.dependency_overrides[get_pathway_cache] = TTLCache
+
+    assert sherpa_calls == [issn]
+    assert all(p["oa_pathway_uri"] == "https://sherpa/uri" for p in papers)
+    assert all(p["oa_pathway_details"] == [{"id": 1}] for p in papers)
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+
+
+def test_get_papers_batch_too_large(client: TestClient) -> None:
+    max_dois = get_settings_override().batch_max_dois
+    dois = [f"10.1/{i}" for i in range(max_dois + 1)]
+
+    r = client.post("/api/papers/batch", json={"dois": dois})
+    assert r.status_code == 413
+
+
+@pytest.mark.parametrize("format", ["ndjson", "sse"])
+def test_stream_papers_for_author(format, monkeypatch, client: TestClient) -> None:
+    dois = ["10.1/slow", "10.1/fast", "10.1/failing"]
+
+    async def mock_get_author_with_papers(*args, **kwargs):
+        return Author(name="Dummy Author", papers=[FullPaper(doi=doi) for doi in dois])
+
+    async def mock_construct_paper(doi, **kwargs):
+        if doi == "10.1/failing":
+            raise RuntimeError("upstream went away")
+        if doi == "10.1/slow":
+            await asyncio.sleep(0.05)
+        return FullPaper(doi=doi, oa_pathway=OAPathway.nocost)
+
+    monkeypatch.setattr(
+        "fyscience.routers.api.orcid.get_author_with_papers_async",
+        mock_get_author_with_papers,
+    )
+    monkeypatch.setattr("fyscience.routers.api._construct_paper", mock_construct_paper)
+
+    r = client.get(f"/api/authors/stream?profile=0000-0000-0000-0000&format={format}")
+    assert r.ok
+
+    if format == "sse":
+        assert r.headers["content-type"].startswith("text/event-stream")
+        events = [e for e in r.text.split("\n\n") if e]
+        assert events[-1].startswith("event: done")
+        lines = [e.split("data: ", 1)[1] for e in events[:-1]]
+    else:
+        assert r.headers["content-type"].startswith("application/x-ndjson")
+        lines = r.text.splitlines()
+
+    papers = [json.loads(line) for line in lines]
+    assert papers[-1]["doi"] == "10.1/slow"
+    assert {p["doi"] for p in papers} == set(dois)
+    assert [p["oa_pathway"] for p in papers if p["doi"] == "10.1/failing"] == [None]
+
+
+def test_stream_papers_for_author_without_details(
+    monkeypatch, client: TestClient
+) -> None:
+    async def mock_get_author_with_papers(*args, **kwargs):
+        return Author(name="Dummy Author", papers=[FullPaper(doi="10.1/a")])
+
+    async def mock_construct_paper(doi, **kwargs):
+        return FullPaper(doi=doi, oa_pathway=OAPathway.nocost, oa_pathway_details=[{}])
+
+    monkeypatch.setattr(
+        "fyscience.routers.api.orcid.get_author_with_papers_async",
+        mock_get_author_with_papers,
+    )
+    monkeypatch.setattr("fyscience.routers.api._construct_paper", mock_construct_paper)
+
+    r = client.get("/api/authors/stream?profile=0000-0000-0000-0000&details=false")
+    paper = json.loads(r.text)
+    assert paper["oa_pathway"] == "nocost"
+    assert "oa_pathway_details" not in paper
+
+    r = client.get("/api/authors/stream?profile=0000-0000-0000-0000&fields=doi")
+    assert json.loads(r.text) == {"doi": "10.1/a"}
+
+
+def test_stream_papers_for_unknown_author(monkeypatch, client: TestClient) -> None:
+    monkeypatch.setattr(
+        "fyscience.routers.api.orcid.get_author_with_papers_async", return_none
+    )
+
+    r = client.get("/api/authors/stream?profile=0000-0000-0000-0000")
+    assert r.status_code == 404
+
+
+def test_get_author_upstream_error(monkeypatch, client: TestClient) -> None:
+    async def mock_get_author_with_papers(*args, **kwargs):
+        raise UpstreamError("orcid", "HTTP 503")
+
+    monkeypatch.setattr(
+        "fyscience.routers.api.orcid.get_author_with_papers_async",
+        mock_get_author_with_papers,
+    )
+
+    r = client.get("/api/authors?profile=0000-0000-0000-0000")
+    assert r.status_code == 502
+
+
+def test_get_paper_unpaywall_upstream_error(monkeypatch, client: TestClient) -> None:
+    async def mock_unpaywall_get_paper(*args, **kwargs):
+        raise UpstreamError("unpaywall", "HTTP 503")
+
+    monkeypatch.setattr(
+        "fyscience.routers.api.unpaywall_get_paper_async", mock_unpaywall_get_paper
+    )
+
+    r = client.get("/api/papers?doi=10.1/a")
+    assert r.ok
+    assert r.json()["doi"] == "10.1/a"
+
+
+@pytest.mark.parametrize("provider", ["unpaywall", "sherpa"])
+def test_paper_is_not_cached_after_upstream_error(
+    provider, monkeypatch, client: TestClient
+) -> None:
+    calls = []
+
+    async def mock_unpaywall_get_paper(doi, **kwargs):
+        calls.append("unpaywall")
+        if provider == "unpaywall":
+            raise UpstreamError("unpaywall", "HTTP 503")
+        return FullPaper(doi=doi, issn="1618-5641", is_open_access=False)
+
+    async def mock_sherpa_get_pathway(issn, *args, **kwargs):
+        calls.append("sherpa")
+        raise UpstreamError("sherpa", "HTTP 503")
+
+    async def mock_validate_oa_status_from_s2(paper, *args, **kwargs):
+        return paper
+
+    monkeypatch.setattr(
+        "fyscience.routers.api.unpaywall_get_paper_async", mock_unpaywall_get_paper
+    )
+    monkeypatch.setattr(
+        "fyscience.routers.api.validate_oa_status_from_s2_async",
+        mock_validate_oa_status_from_s2,
+    )
+    monkeypatch.setattr(
+        "fyscience.oa_pathway.sherpa_pathway_api_async", mock_sherpa_get_pathway
+    )
+    paper_cache = TTLCache()
+    main.app.dependency_overrides[get_paper_cache] = lambda: paper_cache
+
+    try:
+        for _ in range(2):
+            r = client.get("/api/papers?doi=10.1/a")
+            assert r.ok
+            assert r.json()["failed_providers"] == [provider]
+            assert r.headers["Cache-Control"] == "no-cache"
+        assert calls.count(provider) == 2
+        assert paper_cache.get("10.1/a") is None
+    finally:
+        main.app.dependency_overrides[get_paper_cache] = TTLCache
+
+
+def test_paper_not_found_is_cached_like_negative_entries(
+    monkeypatch, client: TestClient
+) -> None:
+    unpaywall_calls = []
+
+    async def mock_unpaywall_get_paper(doi, **kwargs):
+        unpaywall_calls.append(doi)
+        return None
+
+    monkeypatch.setattr(
+        "fyscience.routers.api.unpaywall_get_paper_async", mock_unpaywall_get_paper
+    )
+    paper_cache = TTLCache(negative_ttl=0)
+    etag_cache = TTLCache()
+    main.app.dependency_overrides[get_paper_cache] = lambda: paper_cache
+    main.app.dependency_overrides[get_etag_cache] = lambda: etag_cache
+
+    try:
+        for _ in range(2):
+            r = client.get("/api/papers?doi=10.1/a")
+            assert r.ok
+            assert r.json()["failed_providers"] is None
+            assert r.headers["Cache-Control"] == f"public, max-age={60 * 60}"
+        assert unpaywall_calls == ["10.1/a", "10.1/a"]
+        assert etag_cache.get("paper:10.1/a") is None
+    finally:
+        main.app.dependency_overrides[get_paper_cache] = TTLCache
+        main.app.dependency_overrides[get_etag_cache] = TTLCache
+
+
+def test_author_is_not_cached_after_upstream_error(
+    monkeypatch, client: TestClient
+) -> None:
+    async def mock_get_author_with_papers(*args, **kwargs):
+        return Author(
+            name="Dummy Author",
+            papers=[FullPaper(doi="10.1/a")],
+            failed_providers=["crossref"],
+        )
+
+    monkeypatch.setattr(
+        "fyscience.routers.api.semantic_scholar.get_author_id_async", return_none
+    )
+    monkeypatch.setattr(
+        "fyscience.routers.api.crossref.get_author_with_papers_async",
+        mock_get_author_with_papers,
+    )
+    etag_cache = TTLCache()
+    main.app.dependency_overrides[get_etag_cache] = lambda: etag_cache
+
+    try:
+        r = client.get("/api/authors?profile=firstname lastname")
+        assert r.ok
+        assert r.json()["failed_providers"] == ["crossref"]
+        assert r.headers["Cache-Control"] == "no-cache"
+        assert etag_cache.get("author:firstname lastname") is None
+    finally:
+        main.app.dependency_overrides[get_etag_cache] = TTLCache
+
+
+def test_get_paper_returns_partial_paper_at_deadline(
+    monkeypatch, client: TestClient
+) -> None:
+    doi = "10.1/a"
+    sherpa_calls = []
+
+    async def mock_unpaywall_get_paper(*args, **kwargs):
+        return FullPaper(doi=doi, issn="1618-5641", is_open_access=False)
+
+    async def mock_validate_oa_status_from_s2(*args, **kwargs):
+        await asyncio.sleep(10)
+
+    async def mock_sherpa_get_pathway(issn, *args, **kwargs):
+        sherpa_calls.append(issn)
+        return OAPathway.nocost, "https://sherpa/uri", []
+
+    monkeypatch.setattr(
+        "fyscience.routers.api.unpaywall_get_paper_async", mock_unpaywall_get_paper
+    )
+    monkeypatch.setattr(
+        "fyscience.routers.api.validate_oa_status_from_s2_async",
+        mock_validate_oa_status_from_s2,
+    )
+    monkeypatch.setattr(
+        "fyscience.oa_pathway.sherpa_pathway_api_async", mock_sherpa_get_pathway
+    )
+
+    r = client.get(f"/api/papers?doi={doi}&deadline=0.05")
+    assert r.ok
+    paper = r.json()
+    assert paper["is_open_access"] is False
+    assert paper["oa_pathway"] is None
+    assert paper["skipped_providers"] == ["semantic_scholar", "sherpa"]
+    assert sherpa_calls == []
+
+    r = client.post("/api/papers/batch?deadline=0.05", json={"dois": [doi, doi]})
+    assert r.ok
+    assert [p["skipped_providers"] for p in r.json()] == [
+        ["semantic_scholar", "sherpa"],
+        ["semantic_scholar", "sherpa"],
+    ]
+
+
+def test_get_paper_without_deadline_skips_nothing(
+    monkeypatch, client: TestClient
+) -> None:
+    monkeypatch.setattr("fyscience.routers.api.unpaywall_get_paper_async", return_none)
+
+    r = client.get("/api/papers?doi=10.1/a")
+    assert r.ok
+    assert r.json()["skipped_providers"] is None
+
+
+def test_get_paper_conditionally(monkeypatch, client: TestClient) -> None:
+    unpaywall_calls = []
+
+    async def mock_unpaywall_get_paper(doi, **kwargs):
+        unpaywall_calls.append(doi)
+        return FullPaper(doi=doi, is_open_access=True)
+
+    monkeypatch.setattr(
+        "fyscience.routers.api.unpaywall_get_paper_async", mock_unpaywall_get_paper
+    )
+    monkeypatch.setattr(
+        "fyscience.routers.api.validate_oa_status_from_s2_async", return_none
+    )
+    etag_cache = TTLCache()
+    main.app.dependency_overrides[get_etag_cache] = lambda: etag_cache
+
+    try:
+        r = client.get("/api/papers?doi=10.1/a")
+        assert r.status_code == 200
+        etag = r.headers["ETag"]
+        assert r.headers["Cache-Control"] == f"public, max-age={24 * 60 * 60}"
+
+        for if_none_match in (etag, f"W/{etag}", f'"other", {etag}'):
+            r = client.get(
+                "/api/papers?doi=10.1/a", headers={"If-None-Match": if_none_match}
+            )
+            assert r.status_code == 304
+            assert r.headers["ETag"] == etag
+            assert r.content == b""
+        assert unpaywall_calls == ["10.1/a"]
+
+        # Constructed again once the ETag is no longer cached, but still not modified
+        etag_cache = TTLCache()
+        r = client.get("/api/papers?doi=10.1/a", headers={"If-None-Match": etag})
+        assert r.status_code == 304
+        assert unpaywall_calls == ["10.1/a", "10.1/a"]
+
+        r = client.get("/api/papers?doi=10.1/a", headers={"If-None-Match": '"other"'})
+        assert r.status_code == 200
+        assert r.headers["ETag"] == etag
+    finally:
+        main.app.dependency_overrides[get_etag_cache] = TTLCache
+
+
+def test_partial_paper_is_not_cached(monkeypatch, client: TestClient) -> None:
+    async def mock_unpaywall_get_paper(doi, **kwargs):
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(
+        "fyscience.routers.api.unpaywall_get_paper_async", mock_unpaywall_get_paper
+    )
+    etag_cache = TTLCache()
+    main.app.dependency_overrides[get_etag_cache] = lambda: etag_cache
+
+    try:
+        r = client.get("/api/papers?doi=10.1/a&deadline=0.01")
+        assert r.json()["skipped_providers"] == [
+            "unpaywall",
+            "semantic_scholar",
+            "sherpa",
+        ]
+        assert r.headers["Cache-Control"] == "no-cache"
+        assert etag_cache.get("paper:10.1/a") is None
+
+        r = client.post("/api/papers/batch?deadline=0.01", json={"dois": ["10.1/a"]})
+        assert [p["skipped_providers"] for p in r.json()] == [
+            ["unpaywall", "semantic_scholar", "sherpa"]
+        ]
+    finally:
+        main.app.dependency_overrides[get_etag_cache] = TTLCache
+
+
+def test_get_paper_from_paper_cache(monkeypatch, client: TestClient) -> None:
+    unpaywall_calls = []
+
+    async def mock_unpaywall_get_paper(doi, **kwargs):
+        unpaywall_calls.append(doi)
+        if doi == "10.1/slow":
+            await asyncio.sleep(10)
+        return FullPaper(doi=doi, is_open_access=True)
+
+    monkeypatch.setattr(
+        "fyscience.routers.api.unpaywall_get_paper_async", mock_unpaywall_get_paper
+    )
+    paper_cache = TTLCache()
+    main.app.dependency_overrides[get_paper_cache] = lambda: paper_cache
+
+    try:
+        for _ in range(2):
+            r = client.get("/api/papers?doi=10.1/a")
+            assert r.ok
+            assert r.json()["is_open_access"] is True
+        assert unpaywall_calls == ["10.1/a"]
+        assert paper_cache.get("10.1/a")["is_open_access"] is True
+
+        r = client.get("/api/papers?doi=10.1/slow&deadline=0.01")
+        assert r.json()["skipped_providers"] == [
+            "unpaywall",
+            "semantic_scholar",
+            "sherpa",
+        ]
+        assert paper_cache.get("10.1/slow") is None
+    finally:
+        main.app.dependency_overrides[get_paper_cache] = TTLCache
+
+
+def test_paper_cache_shares_policies() -> None:
+    policy = intern_policy({"id": 1, "permitted_oa": []})
+    paper = FullPaper(doi="10.1/a", oa_pathway_details=[policy])
+    paper_cache = TTLCache()
+
+    api._cache_paper(paper, paper_cache)
+    assert paper_cache.get("10.1/a")["oa_pathway_details"][0] is policy
+
+    # As decoded by a persistent cache
+    paper_cache["10.1/a"] = json.loads(json.dumps(paper_cache.get("10.1/a")))
+    [cached] = api.cached_papers(["10.1/a"], paper_cache)
+    assert cached.oa_pathway_details[0] is policy
+
+
+def test_warm_paper_cache_skips_papers_in_flight(monkeypatch) -> None:
+    constructed = []
+
+    async def mock_construct_papers(dois, **kwargs):
+        constructed.append(dois)
+        await asyncio.sleep(0.01)
+        return [FullPaper(doi=doi, is_open_access=True) for doi in dois]
+
+    monkeypatch.setattr(
+        "fyscience.routers.api._construct_papers", mock_construct_papers
+    )
+    settings = Settings(
+        sherpa_api_key="DUMMY-API-KEY",
+        unpaywall_email="TEST@MAIL.LOCAL",
+        batch_max_dois=2,
+    )
+    paper_cache = TTLCache()
+
+    async def warm_twice():
+        with api._in_flight(["10.1/requested"]):
+            await asyncio.gather(
+                *(
+                    api.warm_paper_cache(
+                        ["10.1/requested", "10.1/a", "10.1/a", "10.1/b", "10.1/c"],
+                        settings,
+                        api.NO_CACHES,
+                        paper_cache,
+                    )
+                    for _ in range(2)
+                )
+            )
+
+    asyncio.run(warm_twice())
+
+    assert constructed == [["10.1/a", "10.1/b"], ["10.1/c"]]
+    assert paper_cache.get("10.1/a") is not None
+    assert not api._papers_in_flight
+
+
+def test_get_author_without_details(monkeypatch, client: TestClient) -> None:
+    async def mock_get_author_with_papers(*args, **kwargs):
+        return Author(
+            name="Dummy Author",
+            papers=[FullPaper(doi="10.1/a", title="A", oa_pathway_details=[{}])],
+        )
+
+    monkeypatch.setattr(
+        "fyscience.routers.api.orcid.get_author_with_papers_async",
+        mock_get_author_with_papers,
+    )
+
+    r = client.get("/api/authors?profile=0000-0000-0000-0000")
+    full_etag = r.headers["ETag"]
+    assert r.json()["papers"][0]["oa_pathway_details"] == [{}]
+
+    r = client.get("/api/authors?profile=0000-0000-0000-0000&details=false")
+    assert r.json()["name"] == "Dummy Author"
+    assert "oa_pathway_details" not in r.json()["papers"][0]
+    assert r.json()["papers"][0]["title"] == "A"
+    assert r.headers["ETag"] != full_etag
+
+    r = client.get("/api/authors?profile=0000-0000-0000-0000&fields=doi&details=false")
+    assert r.json()["papers"] == [{"doi": "10.1/a"}]
+
+
+def test_get_author_conditionally(monkeypatch, client: TestClient) -> None:
+    async def mock_get_author_with_papers(*args, **kwargs):
+        return Author(name="Dummy Author", papers=[FullPaper(doi="10.1/a")])
+
+    monkeypatch.setattr(
+        "fyscience.routers.api.orcid.get_author_with_papers_async",
+        mock_get_author_with_papers,
+    )
+    etag_cache = TTLCache()
+    main.app.dependency_overrides[get_etag_cache] = lambda: etag_cache
+
+    try:
+        r = client.get("/api/authors?profile=0000-0000-0000-0000")
+        assert r.status_code == 200
+
+        r = client.get(
+            "/api/authors?profile=0000-0000-0000-0000",
+            headers={"If-None-Match": r.headers["ETag"]},
+        )
+        assert r.status_code == 304
+    finally:
+        main.app.dependency_overrides[get_etag_cache] = TTLCache
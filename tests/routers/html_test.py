@@ -1,8 +1,28 @@
+import json
+
 import pytest
 from fastapi.testclient import TestClient
 
+from fyscience import main
+from fyscience.cache import TTLCache
+from fyscience.routers.deps import Settings, get_paper_cache
 from fyscience.schemas import OAPathway, FullPaper, Author
-from fyscience.routers.html import _is_doi_query
+from fyscience.routers.html import (
+    N_NOCOST_PAPERS_FALLBACK,
+    _is_doi_query,
+    _n_nocost_papers,
+)
+
+
+async def return_none(*args, **kwargs):
+    return None
+
+
+@pytest.fixture(autouse=True)
+def no_s2_author_search(monkeypatch):
+    monkeypatch.setattr(
+        "fyscience.routers.api.semantic_scholar.get_author_id_async", return_none
+    )
 
 
 @pytest.mark.parametrize(
@@ -13,6 +33,25 @@ def test_get_landing_page(endpoint, client: TestClient) -> None:
     assert r.ok
 
 
+def test_landing_page_shows_n_nocost_papers(client: TestClient) -> None:
+    r = client.get("/")
+    assert "46.796.300 paywalled publications" in r.text
+
+
+def test_n_nocost_papers_from_metrics_summary(tmp_path) -> None:
+    summary_path = tmp_path / "metrics.json"
+    settings = Settings(
+        sherpa_api_key="DUMMY-API-KEY",
+        unpaywall_email="TEST@MAIL.LOCAL",
+        metrics_summary_path=str(summary_path),
+    )
+
+    assert _n_nocost_papers(settings) == N_NOCOST_PAPERS_FALLBACK
+
+    summary_path.write_text(json.dumps({"n_pathway_nocost": 1234567}))
+    assert _n_nocost_papers(settings) == 1234567
+
+
 def test_hit_error_page(client: TestClient) -> None:
     r = client.get("/foobar")
     print(r)
@@ -29,9 +68,9 @@ def test_hit_human_error_page(client: TestClient) -> None:
 @pytest.mark.parametrize(
     "author,provider",
     [
-        (51453144, "semantic_scholar.get_author_with_papers"),
-        ("0000-0000-0000-0000", "orcid.get_author_with_papers"),
-        ("firstname lastname", "crossref.get_author_with_papers"),
+        (51453144, "semantic_scholar.get_author_with_papers_async"),
+        ("0000-0000-0000-0000", "orcid.get_author_with_papers_async"),
+        ("firstname lastname", "crossref.get_author_with_papers_async"),
     ],
 )
 def test_get_publications_for_author_html(
@@ -39,29 +78,30 @@ def test_get_publications_for_author_html(
 ) -> None:
     url = f"/search?query={author}"
 
-    monkeypatch.setattr(
-        f"fyscience.routers.api.{provider}",
-        lambda *a, **kw: Author(
+    async def mock_get_author_with_papers(*args, **kwargs):
+        return Author(
             name="Dummy Author", papers=[FullPaper(doi="10.1007/s00580-005-0536-0")]
-        ),
-    )
+        )
 
-    monkeypatch.setattr(
-        "fyscience.routers.api._construct_paper",
-        lambda *a, **kw: FullPaper(
+    async def mock_construct_paper(*args, **kwargs):
+        return FullPaper(
             issn="1618-5641",
             doi="10.1007/s00580-005-0536-0",
             oa_status=False,
             oa_pathway=OAPathway.nocost.value,
             oa_pathway_details=[],
             title="Best Paper Ever!",
-        ),
+        )
+
+    monkeypatch.setattr(
+        f"fyscience.routers.api.{provider}", mock_get_author_with_papers
     )
+    monkeypatch.setattr("fyscience.routers.api._construct_paper", mock_construct_paper)
 
     r = client.get(url)
     assert r.ok
 
-    monkeypatch.setattr(f"fyscience.routers.api.{provider}", lambda *a, **kw: None)
+    monkeypatch.setattr(f"fyscience.routers.api.{provider}", return_none)
 
     r = client.get(url)
     assert r.status_code == 404
@@ -70,15 +110,15 @@ def test_get_publications_for_author_html(
 @pytest.mark.parametrize(
     "author,provider",
     [
-        (51453144, "semantic_scholar.get_author_with_papers"),
-        ("0000-0000-0000-0000", "orcid.get_author_with_papers"),
-        ("firstname lastname", "crossref.get_author_with_papers"),
+        (51453144, "semantic_scholar.get_author_with_papers_async"),
+        ("0000-0000-0000-0000", "orcid.get_author_with_papers_async"),
+        ("firstname lastname", "crossref.get_author_with_papers_async"),
     ],
 )
 def test_no_author(author, provider, monkeypatch, client: TestClient) -> None:
     url = f"/search?query={author}"
 
-    monkeypatch.setattr(f"fyscience.routers.api.{provider}", lambda *a, **kw: None)
+    monkeypatch.setattr(f"fyscience.routers.api.{provider}", return_none)
 
     r = client.get(url)
     assert not r.ok
@@ -88,9 +128,9 @@ def test_no_author(author, provider, monkeypatch, client: TestClient) -> None:
 @pytest.mark.parametrize(
     "author,provider",
     [
-        (51453144, "semantic_scholar.get_author_with_papers"),
-        ("0000-0000-0000-0000", "orcid.get_author_with_papers"),
-        ("firstname lastname", "crossref.get_author_with_papers"),
+        (51453144, "semantic_scholar.get_author_with_papers_async"),
+        ("0000-0000-0000-0000", "orcid.get_author_with_papers_async"),
+        ("firstname lastname", "crossref.get_author_with_papers_async"),
     ],
 )
 def test_no_publications_for_author(
@@ -98,15 +138,76 @@ def test_no_publications_for_author(
 ) -> None:
     url = f"/search?query={author}"
 
+    async def mock_get_author_with_papers(*args, **kwargs):
+        return Author(name="Dummy Author", papers=[])
+
     monkeypatch.setattr(
-        f"fyscience.routers.api.{provider}",
-        lambda *a, **kw: Author(name="Dummy Author", papers=[]),
+        f"fyscience.routers.api.{provider}", mock_get_author_with_papers
     )
 
     r = client.get(url)
     assert r.ok
 
 
+def test_author_page_waits_for_all_s2_papers(monkeypatch, client: TestClient) -> None:
+    timeouts = []
+
+    async def mock_get_author_with_papers(*args, timeout=None, **kwargs):
+        timeouts.append(timeout)
+        return Author(name="Dummy Author", papers=[])
+
+    monkeypatch.setattr(
+        "fyscience.routers.api.semantic_scholar.get_author_with_papers_async",
+        mock_get_author_with_papers,
+    )
+
+    r = client.get("/search?query=51453144")
+    assert r.ok
+    assert timeouts == [None]
+
+
+def test_author_page_embeds_cached_papers_and_warms_others(
+    monkeypatch, client: TestClient
+) -> None:
+    async def mock_get_author_with_papers(*args, **kwargs):
+        return Author(
+            name="Dummy Author",
+            papers=[FullPaper(doi="10.1/cached"), FullPaper(doi="10.1/missing")],
+        )
+
+    constructed = []
+
+    async def mock_construct_papers(dois, **kwargs):
+        constructed.extend(dois)
+        return [FullPaper(doi=doi, is_open_access=True) for doi in dois]
+
+    monkeypatch.setattr(
+        "fyscience.routers.api.orcid.get_author_with_papers_async",
+        mock_get_author_with_papers,
+    )
+    monkeypatch.setattr(
+        "fyscience.routers.api._construct_papers", mock_construct_papers
+    )
+    paper_cache = TTLCache()
+    paper_cache["10.1/cached"] = FullPaper(
+        doi="10.1/cached", is_open_access=False, oa_pathway=OAPathway.nocost
+    ).dict()
+    main.app.dependency_overrides[get_paper_cache] = lambda: paper_cache
+
+    try:
+        r = client.get("/search?query=0000-0000-0000-0000")
+        assert r.ok
+        assert '"doi": "10.1/cached"' in r.text
+        assert '"oa_pathway": "nocost"' in r.text
+        assert '"doi": "10.1/missing"' not in r.text
+
+        # Background tasks complete before the test client returns the response
+        assert constructed == ["10.1/missing"]
+        assert paper_cache.get("10.1/missing")["is_open_access"] is True
+    finally:
+        main.app.dependency_overrides[get_paper_cache] = TTLCache
+
+
 def test_search_missing_args(client: TestClient) -> None:
     r = client.get("/search")
     assert not r.ok
@@ -1,8 +1,14 @@
+import asyncio
+
 import pytest
 from requests import Response
 
+from fyscience.cache import TTLCache
+from fyscience.schemas import FullPaper
 from fyscience.semantic_scholar import (
+    get_author_with_papers_async,
     get_paper,
+    S2Author,
     Paper,
     extract_profile_id_from_url,
     _get_request,
@@ -23,6 +29,74 @@ def test_get_paper_no_doi(monkeypatch):
     assert paper is None
 
 
+def test_get_paper_cache(monkeypatch):
+    calls = []
+
+    def mock_get_paper(paper_id, api_key):
+        calls.append(paper_id)
+        return Paper(doi=paper_id, is_open_access=True)
+
+    monkeypatch.setattr("fyscience.semantic_scholar._get_paper", mock_get_paper)
+    cache = TTLCache()
+
+    assert get_paper("10.1/a", cache=cache).is_open_access
+    assert get_paper("10.1/a", cache=cache).is_open_access
+    assert calls == ["10.1/a"]
+
+
+def _mock_author(monkeypatch, n_papers):
+    async def mock_get_author(author_id, api_key=None):
+        papers = [{"paperId": str(i)} for i in range(n_papers)]
+        return S2Author(authorId=author_id, name="Dummy", papers=papers)
+
+    monkeypatch.setattr("fyscience.semantic_scholar._get_author_async", mock_get_author)
+
+
+def test_get_author_with_papers_async_is_concurrent(monkeypatch):
+    _mock_author(monkeypatch, n_papers=10)
+    running = []
+    max_running = []
+
+    async def mock_get_paper(paper_id, api_key=None, cache=None):
+        running.append(paper_id)
+        max_running.append(len(running))
+        await asyncio.sleep(0.01)
+        running.remove(paper_id)
+        return FullPaper(doi=f"10.1/{paper_id}")
+
+    monkeypatch.setattr("fyscience.semantic_scholar.get_paper_async", mock_get_paper)
+
+    author = asyncio.run(get_author_with_papers_async("1", concurrency=3))
+
+    assert [p.doi for p in author.papers] == [f"10.1/{i}" for i in range(10)]
+    assert author.unresolved_paper_ids is None
+    assert max(max_running) == 3
+
+
+def test_get_author_with_papers_async_deadline(monkeypatch):
+    _mock_author(monkeypatch, n_papers=3)
+    cache = TTLCache()
+
+    async def mock_get_paper(paper_id, api_key=None, cache=None):
+        await asyncio.sleep(0 if paper_id == "0" else 0.05)
+        cache[paper_id] = FullPaper(doi=f"10.1/{paper_id}").dict()
+        return FullPaper(doi=f"10.1/{paper_id}")
+
+    monkeypatch.setattr("fyscience.semantic_scholar.get_paper_async", mock_get_paper)
+
+    async def main():
+        author = await get_author_with_papers_async("1", cache=cache, timeout=0.02)
+        # Unresolved papers keep being looked up in the background
+        await asyncio.sleep(0.1)
+        return author
+
+    author = asyncio.run(main())
+
+    assert [p.doi for p in author.papers] == ["10.1/0"]
+    assert author.unresolved_paper_ids == ["1", "2"]
+    assert cache.get("2") is not None
+
+
 @pytest.mark.parametrize(
     "url,profile_id",
     [
@@ -1,10 +1,23 @@
 import os
+import gzip
 import json
+import asyncio
+from copy import deepcopy
 
+import httpx
 import pytest
 from requests import Response
-from fyscience.sherpa import get_pathway, has_no_cost_oa_policy
-from fyscience.schemas import OAPathway
+from fyscience.cache import LayeredCache, TTLCache
+from fyscience.oa_pathway import oa_pathway
+from fyscience.sherpa import (
+    SherpaPolicyTable,
+    build_policy_table,
+    get_pathway,
+    get_pathway_async,
+    has_no_cost_oa_policy,
+    intern_policy,
+)
+from fyscience.schemas import FullPaper, OAPathway
 
 
 ASSETS_PATH = os.path.join(os.path.dirname(__file__), "assets")
@@ -22,7 +35,7 @@ def test_get_pathway_successes(issn, pathway, monkeypatch):
     with open(os.path.join(ASSETS_PATH, "publishers.json"), "r") as fh:
         publishers = json.load(fh)["items"]
 
-    def mock_get_publisher(url):
+    def mock_get_publisher(url, **kwargs):
         publisher_issn = url.split('"')[-2]
         selected_publishers = [p for p in publishers if publisher_issn in json.dumps(p)]
         response = Response()
@@ -40,7 +53,7 @@ def test_get_pathway_successes(issn, pathway, monkeypatch):
 
 
 def test_get_pathway_request_error(monkeypatch):
-    def mock_get_publisher(url):
+    def mock_get_publisher(url, **kwargs):
         response = Response()
         response.status_code = 404
         return response
@@ -54,6 +67,157 @@ def test_get_pathway_request_error(monkeypatch):
     assert pathway == OAPathway.not_found
 
 
+def test_get_pathway_async(monkeypatch):
+    with open(os.path.join(ASSETS_PATH, "publishers.json"), "r") as fh:
+        publishers = json.load(fh)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.host == "v2.sherpa.ac.uk"
+        elife = [p for p in publishers["items"] if "2050-084X" in json.dumps(p)]
+        return httpx.Response(200, json={"items": elife})
+
+    mock_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr("fyscience.clients.get_client", lambda provider: mock_client)
+
+    pathway, _, _ = asyncio.run(get_pathway_async(issn="2050-084X", api_key="KEY"))
+    assert pathway is OAPathway.nocost
+
+
+def test_get_pathway_async_coalesces_concurrent_lookups(monkeypatch):
+    requested = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(request.url)
+        return httpx.Response(200, json={"items": []})
+
+    mock_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr("fyscience.clients.get_client", lambda provider: mock_client)
+
+    async def main():
+        return await asyncio.gather(
+            *(get_pathway_async(issn="1111-2222", api_key="KEY") for _ in range(3))
+        )
+
+    results = asyncio.run(main())
+
+    assert len(requested) == 1
+    assert all(pathway is OAPathway.not_found for pathway, _, _ in results)
+
+
+def test_get_pathway_async_request_error(monkeypatch):
+    mock_client = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(404))
+    )
+    monkeypatch.setattr("fyscience.clients.get_client", lambda provider: mock_client)
+
+    pathway, _, _ = asyncio.run(get_pathway_async(issn="1234-1234", api_key="KEY"))
+    assert pathway == OAPathway.not_found
+
+
+def test_build_policy_table(tmp_path):
+    table = build_policy_table(
+        os.path.join(ASSETS_PATH, "publishers.json"), str(tmp_path / "sherpa.sqlite")
+    )
+
+    assert len(table) == 3
+    assert table.get("DOESNT-EXIST") is None
+
+    pathway, uri, details = table.get("2050-084x")
+    assert pathway is OAPathway.nocost
+    assert uri.startswith("https://v2.sherpa.ac.uk/id/publication/")
+    assert len(details) > 0 and all(has_no_cost_oa_policy(p) for p in details)
+
+    pathway, _, details = table.get("1179-3155")
+    assert pathway is OAPathway.other
+    assert details is None
+
+
+def test_build_policy_table_from_jsonl_gz(tmp_path):
+    with open(os.path.join(ASSETS_PATH, "publishers.json"), "r") as fh:
+        publishers = json.load(fh)["items"]
+    export_path = str(tmp_path / "sherpa.jsonl.gz")
+    with gzip.open(export_path, "wt") as fh:
+        for publisher in publishers:
+            fh.write(json.dumps(publisher) + "\n")
+
+    table = build_policy_table(export_path, str(tmp_path / "sherpa.sqlite"))
+
+    assert len(table) == 3
+    assert table.get("1179-3163")[0] is OAPathway.other
+
+
+def test_policy_table_keeps_first_publication_per_issn(tmp_path):
+    table = SherpaPolicyTable(str(tmp_path / "sherpa.sqlite"))
+    publication = {
+        "issns": [{"issn": "1234-5678"}],
+        "publisher_policy": [{"open_access_prohibited": "yes"}],
+        "system_metadata": {"uri": "first"},
+    }
+    second = {**publication, "system_metadata": {"uri": "second"}}
+
+    assert table.insert([publication, second]) == 1
+    assert table.get("1234-5678") == (OAPathway.other, "first", None)
+
+
+def test_policy_table_precedes_api_in_oa_pathway(tmp_path, monkeypatch):
+    table = build_policy_table(
+        os.path.join(ASSETS_PATH, "publishers.json"), str(tmp_path / "sherpa.sqlite")
+    )
+
+    def mock_get_pathway(issn, api_key):
+        assert issn == "0000-0000"
+        return OAPathway.not_found, None, None
+
+    monkeypatch.setattr("fyscience.oa_pathway.sherpa_pathway_api", mock_get_pathway)
+
+    cache = LayeredCache(TTLCache(), table)
+    paper = FullPaper(doi="10.1/a", issn="2050-084X", is_open_access=False)
+    assert oa_pathway(paper, cache=cache).oa_pathway is OAPathway.nocost
+
+    paper = FullPaper(doi="10.1/b", issn="0000-0000", is_open_access=False)
+    assert oa_pathway(paper, cache=cache).oa_pathway is OAPathway.not_found
+    assert cache.stats()["store_hits"] == 1
+
+
+def test_policy_table_interns_policies(tmp_path):
+    table = build_policy_table(
+        os.path.join(ASSETS_PATH, "publishers.json"), str(tmp_path / "sherpa.sqlite")
+    )
+
+    first, second = (
+        oa_pathway(
+            FullPaper(doi=f"10.1/{i}", issn="2050-084X", is_open_access=False),
+            cache=table,
+        ).oa_pathway_details
+        for i in range(2)
+    )
+    assert first
+    assert all(p is q for p, q in zip(first, second))
+
+
+def test_intern_policy():
+    with open(
+        os.path.join(ASSETS_PATH, "policy_without_additional_oa_fee_key.json")
+    ) as fh:
+        content = fh.read()
+
+    policy = intern_policy(json.loads(content))
+    assert intern_policy(json.loads(content)) is policy
+    assert intern_policy(policy) is policy
+    assert policy.id.startswith(f"{json.loads(content)['id']}-")
+
+    with pytest.raises(TypeError):
+        policy["permitted_oa"] = []
+    copied = deepcopy(policy)
+    copied["permitted_oa"] = []
+    assert len(policy["permitted_oa"]) == 3
+
+    assert policy.no_cost() is policy.no_cost()
+    assert len(policy.no_cost()["permitted_oa"]) == 2
+    assert intern_policy({"permitted_oa": []}).id != intern_policy({}).id
+    assert policy.no_cost().id != policy.id
+
+
 def test_get_pathway_with_no_api_key():
     api_key = os.environ.pop("SHERPA_API_KEY", False)
 
@@ -0,0 +1,128 @@
+import asyncio
+
+import pytest
+
+from fyscience import clients, singleflight
+from fyscience.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_call():
+    group = SingleFlight()
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"pathway": "nocost"}
+
+    async def main():
+        return await asyncio.gather(*(group.do("1234-5678", call) for _ in range(5)))
+
+    results = asyncio.run(main())
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert group.stats()["calls"] == 1
+    assert group.stats()["coalesced"] == 4
+    assert group.stats()["most_coalesced"] == [{"key": "1234-5678", "coalesced": 4}]
+    assert group.stats()["in_flight"] == 0
+
+
+def test_sequential_calls_are_not_coalesced():
+    group = SingleFlight()
+
+    async def call():
+        return 1
+
+    async def main():
+        await group.do("key", call)
+        await group.do("key", call)
+
+    asyncio.run(main())
+
+    assert group.stats()["calls"] == 2
+    assert group.stats()["coalesced"] == 0
+
+
+def test_exception_is_shared_and_not_kept():
+    group = SingleFlight()
+
+    async def failing_call():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("Upstream went away")
+
+    async def main():
+        return await asyncio.gather(
+            *(group.do("key", failing_call) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert group.stats()["calls"] == 1
+    assert group.stats()["in_flight"] == 0
+
+
+def test_cancelled_caller_does_not_cancel_call():
+    group = SingleFlight()
+
+    async def call():
+        await asyncio.sleep(0.01)
+        return 1
+
+    async def main():
+        first = asyncio.ensure_future(group.do("key", call))
+        second = asyncio.ensure_future(group.do("key", call))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == 1
+
+
+def test_call_does_not_inherit_first_callers_deadline():
+    group = SingleFlight()
+
+    async def call():
+        await asyncio.sleep(0.05)
+        clients._check_deadline("test")
+        return 1
+
+    async def first():
+        with clients.deadline(0.01):
+            return await asyncio.wait_for(group.do("key", call), clients.remaining())
+
+    async def second():
+        await asyncio.sleep(0.001)
+        return await group.do("key", call)
+
+    async def main():
+        return await asyncio.gather(first(), second(), return_exceptions=True)
+
+    first_result, second_result = asyncio.run(main())
+    assert isinstance(first_result, asyncio.TimeoutError)
+    assert second_result == 1
+    assert group.stats()["coalesced"] == 1
+
+
+def test_per_key_counts_are_bounded():
+    group = SingleFlight(max_keys=1)
+
+    async def call():
+        await asyncio.sleep(0.01)
+
+    async def main():
+        await asyncio.gather(
+            *(group.do(key, call) for key in ("a", "a", "b", "b") for _ in range(2))
+        )
+
+    asyncio.run(main())
+
+    assert group.stats()["coalesced"] == 6
+    assert group.stats()["most_coalesced"] == [{"key": "a", "coalesced": 3}]
+
+
+@pytest.mark.parametrize("name", ["sherpa", "unpaywall"])
+def test_get_group_is_shared(name):
+    assert singleflight.get_group(name) is singleflight.get_group(name)
+    assert name in singleflight.stats()
@@ -1,10 +1,24 @@
 import os
+import gzip
 import json
+import asyncio
 
+import httpx
 import pytest
 from requests import Response
 
-from fyscience.unpaywall import get_paper, Paper, _extract_authors
+from fyscience.cache import LayeredCache, TTLCache, is_not_found
+from fyscience import clients
+from fyscience.clients import UpstreamError
+from fyscience.unpaywall import (
+    get_paper,
+    get_paper_async,
+    build_index,
+    ingest_changefiles,
+    Paper,
+    UnpaywallIndex,
+    _extract_authors,
+)
 
 
 ASSETS_PATH = os.path.join(os.path.dirname(__file__), "assets")
@@ -79,6 +93,88 @@ def test_get_paper_not_found(monkeypatch):
     assert paper is None
 
 
+def test_get_paper_async(monkeypatch):
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.host == "api.unpaywall.org"
+        assert request.url.params["email"] == "dummy@local.test"
+        return httpx.Response(200, content=DMUMMY_PAPER.json())
+
+    mock_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr("fyscience.clients.get_client", lambda provider: mock_client)
+
+    paper = asyncio.run(get_paper_async("10.110/dummy.doi", "dummy@local.test"))
+
+    assert paper.doi == "10.110/dummy.doi"
+    assert paper.is_open_access is False
+
+
+def test_get_paper_async_uses_cache(monkeypatch):
+    requested_dois = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested_dois.append(request.url.path)
+        return httpx.Response(200, content=DMUMMY_PAPER.json())
+
+    mock_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr("fyscience.clients.get_client", lambda provider: mock_client)
+
+    cache = {}
+    for _ in range(2):
+        paper = asyncio.run(
+            get_paper_async("10.110/dummy.doi", "dummy@local.test", cache=cache)
+        )
+        assert paper.doi == "10.110/dummy.doi"
+
+    assert len(requested_dois) == 1
+    assert cache["10.110/dummy.doi"]["is_open_access"] is False
+
+
+def test_get_paper_async_not_found(monkeypatch):
+    mock_client = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(404))
+    )
+    monkeypatch.setattr("fyscience.clients.get_client", lambda provider: mock_client)
+
+    paper = asyncio.run(get_paper_async("10.1011/irrelevant.dummy", "a@local.test"))
+    assert paper is None
+
+
+def test_get_paper_async_caches_not_found(monkeypatch):
+    status_codes = [404, 503]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(status_codes.pop(0))
+
+    mock_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr("fyscience.clients.get_client", lambda provider: mock_client)
+
+    cache = TTLCache()
+    for _ in range(2):
+        paper = asyncio.run(get_paper_async("10.1/unknown", "a@local.test", cache))
+        assert paper is None
+
+    assert status_codes == [503]
+    assert is_not_found(cache.get("10.1/unknown"))
+
+
+def test_get_paper_async_doesnt_cache_upstream_errors(monkeypatch):
+    status_codes = [503] * (clients.MAX_RETRIES + 1) + [200]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(status_codes.pop(0), content=DMUMMY_PAPER.json())
+
+    mock_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr("fyscience.clients.get_client", lambda provider: mock_client)
+
+    cache = TTLCache()
+    with pytest.raises(UpstreamError):
+        asyncio.run(get_paper_async("10.110/dummy.doi", "a@local.test", cache))
+    assert cache.get("10.110/dummy.doi") is None
+
+    paper = asyncio.run(get_paper_async("10.110/dummy.doi", "a@local.test", cache))
+    assert paper.doi == "10.110/dummy.doi"
+
+
 def test_get_paper_with_no_email():
     email = os.environ.pop("UNPAYWALL_EMAIL", False)
 
@@ -131,3 +227,104 @@ def test_get_paper_with_no_email():
 )
 def test_extract_authors_first_author(authors, first_author):
     assert _extract_authors(authors).startswith(first_author)
+
+
+def _write_jsonl_gz(path, records):
+    with gzip.open(path, "wt") as fh:
+        for record in records:
+            fh.write(json.dumps(record) + "\n")
+
+
+def test_build_index(tmp_path):
+    snapshot_path = str(tmp_path / "unpaywall.jsonl.gz")
+    records = [
+        dict(
+            DMUMMY_PAPER.dict(),
+            doi="10.110/Paywalled",
+            journal_issn_l="1234-1234",
+            z_authors=[{"given": "First", "family": "Author", "sequence": "first"}],
+        ),
+        dict(
+            DMUMMY_PAPER.dict(),
+            doi="10.110/oa",
+            is_oa=True,
+            best_oa_location={"url_for_pdf": "https://repo.local/oa.pdf"},
+            z_authors=[{"name": "Some Consortium"}],
+        ),
+    ]
+    _write_jsonl_gz(snapshot_path, records)
+
+    index = build_index(snapshot_path, str(tmp_path / "unpaywall.sqlite"))
+
+    assert len(index) == 2
+    assert index.get("10.110/unknown") is None
+
+    paywalled = index.get("10.110/paywalled")
+    assert paywalled["doi"] == "10.110/paywalled"
+    assert paywalled["issn"] == "1234-1234"
+    assert paywalled["is_open_access"] is False
+    assert paywalled["authors"] == "First Author et al."
+
+    oa = index.get("10.110/OA")
+    assert oa["is_open_access"] is True
+    assert oa["oa_location_url"] == "https://repo.local/oa.pdf"
+    assert oa["authors"] is None
+
+
+def test_get_paper_from_index_before_api(tmp_path, monkeypatch):
+    def mock_get_doi(*args, **kwargs):
+        raise AssertionError("The unpaywall API should not be called")
+
+    monkeypatch.setattr("fyscience.unpaywall.requests.get", mock_get_doi)
+
+    index = UnpaywallIndex(str(tmp_path / "unpaywall.sqlite"))
+    index.upsert([dict(DMUMMY_PAPER.dict(), journal_issn_l="1234-1234")])
+
+    paper = get_paper(DMUMMY_PAPER.doi, cache=LayeredCache({}, index))
+
+    assert paper.doi == DMUMMY_PAPER.doi
+    assert paper.issn == "1234-1234"
+    assert paper.is_open_access is False
+
+
+def test_ingest_changefiles(tmp_path):
+    index = UnpaywallIndex(str(tmp_path / "unpaywall.sqlite"))
+    index.upsert([DMUMMY_PAPER.dict()])
+
+    first = str(tmp_path / "changed_dois_2021-03-01.jsonl.gz")
+    second = str(tmp_path / "changed_dois_2021-03-02.jsonl.gz")
+    _write_jsonl_gz(first, [dict(DMUMMY_PAPER.dict(), is_oa=True)])
+    _write_jsonl_gz(
+        second,
+        [
+            dict(DMUMMY_PAPER.dict(), journal_issn_l="1234-1234"),
+            dict(DMUMMY_PAPER.dict(), doi="10.110/new"),
+        ],
+    )
+
+    assert ingest_changefiles(index, [second, first], compact_every=1) == 3
+    assert index.high_water_mark() == "changed_dois_2021-03-02.jsonl.gz"
+    assert index.n_changefiles_since_compaction() == 0
+    assert len(index) == 2
+    assert index.get(DMUMMY_PAPER.doi)["issn"] == "1234-1234"
+
+    # Idempotent, i.e. already ingested changefiles are skipped
+    assert ingest_changefiles(index, [first, second]) == 0
+    assert index.get(DMUMMY_PAPER.doi)["issn"] == "1234-1234"
+
+
+def test_ingest_changefile_resumes(tmp_path):
+    index = UnpaywallIndex(str(tmp_path / "unpaywall.sqlite"))
+    changefile = str(tmp_path / "changed_dois_2021-03-01.jsonl.gz")
+    _write_jsonl_gz(
+        changefile,
+        [dict(DMUMMY_PAPER.dict(), doi=f"10.110/{i}") for i in range(5)],
+    )
+
+    # As left behind by an ingestion interrupted after the first batch of two
+    index.upsert([dict(DMUMMY_PAPER.dict(), doi=f"10.110/{i}") for i in range(2)])
+    index._write([], progress=("changed_dois_2021-03-01.jsonl.gz", 2, False))
+
+    assert index.ingest_changefile(changefile, batch_size=2) == 3
+    assert len(index) == 5
+    assert index.high_water_mark() == "changed_dois_2021-03-01.jsonl.gz"